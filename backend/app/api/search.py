@@ -1,4 +1,4 @@
-# ABOUTME: Search endpoint implementation using FTS5 full-text search
+# ABOUTME: Search endpoints using FTS5 full-text search and an in-memory prefix index
 # ABOUTME: Handles query validation, pagination, and result formatting
 
 from typing import Annotated
@@ -8,6 +8,7 @@ from sqlalchemy.orm import Session
 
 from app.database import get_db, search_schools
 from app.models import SearchResponse, SchoolSearchResult
+from app.services.autocomplete import AutocompleteIndex, load_autocomplete_index
 
 router = APIRouter(prefix="/api", tags=["search"])
 
@@ -19,18 +20,45 @@ def search_schools_endpoint(
     db: Session = Depends(get_db),
 ) -> SearchResponse:
     """Search schools by name, city, or district using full-text search."""
-    schools = search_schools(db, q, limit)
+    rows = search_schools(db, q, limit)
 
     results = [
         SchoolSearchResult(
-            id=school.id,
-            rcdts=school.rcdts,
-            school_name=school.school_name,
-            city=school.city,
-            district=school.district,
-            school_type=school.school_type,
+            id=row.id,
+            rcdts=row.rcdts,
+            school_name=row.school_name,
+            city=row.city,
+            district=row.district,
+            school_type=row.school_type,
         )
-        for school in schools
+        for row in rows
+    ]
+
+    return SearchResponse(results=results, total=len(results))
+
+
+def get_autocomplete_index(db: Session = Depends(get_db)) -> AutocompleteIndex:
+    """Dependency returning the process-wide autocomplete index."""
+    return load_autocomplete_index(db)
+
+
+@router.get("/autocomplete", response_model=SearchResponse)
+def autocomplete_endpoint(
+    q: Annotated[str, Query(min_length=1, description="Partial search text")],
+    limit: Annotated[int, Query(ge=1, le=20, description="Max suggestions")] = 8,
+    index: AutocompleteIndex = Depends(get_autocomplete_index),
+) -> SearchResponse:
+    """Suggest schools whose name, city, or district words start with the typed text."""
+    results = [
+        SchoolSearchResult(
+            id=entry.id,
+            rcdts=entry.rcdts,
+            school_name=entry.school_name,
+            city=entry.city,
+            district=entry.district,
+            school_type=entry.school_type,
+        )
+        for entry in index.search(q, limit)
     ]
 
     return SearchResponse(results=results, total=len(results))
@@ -1,13 +1,16 @@
 # ABOUTME: FastAPI router for top scores endpoints
 # ABOUTME: Provides ranked school lists filtered by assessment and level
 
-from typing import Annotated
+from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
+from app.api.schools import get_school_snapshot
 from app.database import get_db
-from app.models import TopScoreEntry, TopScoresResponse
+from app.models import TopScoresResponse
+from app.services.snapshot import SchoolSnapshot
 from app.services.top_scores import fetch_top_scores
 
 router = APIRouter(prefix="/api/top-scores", tags=["top-scores"])
@@ -22,6 +25,7 @@ def get_top_scores(
     level: Annotated[str, Query(description="high, middle, elementary")],
     limit: Annotated[int, Query(le=100, ge=1, description="Max results")]=100,
     db: Session = Depends(get_db),
+    snapshot: Optional[SchoolSnapshot] = Depends(get_school_snapshot),
 ) -> TopScoresResponse:
     """Return ranked list of top schools for the requested assessment/level."""
     if assessment not in VALID_ASSESSMENTS:
@@ -29,7 +33,10 @@ def get_top_scores(
     if level not in VALID_LEVELS:
         raise HTTPException(status_code=422, detail="Invalid level")
 
-    ranked = fetch_top_scores(db, assessment=assessment, level=level, limit=limit)
-    return TopScoresResponse(
-        results=[TopScoreEntry(**rank.__dict__) for rank in ranked]
-    )
+    if snapshot is not None:
+        ranked = snapshot.top_scores(assessment=assessment, level=level, limit=limit)
+    else:
+        ranked = fetch_top_scores(db, assessment=assessment, level=level, limit=limit)
+    # RankedSchool mirrors TopScoreEntry field for field, so orjson can write the
+    # dataclasses directly instead of validating 100 models per request
+    return Response(content=orjson.dumps({"results": ranked}), media_type="application/json")
@@ -2,14 +2,44 @@
 # ABOUTME: Defines School model with base metadata and session helpers
 
 from datetime import UTC, datetime
+import hashlib
+import os
 import re
-from typing import List, Optional
-
-from sqlalchemy import Column, DateTime, Float, Integer, String, Text, create_engine, text
-from sqlalchemy.orm import Session, declarative_base, sessionmaker
+import sqlite3
+import threading
+import uuid
+import weakref
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+from urllib.parse import unquote, urlparse
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+    create_engine,
+    event,
+    inspect,
+    select,
+    text,
+)
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, declarative_base, deferred, sessionmaker, undefer_group
+from sqlalchemy.pool import QueuePool
 
 Base = declarative_base()
 
+# Core columns load eagerly; trend and history columns are deferred so that
+# list-style reads never pull ~300 extra values per row. Callers that build
+# SchoolDetail undefer what they need in one SELECT.
+TREND_COLUMN_GROUP = "trends"
+HISTORY_COLUMN_GROUP = "historical"
+
 
 class School(Base):
     """School model with demographic and academic metrics."""
@@ -52,337 +82,341 @@ class School(Base):
     pct_mena = Column(Float)
 
     # Trend Metrics (delta relative to prior years)
-    enrollment_trend_1yr = Column(Float)
-    enrollment_trend_3yr = Column(Float)
-    enrollment_trend_5yr = Column(Float)
-    enrollment_trend_10yr = Column(Float)
-    enrollment_trend_15yr = Column(Float)
-    low_income_trend_1yr = Column(Float)
-    low_income_trend_3yr = Column(Float)
-    low_income_trend_5yr = Column(Float)
-    low_income_trend_10yr = Column(Float)
-    low_income_trend_15yr = Column(Float)
-    el_trend_1yr = Column(Float)
-    el_trend_3yr = Column(Float)
-    el_trend_5yr = Column(Float)
-    el_trend_10yr = Column(Float)
-    el_trend_15yr = Column(Float)
-    white_trend_1yr = Column(Float)
-    white_trend_3yr = Column(Float)
-    white_trend_5yr = Column(Float)
-    white_trend_10yr = Column(Float)
-    white_trend_15yr = Column(Float)
-    black_trend_1yr = Column(Float)
-    black_trend_3yr = Column(Float)
-    black_trend_5yr = Column(Float)
-    black_trend_10yr = Column(Float)
-    black_trend_15yr = Column(Float)
-    hispanic_trend_1yr = Column(Float)
-    hispanic_trend_3yr = Column(Float)
-    hispanic_trend_5yr = Column(Float)
-    hispanic_trend_10yr = Column(Float)
-    hispanic_trend_15yr = Column(Float)
-    asian_trend_1yr = Column(Float)
-    asian_trend_3yr = Column(Float)
-    asian_trend_5yr = Column(Float)
-    asian_trend_10yr = Column(Float)
-    asian_trend_15yr = Column(Float)
-    pacific_islander_trend_1yr = Column(Float)
-    pacific_islander_trend_3yr = Column(Float)
-    pacific_islander_trend_5yr = Column(Float)
-    pacific_islander_trend_10yr = Column(Float)
-    pacific_islander_trend_15yr = Column(Float)
-    native_american_trend_1yr = Column(Float)
-    native_american_trend_3yr = Column(Float)
-    native_american_trend_5yr = Column(Float)
-    native_american_trend_10yr = Column(Float)
-    native_american_trend_15yr = Column(Float)
-    two_or_more_trend_1yr = Column(Float)
-    two_or_more_trend_3yr = Column(Float)
-    two_or_more_trend_5yr = Column(Float)
-    two_or_more_trend_10yr = Column(Float)
-    two_or_more_trend_15yr = Column(Float)
-    mena_trend_1yr = Column(Float)
-    mena_trend_3yr = Column(Float)
-    mena_trend_5yr = Column(Float)
-    mena_trend_10yr = Column(Float)
-    mena_trend_15yr = Column(Float)
-    act_trend_1yr = Column(Float)
-    act_trend_3yr = Column(Float)
-    act_trend_5yr = Column(Float)
-    act_trend_10yr = Column(Float)
-    act_trend_15yr = Column(Float)
+    enrollment_trend_1yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    enrollment_trend_3yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    enrollment_trend_5yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    enrollment_trend_10yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    enrollment_trend_15yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    low_income_trend_1yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    low_income_trend_3yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    low_income_trend_5yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    low_income_trend_10yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    low_income_trend_15yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    el_trend_1yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    el_trend_3yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    el_trend_5yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    el_trend_10yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    el_trend_15yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    white_trend_1yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    white_trend_3yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    white_trend_5yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    white_trend_10yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    white_trend_15yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    black_trend_1yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    black_trend_3yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    black_trend_5yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    black_trend_10yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    black_trend_15yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    hispanic_trend_1yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    hispanic_trend_3yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    hispanic_trend_5yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    hispanic_trend_10yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    hispanic_trend_15yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    asian_trend_1yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    asian_trend_3yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    asian_trend_5yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    asian_trend_10yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    asian_trend_15yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    pacific_islander_trend_1yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    pacific_islander_trend_3yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    pacific_islander_trend_5yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    pacific_islander_trend_10yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    pacific_islander_trend_15yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    native_american_trend_1yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    native_american_trend_3yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    native_american_trend_5yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    native_american_trend_10yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    native_american_trend_15yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    two_or_more_trend_1yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    two_or_more_trend_3yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    two_or_more_trend_5yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    two_or_more_trend_10yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    two_or_more_trend_15yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    mena_trend_1yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    mena_trend_3yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    mena_trend_5yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    mena_trend_10yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    mena_trend_15yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    act_trend_1yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    act_trend_3yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    act_trend_5yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    act_trend_10yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
+    act_trend_15yr = deferred(Column(Float), group=TREND_COLUMN_GROUP)
 
     # Historical Yearly Data (last 15 years: 2010-2025)
     # Enrollment
-    enrollment_hist_2025 = Column(Integer)
-    enrollment_hist_2024 = Column(Integer)
-    enrollment_hist_2023 = Column(Integer)
-    enrollment_hist_2022 = Column(Integer)
-    enrollment_hist_2021 = Column(Integer)
-    enrollment_hist_2020 = Column(Integer)
-    enrollment_hist_2019 = Column(Integer)
-    enrollment_hist_2018 = Column(Integer)
-    enrollment_hist_2017 = Column(Integer)
-    enrollment_hist_2016 = Column(Integer)
-    enrollment_hist_2015 = Column(Integer)
-    enrollment_hist_2014 = Column(Integer)
-    enrollment_hist_2013 = Column(Integer)
-    enrollment_hist_2012 = Column(Integer)
-    enrollment_hist_2011 = Column(Integer)
-    enrollment_hist_2010 = Column(Integer)
+    enrollment_hist_2025 = deferred(Column(Integer), group=HISTORY_COLUMN_GROUP)
+    enrollment_hist_2024 = deferred(Column(Integer), group=HISTORY_COLUMN_GROUP)
+    enrollment_hist_2023 = deferred(Column(Integer), group=HISTORY_COLUMN_GROUP)
+    enrollment_hist_2022 = deferred(Column(Integer), group=HISTORY_COLUMN_GROUP)
+    enrollment_hist_2021 = deferred(Column(Integer), group=HISTORY_COLUMN_GROUP)
+    enrollment_hist_2020 = deferred(Column(Integer), group=HISTORY_COLUMN_GROUP)
+    enrollment_hist_2019 = deferred(Column(Integer), group=HISTORY_COLUMN_GROUP)
+    enrollment_hist_2018 = deferred(Column(Integer), group=HISTORY_COLUMN_GROUP)
+    enrollment_hist_2017 = deferred(Column(Integer), group=HISTORY_COLUMN_GROUP)
+    enrollment_hist_2016 = deferred(Column(Integer), group=HISTORY_COLUMN_GROUP)
+    enrollment_hist_2015 = deferred(Column(Integer), group=HISTORY_COLUMN_GROUP)
+    enrollment_hist_2014 = deferred(Column(Integer), group=HISTORY_COLUMN_GROUP)
+    enrollment_hist_2013 = deferred(Column(Integer), group=HISTORY_COLUMN_GROUP)
+    enrollment_hist_2012 = deferred(Column(Integer), group=HISTORY_COLUMN_GROUP)
+    enrollment_hist_2011 = deferred(Column(Integer), group=HISTORY_COLUMN_GROUP)
+    enrollment_hist_2010 = deferred(Column(Integer), group=HISTORY_COLUMN_GROUP)
 
     # ACT Composite (Overall)
-    act_hist_2025 = Column(Float)
-    act_hist_2024 = Column(Float)
-    act_hist_2023 = Column(Float)
-    act_hist_2022 = Column(Float)
-    act_hist_2021 = Column(Float)
-    act_hist_2020 = Column(Float)
-    act_hist_2019 = Column(Float)
-    act_hist_2018 = Column(Float)
-    act_hist_2017 = Column(Float)
-    act_hist_2016 = Column(Float)
-    act_hist_2015 = Column(Float)
-    act_hist_2014 = Column(Float)
-    act_hist_2013 = Column(Float)
-    act_hist_2012 = Column(Float)
-    act_hist_2011 = Column(Float)
-    act_hist_2010 = Column(Float)
+    act_hist_2025 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_hist_2024 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_hist_2023 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_hist_2022 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_hist_2021 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_hist_2020 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_hist_2019 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_hist_2018 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_hist_2017 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_hist_2016 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_hist_2015 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_hist_2014 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_hist_2013 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_hist_2012 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_hist_2011 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_hist_2010 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
 
     # ACT ELA
-    act_ela_hist_2025 = Column(Float)
-    act_ela_hist_2024 = Column(Float)
-    act_ela_hist_2023 = Column(Float)
-    act_ela_hist_2022 = Column(Float)
-    act_ela_hist_2021 = Column(Float)
-    act_ela_hist_2020 = Column(Float)
-    act_ela_hist_2019 = Column(Float)
-    act_ela_hist_2018 = Column(Float)
-    act_ela_hist_2017 = Column(Float)
-    act_ela_hist_2016 = Column(Float)
-    act_ela_hist_2015 = Column(Float)
-    act_ela_hist_2014 = Column(Float)
-    act_ela_hist_2013 = Column(Float)
-    act_ela_hist_2012 = Column(Float)
-    act_ela_hist_2011 = Column(Float)
-    act_ela_hist_2010 = Column(Float)
+    act_ela_hist_2025 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_ela_hist_2024 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_ela_hist_2023 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_ela_hist_2022 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_ela_hist_2021 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_ela_hist_2020 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_ela_hist_2019 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_ela_hist_2018 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_ela_hist_2017 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_ela_hist_2016 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_ela_hist_2015 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_ela_hist_2014 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_ela_hist_2013 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_ela_hist_2012 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_ela_hist_2011 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_ela_hist_2010 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
 
     # ACT Math
-    act_math_hist_2025 = Column(Float)
-    act_math_hist_2024 = Column(Float)
-    act_math_hist_2023 = Column(Float)
-    act_math_hist_2022 = Column(Float)
-    act_math_hist_2021 = Column(Float)
-    act_math_hist_2020 = Column(Float)
-    act_math_hist_2019 = Column(Float)
-    act_math_hist_2018 = Column(Float)
-    act_math_hist_2017 = Column(Float)
-    act_math_hist_2016 = Column(Float)
-    act_math_hist_2015 = Column(Float)
-    act_math_hist_2014 = Column(Float)
-    act_math_hist_2013 = Column(Float)
-    act_math_hist_2012 = Column(Float)
-    act_math_hist_2011 = Column(Float)
-    act_math_hist_2010 = Column(Float)
+    act_math_hist_2025 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_math_hist_2024 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_math_hist_2023 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_math_hist_2022 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_math_hist_2021 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_math_hist_2020 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_math_hist_2019 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_math_hist_2018 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_math_hist_2017 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_math_hist_2016 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_math_hist_2015 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_math_hist_2014 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_math_hist_2013 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_math_hist_2012 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_math_hist_2011 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_math_hist_2010 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
 
     # ACT Science
-    act_science_hist_2025 = Column(Float)
-    act_science_hist_2024 = Column(Float)
-    act_science_hist_2023 = Column(Float)
-    act_science_hist_2022 = Column(Float)
-    act_science_hist_2021 = Column(Float)
-    act_science_hist_2020 = Column(Float)
-    act_science_hist_2019 = Column(Float)
-    act_science_hist_2018 = Column(Float)
-    act_science_hist_2017 = Column(Float)
-    act_science_hist_2016 = Column(Float)
-    act_science_hist_2015 = Column(Float)
-    act_science_hist_2014 = Column(Float)
-    act_science_hist_2013 = Column(Float)
-    act_science_hist_2012 = Column(Float)
-    act_science_hist_2011 = Column(Float)
-    act_science_hist_2010 = Column(Float)
+    act_science_hist_2025 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_science_hist_2024 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_science_hist_2023 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_science_hist_2022 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_science_hist_2021 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_science_hist_2020 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_science_hist_2019 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_science_hist_2018 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_science_hist_2017 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_science_hist_2016 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_science_hist_2015 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_science_hist_2014 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_science_hist_2013 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_science_hist_2012 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_science_hist_2011 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    act_science_hist_2010 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
 
     # English Learners
-    el_hist_2025 = Column(Float)
-    el_hist_2024 = Column(Float)
-    el_hist_2023 = Column(Float)
-    el_hist_2022 = Column(Float)
-    el_hist_2021 = Column(Float)
-    el_hist_2020 = Column(Float)
-    el_hist_2019 = Column(Float)
-    el_hist_2018 = Column(Float)
-    el_hist_2017 = Column(Float)
-    el_hist_2016 = Column(Float)
-    el_hist_2015 = Column(Float)
-    el_hist_2014 = Column(Float)
-    el_hist_2013 = Column(Float)
-    el_hist_2012 = Column(Float)
-    el_hist_2011 = Column(Float)
-    el_hist_2010 = Column(Float)
+    el_hist_2025 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    el_hist_2024 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    el_hist_2023 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    el_hist_2022 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    el_hist_2021 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    el_hist_2020 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    el_hist_2019 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    el_hist_2018 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    el_hist_2017 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    el_hist_2016 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    el_hist_2015 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    el_hist_2014 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    el_hist_2013 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    el_hist_2012 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    el_hist_2011 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    el_hist_2010 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
 
     # Low Income
-    low_income_hist_2025 = Column(Float)
-    low_income_hist_2024 = Column(Float)
-    low_income_hist_2023 = Column(Float)
-    low_income_hist_2022 = Column(Float)
-    low_income_hist_2021 = Column(Float)
-    low_income_hist_2020 = Column(Float)
-    low_income_hist_2019 = Column(Float)
-    low_income_hist_2018 = Column(Float)
-    low_income_hist_2017 = Column(Float)
-    low_income_hist_2016 = Column(Float)
-    low_income_hist_2015 = Column(Float)
-    low_income_hist_2014 = Column(Float)
-    low_income_hist_2013 = Column(Float)
-    low_income_hist_2012 = Column(Float)
-    low_income_hist_2011 = Column(Float)
-    low_income_hist_2010 = Column(Float)
+    low_income_hist_2025 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    low_income_hist_2024 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    low_income_hist_2023 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    low_income_hist_2022 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    low_income_hist_2021 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    low_income_hist_2020 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    low_income_hist_2019 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    low_income_hist_2018 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    low_income_hist_2017 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    low_income_hist_2016 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    low_income_hist_2015 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    low_income_hist_2014 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    low_income_hist_2013 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    low_income_hist_2012 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    low_income_hist_2011 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    low_income_hist_2010 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
 
     # White
-    white_hist_2025 = Column(Float)
-    white_hist_2024 = Column(Float)
-    white_hist_2023 = Column(Float)
-    white_hist_2022 = Column(Float)
-    white_hist_2021 = Column(Float)
-    white_hist_2020 = Column(Float)
-    white_hist_2019 = Column(Float)
-    white_hist_2018 = Column(Float)
-    white_hist_2017 = Column(Float)
-    white_hist_2016 = Column(Float)
-    white_hist_2015 = Column(Float)
-    white_hist_2014 = Column(Float)
-    white_hist_2013 = Column(Float)
-    white_hist_2012 = Column(Float)
-    white_hist_2011 = Column(Float)
-    white_hist_2010 = Column(Float)
+    white_hist_2025 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    white_hist_2024 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    white_hist_2023 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    white_hist_2022 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    white_hist_2021 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    white_hist_2020 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    white_hist_2019 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    white_hist_2018 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    white_hist_2017 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    white_hist_2016 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    white_hist_2015 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    white_hist_2014 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    white_hist_2013 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    white_hist_2012 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    white_hist_2011 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    white_hist_2010 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
 
     # Black
-    black_hist_2025 = Column(Float)
-    black_hist_2024 = Column(Float)
-    black_hist_2023 = Column(Float)
-    black_hist_2022 = Column(Float)
-    black_hist_2021 = Column(Float)
-    black_hist_2020 = Column(Float)
-    black_hist_2019 = Column(Float)
-    black_hist_2018 = Column(Float)
-    black_hist_2017 = Column(Float)
-    black_hist_2016 = Column(Float)
-    black_hist_2015 = Column(Float)
-    black_hist_2014 = Column(Float)
-    black_hist_2013 = Column(Float)
-    black_hist_2012 = Column(Float)
-    black_hist_2011 = Column(Float)
-    black_hist_2010 = Column(Float)
+    black_hist_2025 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    black_hist_2024 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    black_hist_2023 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    black_hist_2022 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    black_hist_2021 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    black_hist_2020 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    black_hist_2019 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    black_hist_2018 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    black_hist_2017 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    black_hist_2016 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    black_hist_2015 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    black_hist_2014 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    black_hist_2013 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    black_hist_2012 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    black_hist_2011 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    black_hist_2010 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
 
     # Hispanic
-    hispanic_hist_2025 = Column(Float)
-    hispanic_hist_2024 = Column(Float)
-    hispanic_hist_2023 = Column(Float)
-    hispanic_hist_2022 = Column(Float)
-    hispanic_hist_2021 = Column(Float)
-    hispanic_hist_2020 = Column(Float)
-    hispanic_hist_2019 = Column(Float)
-    hispanic_hist_2018 = Column(Float)
-    hispanic_hist_2017 = Column(Float)
-    hispanic_hist_2016 = Column(Float)
-    hispanic_hist_2015 = Column(Float)
-    hispanic_hist_2014 = Column(Float)
-    hispanic_hist_2013 = Column(Float)
-    hispanic_hist_2012 = Column(Float)
-    hispanic_hist_2011 = Column(Float)
-    hispanic_hist_2010 = Column(Float)
+    hispanic_hist_2025 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    hispanic_hist_2024 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    hispanic_hist_2023 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    hispanic_hist_2022 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    hispanic_hist_2021 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    hispanic_hist_2020 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    hispanic_hist_2019 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    hispanic_hist_2018 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    hispanic_hist_2017 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    hispanic_hist_2016 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    hispanic_hist_2015 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    hispanic_hist_2014 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    hispanic_hist_2013 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    hispanic_hist_2012 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    hispanic_hist_2011 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    hispanic_hist_2010 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
 
     # Asian
-    asian_hist_2025 = Column(Float)
-    asian_hist_2024 = Column(Float)
-    asian_hist_2023 = Column(Float)
-    asian_hist_2022 = Column(Float)
-    asian_hist_2021 = Column(Float)
-    asian_hist_2020 = Column(Float)
-    asian_hist_2019 = Column(Float)
-    asian_hist_2018 = Column(Float)
-    asian_hist_2017 = Column(Float)
-    asian_hist_2016 = Column(Float)
-    asian_hist_2015 = Column(Float)
-    asian_hist_2014 = Column(Float)
-    asian_hist_2013 = Column(Float)
-    asian_hist_2012 = Column(Float)
-    asian_hist_2011 = Column(Float)
-    asian_hist_2010 = Column(Float)
+    asian_hist_2025 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    asian_hist_2024 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    asian_hist_2023 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    asian_hist_2022 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    asian_hist_2021 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    asian_hist_2020 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    asian_hist_2019 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    asian_hist_2018 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    asian_hist_2017 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    asian_hist_2016 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    asian_hist_2015 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    asian_hist_2014 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    asian_hist_2013 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    asian_hist_2012 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    asian_hist_2011 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    asian_hist_2010 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
 
     # Pacific Islander
-    pacific_islander_hist_2025 = Column(Float)
-    pacific_islander_hist_2024 = Column(Float)
-    pacific_islander_hist_2023 = Column(Float)
-    pacific_islander_hist_2022 = Column(Float)
-    pacific_islander_hist_2021 = Column(Float)
-    pacific_islander_hist_2020 = Column(Float)
-    pacific_islander_hist_2019 = Column(Float)
-    pacific_islander_hist_2018 = Column(Float)
-    pacific_islander_hist_2017 = Column(Float)
-    pacific_islander_hist_2016 = Column(Float)
-    pacific_islander_hist_2015 = Column(Float)
-    pacific_islander_hist_2014 = Column(Float)
-    pacific_islander_hist_2013 = Column(Float)
-    pacific_islander_hist_2012 = Column(Float)
-    pacific_islander_hist_2011 = Column(Float)
-    pacific_islander_hist_2010 = Column(Float)
+    pacific_islander_hist_2025 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    pacific_islander_hist_2024 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    pacific_islander_hist_2023 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    pacific_islander_hist_2022 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    pacific_islander_hist_2021 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    pacific_islander_hist_2020 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    pacific_islander_hist_2019 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    pacific_islander_hist_2018 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    pacific_islander_hist_2017 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    pacific_islander_hist_2016 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    pacific_islander_hist_2015 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    pacific_islander_hist_2014 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    pacific_islander_hist_2013 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    pacific_islander_hist_2012 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    pacific_islander_hist_2011 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    pacific_islander_hist_2010 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
 
     # Native American
-    native_american_hist_2025 = Column(Float)
-    native_american_hist_2024 = Column(Float)
-    native_american_hist_2023 = Column(Float)
-    native_american_hist_2022 = Column(Float)
-    native_american_hist_2021 = Column(Float)
-    native_american_hist_2020 = Column(Float)
-    native_american_hist_2019 = Column(Float)
-    native_american_hist_2018 = Column(Float)
-    native_american_hist_2017 = Column(Float)
-    native_american_hist_2016 = Column(Float)
-    native_american_hist_2015 = Column(Float)
-    native_american_hist_2014 = Column(Float)
-    native_american_hist_2013 = Column(Float)
-    native_american_hist_2012 = Column(Float)
-    native_american_hist_2011 = Column(Float)
-    native_american_hist_2010 = Column(Float)
+    native_american_hist_2025 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    native_american_hist_2024 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    native_american_hist_2023 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    native_american_hist_2022 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    native_american_hist_2021 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    native_american_hist_2020 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    native_american_hist_2019 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    native_american_hist_2018 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    native_american_hist_2017 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    native_american_hist_2016 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    native_american_hist_2015 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    native_american_hist_2014 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    native_american_hist_2013 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    native_american_hist_2012 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    native_american_hist_2011 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    native_american_hist_2010 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
 
     # Two or More
-    two_or_more_hist_2025 = Column(Float)
-    two_or_more_hist_2024 = Column(Float)
-    two_or_more_hist_2023 = Column(Float)
-    two_or_more_hist_2022 = Column(Float)
-    two_or_more_hist_2021 = Column(Float)
-    two_or_more_hist_2020 = Column(Float)
-    two_or_more_hist_2019 = Column(Float)
-    two_or_more_hist_2018 = Column(Float)
-    two_or_more_hist_2017 = Column(Float)
-    two_or_more_hist_2016 = Column(Float)
-    two_or_more_hist_2015 = Column(Float)
-    two_or_more_hist_2014 = Column(Float)
-    two_or_more_hist_2013 = Column(Float)
-    two_or_more_hist_2012 = Column(Float)
-    two_or_more_hist_2011 = Column(Float)
-    two_or_more_hist_2010 = Column(Float)
+    two_or_more_hist_2025 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    two_or_more_hist_2024 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    two_or_more_hist_2023 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    two_or_more_hist_2022 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    two_or_more_hist_2021 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    two_or_more_hist_2020 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    two_or_more_hist_2019 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    two_or_more_hist_2018 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    two_or_more_hist_2017 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    two_or_more_hist_2016 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    two_or_more_hist_2015 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    two_or_more_hist_2014 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    two_or_more_hist_2013 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    two_or_more_hist_2012 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    two_or_more_hist_2011 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    two_or_more_hist_2010 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
 
     # MENA
-    mena_hist_2025 = Column(Float)
-    mena_hist_2024 = Column(Float)
-    mena_hist_2023 = Column(Float)
-    mena_hist_2022 = Column(Float)
-    mena_hist_2021 = Column(Float)
-    mena_hist_2020 = Column(Float)
-    mena_hist_2019 = Column(Float)
-    mena_hist_2018 = Column(Float)
-    mena_hist_2017 = Column(Float)
-    mena_hist_2016 = Column(Float)
-    mena_hist_2015 = Column(Float)
-    mena_hist_2014 = Column(Float)
-    mena_hist_2013 = Column(Float)
-    mena_hist_2012 = Column(Float)
-    mena_hist_2011 = Column(Float)
-    mena_hist_2010 = Column(Float)
+    mena_hist_2025 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    mena_hist_2024 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    mena_hist_2023 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    mena_hist_2022 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    mena_hist_2021 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    mena_hist_2020 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    mena_hist_2019 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    mena_hist_2018 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    mena_hist_2017 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    mena_hist_2016 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    mena_hist_2015 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    mena_hist_2014 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    mena_hist_2013 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    mena_hist_2012 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    mena_hist_2011 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+    mena_hist_2010 = deferred(Column(Float), group=HISTORY_COLUMN_GROUP)
+
+    # sha256 of the imported field values; incremental imports skip unchanged rows.
+    # Deferred because only the importer reads it.
+    content_hash = deferred(Column(String(64)))
 
     created_at = Column(DateTime, default=lambda: datetime.now(UTC))
 
@@ -390,16 +424,214 @@ class School(Base):
         return f"<School(rcdts='{self.rcdts}', name='{self.school_name}', city='{self.city}')>"
 
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./data/schools.db"
+class SchoolMetricHistory(Base):
+    """One historical value per school, metric, and year (long format)."""
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False}
-)
+    __tablename__ = "school_metric_history"
+    # WITHOUT ROWID stores rows inside the primary key b-tree, so the key is a
+    # covering index for per-school lookups
+    __table_args__ = {"sqlite_with_rowid": False}
+
+    school_id = Column(Integer, ForeignKey("schools.id", ondelete="CASCADE"), primary_key=True)
+    metric = Column(String(32), primary_key=True)
+    year = Column(Integer, primary_key=True)
+    value = Column(Float, nullable=False)
+
+
+class SchemaMeta(Base):
+    """Key/value bookkeeping for derived structures such as the FTS index."""
+
+    __tablename__ = "schema_meta"
+
+    key = Column(String(64), primary_key=True)
+    value = Column(Text, nullable=False)
+
+
+class SchoolDetailJSON(Base):
+    """Pre-serialized SchoolDetail response body, materialized at import time."""
+
+    __tablename__ = "school_detail_json"
+
+    rcdts = Column(String(20), primary_key=True)
+    payload = Column(LargeBinary, nullable=False)
+
+
+DATABASE_PATH = "./data/schools.db"
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
+
+DATABASE_MODE_READWRITE = "readwrite"
+DATABASE_MODE_IMMUTABLE = "immutable"
+DATABASE_MODE_MEMORY = "memory"
+DATABASE_MODES = {DATABASE_MODE_READWRITE, DATABASE_MODE_IMMUTABLE, DATABASE_MODE_MEMORY}
+
+SQLITE_JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+SQLITE_TEMP_STORES = {"DEFAULT", "FILE", "MEMORY"}
+DEFAULT_SQLITE_MMAP_SIZE = 256 * 1024 * 1024  # bytes; covers the whole database file
+DEFAULT_SQLITE_CACHE_SIZE = -64 * 1024  # negative means KiB, so 64 MiB per connection
+
+
+def sqlite_pragmas_from_env(environ: Mapping[str, str] = os.environ) -> Dict[str, str]:
+    """Read SQLite connection pragmas from SQLITE_* environment variables."""
+    journal_mode = environ.get("SQLITE_JOURNAL_MODE", "WAL").upper()
+    if journal_mode not in SQLITE_JOURNAL_MODES:
+        raise ValueError(f"Unsupported SQLITE_JOURNAL_MODE: {journal_mode}")
+    temp_store = environ.get("SQLITE_TEMP_STORE", "MEMORY").upper()
+    if temp_store not in SQLITE_TEMP_STORES:
+        raise ValueError(f"Unsupported SQLITE_TEMP_STORE: {temp_store}")
+
+    # journal_mode must be set before query_only, which forbids the switch to WAL
+    return {
+        "journal_mode": journal_mode,
+        "mmap_size": str(int(environ.get("SQLITE_MMAP_SIZE", DEFAULT_SQLITE_MMAP_SIZE))),
+        "cache_size": str(int(environ.get("SQLITE_CACHE_SIZE", DEFAULT_SQLITE_CACHE_SIZE))),
+        "temp_store": temp_store,
+        "query_only": "ON" if environ.get("SQLITE_QUERY_ONLY", "").lower() in {"1", "true", "on"} else "OFF",
+    }
+
+
+def configure_sqlite_pragmas(target_engine, pragmas: Mapping[str, str]) -> None:
+    """Apply the given pragmas to every new DBAPI connection of the engine."""
+
+    @event.listens_for(target_engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
+
+
+def database_file_identity(database_path: str) -> Optional[Tuple[int, int]]:
+    """(device, inode) of the database file, or None when it does not exist."""
+    try:
+        stat = os.stat(database_path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_dev, stat.st_ino)
+
+
+# File each engine was built against, compared by reopen_engine_if_replaced
+_engine_file_identities = weakref.WeakKeyDictionary()
+# Anchor connection of each memory-mode engine: a shared-cache in-memory
+# database is freed once its last connection closes, so the anchor lives
+# exactly as long as the engine and keeps the copy alive between checkouts
+_memory_anchors = weakref.WeakKeyDictionary()
+
+
+def build_engine(
+    mode: str = DATABASE_MODE_READWRITE,
+    database_path: str = DATABASE_PATH,
+    pragmas: Optional[Mapping[str, str]] = None,
+):
+    """Create the engine for a serving mode: readwrite, immutable, or memory."""
+    if mode not in DATABASE_MODES:
+        raise ValueError(f"Unsupported DATABASE_MODE: {mode}")
+    pragmas = dict(sqlite_pragmas_from_env() if pragmas is None else pragmas)
+    # Taken before anything opens the file, so a swap racing this build is
+    # seen as a newer file and costs at most one extra rebuild
+    identity = database_file_identity(database_path)
+
+    if mode == DATABASE_MODE_READWRITE:
+        target_engine = create_engine(
+            f"sqlite:///{database_path}",
+            connect_args={"check_same_thread": False}
+        )
+        configure_sqlite_pragmas(target_engine, pragmas)
+        _engine_file_identities[target_engine] = identity
+        return target_engine
+
+    # Read-only modes: the file is never written, so journaling is irrelevant
+    pragmas.pop("journal_mode", None)
+    pragmas["query_only"] = "ON"
+    file_uri = Path(database_path).resolve().as_uri()
+
+    if mode == DATABASE_MODE_IMMUTABLE:
+        # immutable=1 tells SQLite the file cannot change: no locks, no change checks
+        target_engine = create_engine(
+            f"sqlite:///{file_uri}?mode=ro&immutable=1&uri=true",
+            connect_args={"check_same_thread": False}
+        )
+        configure_sqlite_pragmas(target_engine, pragmas)
+        _engine_file_identities[target_engine] = identity
+        return target_engine
+
+    # memory: copy the file once into a shared-cache in-memory database
+    memory_uri = f"file:schools-{uuid.uuid4().hex}?mode=memory&cache=shared"
+    anchor = sqlite3.connect(memory_uri, uri=True, check_same_thread=False)
+    source = sqlite3.connect(f"{file_uri}?mode=ro", uri=True)
+    try:
+        source.backup(anchor)
+    finally:
+        source.close()
+
+    def connect_to_memory_copy():
+        return sqlite3.connect(memory_uri, uri=True, check_same_thread=False)
+
+    target_engine = create_engine("sqlite://", creator=connect_to_memory_copy, poolclass=QueuePool)
+    configure_sqlite_pragmas(target_engine, pragmas)
+    _memory_anchors[target_engine] = anchor
+    _engine_file_identities[target_engine] = identity
+    return target_engine
+
+
+DATABASE_MODE = os.environ.get("DATABASE_MODE", DATABASE_MODE_READWRITE).lower()
+
+engine = build_engine(DATABASE_MODE)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def database_file_signature(db: Session) -> Optional[Tuple]:
+    """Identify the session's on-disk database file, including its WAL sidecar.
+
+    Changes on an in-place write as well as on a swap, so in-process caches
+    built from the database compare it to decide when to rebuild.
+    """
+    database = db.get_bind().url.database
+    if not database or database == ":memory:":
+        return None
+    if database.startswith("file:"):
+        # URI filenames from the read-only serving modes
+        database = unquote(urlparse(database).path)
+    path = Path(database)
+    signature = []
+    for candidate in (path, path.with_name(f"{path.name}-wal")):
+        try:
+            stat = candidate.stat()
+        except FileNotFoundError:
+            signature.append(None)
+            continue
+        signature.append((stat.st_ino, stat.st_size, stat.st_mtime_ns))
+    return tuple(signature)
+
+
+_engine_lock = threading.Lock()
+
+
+def reopen_engine_if_replaced() -> bool:
+    """
+    Rebuild the engine when an import has renamed a new file over DATABASE_PATH.
+
+    Pooled connections keep reading the old inode, so the pool is replaced and
+    sessions created from now on open the new file. Returns True on a swap.
+    """
+    global engine
+    identity = database_file_identity(DATABASE_PATH)
+    if identity is None or identity == _engine_file_identities.get(engine):
+        return False
+
+    with _engine_lock:
+        if identity == _engine_file_identities.get(engine):
+            return False
+        previous = engine
+        engine = build_engine(DATABASE_MODE, DATABASE_PATH)
+        SessionLocal.configure(bind=engine)
+    # Checked-out connections finish their request and are closed on return
+    previous.dispose()
+    return True
+
+
 def get_db():
     """Dependency for FastAPI routes."""
     db = SessionLocal()
@@ -410,113 +642,258 @@ def get_db():
 
 
 def init_db():
-    """Initialize database tables."""
+    """Initialize database tables and build the FTS index if it is missing or stale."""
     Base.metadata.create_all(bind=engine)
-    create_fts_index(engine)
+    ensure_fts_index(engine)
+
+
+def missing_schema_objects(target_engine) -> List[str]:
+    """Tables and table.column names of the current schema absent from an imported database."""
+    inspector = inspect(target_engine)
+    tables = set(inspector.get_table_names())
+    if "schools" not in tables:
+        # Nothing imported yet; the importer creates the full schema
+        return []
+
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in tables:
+            missing.append(table.name)
+            continue
+        present = {column["name"] for column in inspector.get_columns(table.name)}
+        missing.extend(f"{table.name}.{column.name}" for column in table.columns if column.name not in present)
+    return missing
+
+
+def ensure_current_schema(target_engine, mode: str = DATABASE_MODE_READWRITE) -> None:
+    """
+    Bring a database imported by an older importer up to the current schema.
+
+    Read-only serving modes cannot write, so they refuse to start instead of
+    failing on the first request that touches a missing table or column.
+    """
+    missing = missing_schema_objects(target_engine)
+    if not missing:
+        return
+    if mode != DATABASE_MODE_READWRITE:
+        raise RuntimeError(
+            f"{DATABASE_PATH} predates the current schema (missing {', '.join(missing)}); "
+            "re-import it or start once with DATABASE_MODE=readwrite to upgrade it"
+        )
+
+    Base.metadata.create_all(bind=target_engine)
+    with target_engine.begin() as conn:
+        for name in missing:
+            table_name, _, column_name = name.partition(".")
+            if column_name:
+                column = Base.metadata.tables[table_name].columns[column_name]
+                column_type = column.type.compile(dialect=target_engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}"))
+
+
+FTS_COLUMN_WEIGHTS = (10.0, 5.0, 1.0)  # school_name, city, district
+FTS_RANK_FUNCTION = f"bm25({', '.join(str(weight) for weight in FTS_COLUMN_WEIGHTS)})"
+
+FTS_TRIGGERS = ("schools_fts_insert", "schools_fts_delete", "schools_fts_update")
+
+FTS_SCHEMA_DDL = (
+    """
+    CREATE VIRTUAL TABLE schools_fts USING fts5(
+        school_name,
+        city,
+        district,
+        content=schools,
+        content_rowid=id,
+        prefix='2 3 4'
+    )
+    """,
+    """
+    CREATE TRIGGER schools_fts_insert AFTER INSERT ON schools BEGIN
+        INSERT INTO schools_fts(rowid, school_name, city, district)
+        VALUES (new.id, new.school_name, new.city, new.district);
+    END
+    """,
+    # schools_fts is an external-content table, so removing a row's tokens
+    # needs the 'delete' command with the old values
+    """
+    CREATE TRIGGER schools_fts_delete AFTER DELETE ON schools BEGIN
+        INSERT INTO schools_fts(schools_fts, rowid, school_name, city, district)
+        VALUES ('delete', old.id, old.school_name, old.city, old.district);
+    END
+    """,
+    # Metric-only updates (trend refreshes, incremental imports) skip the index
+    """
+    CREATE TRIGGER schools_fts_update AFTER UPDATE OF school_name, city, district ON schools BEGIN
+        INSERT INTO schools_fts(schools_fts, rowid, school_name, city, district)
+        VALUES ('delete', old.id, old.school_name, old.city, old.district);
+        INSERT INTO schools_fts(rowid, school_name, city, district)
+        VALUES (new.id, new.school_name, new.city, new.district);
+    END
+    """,
+)
+
+# Any change to the FTS DDL or ranking changes this hash and forces a rebuild
+FTS_SCHEMA_HASH = hashlib.sha256(
+    "\n".join((*FTS_SCHEMA_DDL, FTS_RANK_FUNCTION)).encode("utf-8")
+).hexdigest()
+
+META_FTS_SCHEMA_HASH = "fts_schema_hash"
+META_FTS_ROW_COUNT = "fts_row_count"
+
+
+def fts_index_is_current(target_engine) -> bool:
+    """Return True when schools_fts exists, matches the current DDL, and covers every school."""
+    with target_engine.connect() as conn:
+        objects = {
+            row.name
+            for row in conn.execute(
+                text(
+                    "SELECT name FROM sqlite_master "
+                    "WHERE name IN ('schools_fts', 'schema_meta', "
+                    "'schools_fts_insert', 'schools_fts_delete', 'schools_fts_update')"
+                )
+            )
+        }
+        if not {"schools_fts", "schema_meta", *FTS_TRIGGERS} <= objects:
+            return False
+
+        stored_hash = conn.execute(
+            select(SchemaMeta.value).where(SchemaMeta.key == META_FTS_SCHEMA_HASH)
+        ).scalar()
+        if stored_hash != FTS_SCHEMA_HASH:
+            return False
+
+        indexed_rows = conn.execute(text("SELECT COUNT(*) FROM schools_fts_docsize")).scalar()
+        school_rows = conn.execute(text("SELECT COUNT(*) FROM schools")).scalar()
+        return indexed_rows == school_rows
+
+
+def ensure_fts_index(target_engine) -> bool:
+    """Rebuild the FTS index only when it is missing or stale; return True if rebuilt."""
+    if fts_index_is_current(target_engine):
+        return False
+    create_fts_index(target_engine)
+    return True
 
 
 def create_fts_index(target_engine):
     """Create and sync FTS5 virtual table for School search."""
     with target_engine.connect() as conn:
-        conn.execute(text("DROP TRIGGER IF EXISTS schools_fts_insert"))
-        conn.execute(text("DROP TRIGGER IF EXISTS schools_fts_delete"))
-        conn.execute(text("DROP TRIGGER IF EXISTS schools_fts_update"))
+        # pysqlite does not open transactions for DDL on its own; begin one
+        # explicitly so readers keep the old index until the rebuild commits.
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+        SchemaMeta.__table__.create(conn, checkfirst=True)
+        for trigger in FTS_TRIGGERS:
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
         conn.execute(text("DROP TABLE IF EXISTS schools_fts"))
+        for statement in FTS_SCHEMA_DDL:
+            conn.execute(text(statement))
+        # Persist weighted bm25 as the default rank so ORDER BY rank prefers
+        # school name matches over city, and city over district.
         conn.execute(
-            text(
-                """
-                CREATE VIRTUAL TABLE schools_fts USING fts5(
-                    school_name,
-                    city,
-                    district,
-                    content=schools,
-                    content_rowid=id
-                )
-                """
-            )
-        )
-        conn.execute(
-            text(
-                """
-                CREATE TRIGGER schools_fts_insert AFTER INSERT ON schools BEGIN
-                    INSERT INTO schools_fts(rowid, school_name, city, district)
-                    VALUES (new.id, new.school_name, new.city, new.district);
-                END
-                """
-            )
-        )
-        conn.execute(
-            text(
-                """
-                CREATE TRIGGER schools_fts_delete AFTER DELETE ON schools BEGIN
-                    DELETE FROM schools_fts WHERE rowid = old.id;
-                END
-                """
-            )
-        )
-        conn.execute(
-            text(
-                """
-                CREATE TRIGGER schools_fts_update AFTER UPDATE ON schools BEGIN
-                    UPDATE schools_fts
-                    SET school_name = new.school_name,
-                        city = new.city,
-                        district = new.district
-                    WHERE rowid = new.id;
-                END
-                """
-            )
+            text("INSERT INTO schools_fts(schools_fts, rank) VALUES ('rank', :rank)"),
+            {"rank": FTS_RANK_FUNCTION},
         )
         # Populate FTS table with existing data from schools table
-        conn.execute(
-            text(
-                """
-                INSERT INTO schools_fts(rowid, school_name, city, district)
-                SELECT id, school_name, city, district FROM schools
-                """
-            )
-        )
+        conn.execute(text("INSERT INTO schools_fts(schools_fts) VALUES ('rebuild')"))
+
+        row_count = conn.execute(text("SELECT COUNT(*) FROM schools")).scalar()
+        _set_meta(conn, META_FTS_SCHEMA_HASH, FTS_SCHEMA_HASH)
+        _set_meta(conn, META_FTS_ROW_COUNT, str(row_count))
         conn.commit()
 
 
-def search_schools(db: Session, query: str, limit: int = 10) -> List[School]:
-    """Search schools via FTS5 index and return ordered School objects."""
+def _set_meta(conn, key: str, value: str) -> None:
+    conn.execute(
+        text(
+            """
+            INSERT INTO schema_meta(key, value) VALUES (:key, :value)
+            ON CONFLICT(key) DO UPDATE SET value = excluded.value
+            """
+        ),
+        {"key": key, "value": value},
+    )
+
+
+def build_fts_match_query(query: str) -> str:
+    """Turn free text into an FTS5 query that prefix-matches the last token."""
+    cleaned_query = re.sub(r"[^\w\s]", " ", query or "")
+    tokens = cleaned_query.split()
+    if not tokens:
+        return ""
+
+    # Quote every token so words like AND/OR/NOT are never parsed as operators;
+    # the trailing * lets the partially typed last word use the prefix index.
+    phrases = [f'"{token}"' for token in tokens]
+    phrases[-1] += "*"
+    return " ".join(phrases)
+
+
+def search_schools(db: Session, query: str, limit: int = 10) -> List[Row]:
+    """Search schools via FTS5 index and return ordered lightweight result rows."""
     if not query:
         return []
 
-    cleaned_query = re.sub(r"[^\w\s]", " ", query)
-    cleaned_query = re.sub(r"\s+", " ", cleaned_query).strip()
-
-    if not cleaned_query:
+    match_query = build_fts_match_query(query)
+    if not match_query:
         return []
 
     limit = max(1, min(limit, 50))
 
+    # Project only the SchoolSearchResult fields so a search is one query
+    # and never hydrates the wide School row.
     stmt = text(
         """
-        SELECT s.id FROM schools s
-        JOIN schools_fts ON s.id = schools_fts.rowid
+        SELECT s.id, s.rcdts, s.school_name, s.city, s.district, s.school_type
+        FROM schools_fts
+        JOIN schools s ON s.id = schools_fts.rowid
         WHERE schools_fts MATCH :query
         ORDER BY rank
         LIMIT :limit
         """
     )
 
-    rows = db.execute(stmt, {"query": cleaned_query, "limit": limit}).fetchall()
-    school_ids = [row.id for row in rows]
+    return list(db.execute(stmt, {"query": match_query, "limit": limit}).all())
 
-    results: List[School] = []
-    for school_id in school_ids:
-        school = db.get(School, school_id)
-        if school:
-            results.append(school)
 
-    return results
+def get_school_by_rcdts(
+    db: Session, rcdts: str, column_groups: Sequence[str] = ()
+) -> Optional[School]:
+    """Retrieve a single School by its RCDTS identifier, undeferring the given column groups."""
+    if not rcdts:
+        return None
+
+    return (
+        db.query(School)
+        .options(*(undefer_group(group) for group in column_groups))
+        .filter(School.rcdts == rcdts)
+        .first()
+    )
+
+
+def get_schools_by_rcdts(
+    db: Session, rcdts_codes: List[str], column_groups: Sequence[str] = ()
+) -> Dict[str, School]:
+    """Retrieve several Schools in one query, keyed by RCDTS."""
+    codes = list(dict.fromkeys(code for code in rcdts_codes if code))
+    if not codes:
+        return {}
+
+    schools = (
+        db.query(School)
+        .options(*(undefer_group(group) for group in column_groups))
+        .filter(School.rcdts.in_(codes))
+        .all()
+    )
+    return {school.rcdts: school for school in schools}
 
 
-def get_school_by_rcdts(db: Session, rcdts: str) -> Optional[School]:
-    """Retrieve a single School by its RCDTS identifier."""
+def get_school_detail_json(db: Session, rcdts: str) -> Optional[bytes]:
+    """Return the materialized SchoolDetail JSON for an RCDTS, if present."""
     if not rcdts:
         return None
 
-    return db.query(School).filter(School.rcdts == rcdts).first()
+    row = db.execute(
+        select(SchoolDetailJSON.payload).where(SchoolDetailJSON.rcdts == rcdts)
+    ).first()
+    return row.payload if row else None
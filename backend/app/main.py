@@ -2,6 +2,8 @@
 # ABOUTME: Initializes app, registers routers, and configures middleware
 
 import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
@@ -10,11 +12,34 @@ from sqlalchemy.exc import OperationalError
 from app.api.search import router as search_router
 from app.api.schools import router as schools_router
 from app.api.top_scores import router as top_scores_router
+from app import database
+from app.services.autocomplete import load_autocomplete_index
+from app.services.metric_history import ensure_metric_history
+from app.services.snapshot import load_school_snapshot
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Upgrade older databases and warm in-memory indexes before serving the first request."""
+    db = database.SessionLocal()
+    try:
+        database.ensure_current_schema(database.engine, database.DATABASE_MODE)
+        ensure_metric_history(db, writable=database.DATABASE_MODE == database.DATABASE_MODE_READWRITE)
+        load_autocomplete_index(db)
+        load_school_snapshot(db)
+    except OperationalError:
+        # Database not imported yet; the index is built lazily on first use
+        pass
+    finally:
+        db.close()
+    yield
+
 
 app = FastAPI(
     title="Illinois School Explorer API",
     description="REST API for searching and comparing Illinois schools",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Configure CORS origins from environment variable or use defaults
@@ -30,6 +55,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def reopen_swapped_database(request: Request, call_next):
+    """Pick up a database file atomically swapped in by an import."""
+    # The snapshot and autocomplete index compare file signatures themselves,
+    # so they also pick up in-place incremental and trend updates
+    database.reopen_engine_if_replaced()
+    return await call_next(request)
+
+
 app.include_router(search_router)
 app.include_router(schools_router)
 app.include_router(top_scores_router)
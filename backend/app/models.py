@@ -84,6 +84,9 @@ class TrendMetrics(BaseModel):
 class HistoricalYearlyData(BaseModel):
     """Historical values by year for a single metric (2010-2025)."""
 
+    # Later years stored in school_metric_history serialize as extra yr_YYYY keys
+    model_config = ConfigDict(extra="allow")
+
     yr_2025: Optional[float] = None
     yr_2024: Optional[float] = None
     yr_2023: Optional[float] = None
@@ -185,3 +188,4 @@ class CompareResponse(BaseModel):
     """Response wrapper for compare endpoint."""
 
     schools: List[SchoolDetail]
+    missing: List[str] = []
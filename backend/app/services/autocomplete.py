@@ -0,0 +1,183 @@
+# ABOUTME: In-memory prefix index powering the search bar autocomplete endpoint
+# ABOUTME: Ranks schools by name/city/district token prefixes without touching SQLite
+
+from __future__ import annotations
+
+import heapq
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.database import School, database_file_signature
+
+FIELD_NAME = 0
+FIELD_CITY = 1
+FIELD_DISTRICT = 2
+
+# Higher weight wins when a query token matches several fields of one school
+FIELD_WEIGHTS = {
+    FIELD_NAME: 3.0,
+    FIELD_CITY: 2.0,
+    FIELD_DISTRICT: 1.0,
+}
+EXACT_TOKEN_BONUS = 0.5
+NAME_PREFIX_BONUS = 2.0
+
+# Keystroke prefixes repeat heavily across users, so cache per-prefix matches
+# and final rankings; the index is immutable once built.
+PREFIX_CACHE_SIZE = 4096
+QUERY_CACHE_SIZE = 4096
+
+_NON_WORD = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass(frozen=True)
+class AutocompleteEntry:
+    """School fields returned by autocomplete, mirroring SchoolSearchResult."""
+
+    id: int
+    rcdts: str
+    school_name: str
+    city: str
+    district: str | None
+    school_type: str | None
+
+
+def normalize_text(value: Optional[str]) -> str:
+    """Lowercase, strip accents and punctuation, and collapse whitespace."""
+    if not value:
+        return ""
+    folded = unicodedata.normalize("NFKD", value).encode("ascii", "ignore").decode("ascii")
+    cleaned = _NON_WORD.sub(" ", folded.lower())
+    return _WHITESPACE.sub(" ", cleaned).strip()
+
+
+def tokenize(value: Optional[str]) -> List[str]:
+    """Split a value into normalized tokens."""
+    normalized = normalize_text(value)
+    return normalized.split(" ") if normalized else []
+
+
+class AutocompleteIndex:
+    """Sorted token array over school name, city, and district for prefix lookups."""
+
+    def __init__(self, entries: Iterable[AutocompleteEntry]) -> None:
+        self.entries: List[AutocompleteEntry] = list(entries)
+        self._names: List[str] = [normalize_text(entry.school_name) for entry in self.entries]
+
+        postings: List[Tuple[str, int, int]] = []
+        for position, entry in enumerate(self.entries):
+            for field, value in (
+                (FIELD_NAME, entry.school_name),
+                (FIELD_CITY, entry.city),
+                (FIELD_DISTRICT, entry.district),
+            ):
+                for token in set(tokenize(value)):
+                    postings.append((token, position, field))
+
+        postings.sort()
+        self._tokens: List[str] = [token for token, _, _ in postings]
+        self._postings: List[Tuple[int, int]] = [(position, field) for _, position, field in postings]
+
+        self._match_prefix = lru_cache(maxsize=PREFIX_CACHE_SIZE)(self._match_prefix_uncached)
+        self._ranked = lru_cache(maxsize=QUERY_CACHE_SIZE)(self._ranked_uncached)
+
+    @classmethod
+    def from_db(cls, db: Session) -> "AutocompleteIndex":
+        """Build the index from the projected school columns in one query."""
+        rows = db.execute(
+            select(
+                School.id,
+                School.rcdts,
+                School.school_name,
+                School.city,
+                School.district,
+                School.school_type,
+            )
+        ).all()
+        return cls(AutocompleteEntry(*row) for row in rows)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def search(self, query: str, limit: int = 10) -> List[AutocompleteEntry]:
+        """Return schools whose tokens prefix-match every query token, best first."""
+        query_tokens = tuple(tokenize(query))
+        if not query_tokens or not self.entries:
+            return []
+        positions = self._ranked(query_tokens, max(1, limit))
+        return [self.entries[position] for position in positions]
+
+    def _ranked_uncached(self, query_tokens: Tuple[str, ...], limit: int) -> Tuple[int, ...]:
+        scores: Optional[Dict[int, float]] = None
+        for query_token in dict.fromkeys(query_tokens):
+            token_scores = self._match_prefix(query_token)
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {
+                    position: score + token_scores[position]
+                    for position, score in scores.items()
+                    if position in token_scores
+                }
+            if not scores:
+                return ()
+
+        normalized_query = " ".join(query_tokens)
+        ranked = []
+        for position, score in scores.items():
+            name = self._names[position]
+            if name.startswith(normalized_query):
+                score += NAME_PREFIX_BONUS
+            ranked.append((-score, len(name), name, position))
+
+        return tuple(position for _, _, _, position in heapq.nsmallest(limit, ranked))
+
+    def _match_prefix_uncached(self, prefix: str) -> Dict[int, float]:
+        """Best field score per school for tokens starting with the prefix."""
+        matches: Dict[int, float] = {}
+        start = bisect_left(self._tokens, prefix)
+        for offset in range(start, len(self._tokens)):
+            token = self._tokens[offset]
+            if not token.startswith(prefix):
+                break
+            position, field = self._postings[offset]
+            score = FIELD_WEIGHTS[field]
+            if token == prefix:
+                score += EXACT_TOKEN_BONUS
+            if score > matches.get(position, 0.0):
+                matches[position] = score
+        return matches
+
+
+_index: Optional[AutocompleteIndex] = None
+_signature: Optional[Tuple] = None
+_index_lock = threading.Lock()
+
+
+def load_autocomplete_index(db: Session) -> AutocompleteIndex:
+    """Return the process-wide index, rebuilding it when the database file changes."""
+    global _index, _signature
+    signature = database_file_signature(db)
+    if _index is None or signature != _signature:
+        with _index_lock:
+            if _index is None or signature != _signature:
+                _index = AutocompleteIndex.from_db(db)
+                _signature = signature
+    return _index
+
+
+def reset_autocomplete_index() -> None:
+    """Drop the cached index so the next lookup rebuilds it."""
+    global _index, _signature
+    with _index_lock:
+        _index = None
+        _signature = None
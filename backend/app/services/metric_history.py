@@ -0,0 +1,153 @@
+# ABOUTME: Long-format school_metric_history table maintenance and lookups
+# ABOUTME: Importers write (school, metric, year, value) rows straight from the trend batch output
+
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.orm import Session
+
+from app.database import School, SchoolMetricHistory
+
+HISTORICAL_FIELD_MAP = {
+    "enrollment": "enrollment_hist",
+    "act": "act_hist",
+    "act_ela": "act_ela_hist",
+    "act_math": "act_math_hist",
+    "act_science": "act_science_hist",
+    "el": "el_hist",
+    "low_income": "low_income_hist",
+    "white": "white_hist",
+    "black": "black_hist",
+    "hispanic": "hispanic_hist",
+    "asian": "asian_hist",
+    "pacific_islander": "pacific_islander_hist",
+    "native_american": "native_american_hist",
+    "two_or_more": "two_or_more_hist",
+    "mena": "mena_hist",
+}
+
+_METRIC_BY_FIELD_PREFIX = {prefix: metric for metric, prefix in HISTORICAL_FIELD_MAP.items()}
+
+HISTORY_DELETE_CHUNK_SIZE = 500
+
+# metric -> year -> value for one school
+SchoolHistory = Dict[str, Dict[int, float]]
+
+
+def history_from_fields(fields: Mapping[str, Any]) -> SchoolHistory:
+    """Group {prefix}_{year} fields, as the trend batch emits them, by metric and year."""
+    history: SchoolHistory = defaultdict(dict)
+    for name, value in fields.items():
+        prefix, _, year = name.rpartition("_")
+        metric = _METRIC_BY_FIELD_PREFIX.get(prefix)
+        if metric is not None and year.isdigit() and value is not None:
+            history[metric][int(year)] = value
+    return dict(history)
+
+
+def replace_metric_history(db: Session, histories: Mapping[str, SchoolHistory]) -> int:
+    """
+    Swap in the history rows of the given schools (keyed by RCDTS) and drop rows
+    left behind by deleted schools. Any year is accepted; none needs a column.
+    """
+    ids = dict(db.execute(select(School.rcdts, School.id)).all())
+    school_ids = [ids[rcdts] for rcdts in histories if rcdts in ids]
+    for start in range(0, len(school_ids), HISTORY_DELETE_CHUNK_SIZE):
+        chunk = school_ids[start : start + HISTORY_DELETE_CHUNK_SIZE]
+        db.execute(delete(SchoolMetricHistory).where(SchoolMetricHistory.school_id.in_(chunk)))
+    db.execute(
+        text("DELETE FROM school_metric_history WHERE school_id NOT IN (SELECT id FROM schools)")
+    )
+
+    rows = [
+        {"school_id": ids[rcdts], "metric": metric, "year": year, "value": value}
+        for rcdts, history in histories.items()
+        if rcdts in ids
+        for metric, years in history.items()
+        for year, value in years.items()
+    ]
+    if rows:
+        db.execute(insert(SchoolMetricHistory.__table__), rows)
+    db.commit()
+    return len(rows)
+
+
+def _wide_history_columns() -> List[Tuple[str, int, str]]:
+    """(metric, year, column) for every legacy *_hist_{year} column on schools."""
+    columns = []
+    for column in School.__table__.columns:
+        prefix, _, year = column.name.rpartition("_")
+        metric = _METRIC_BY_FIELD_PREFIX.get(prefix)
+        if metric is not None and year.isdigit():
+            columns.append((metric, int(year), column.name))
+    return columns
+
+
+def metric_history_needs_backfill(db: Session) -> bool:
+    """True for databases imported before school_metric_history existed or was filled."""
+    if db.query(SchoolMetricHistory).first() is not None:
+        return False
+    filled = " OR ".join(f"{column} IS NOT NULL" for _, _, column in _wide_history_columns())
+    return db.execute(text(f"SELECT 1 FROM schools WHERE {filled} LIMIT 1")).first() is not None
+
+
+def backfill_metric_history(db: Session) -> int:
+    """One-time copy of the legacy wide columns into school_metric_history."""
+    by_metric: Dict[str, List[Tuple[int, str]]] = defaultdict(list)
+    for metric, year, column in _wide_history_columns():
+        by_metric[metric].append((year, column))
+
+    for metric, year_columns in by_metric.items():
+        # One INSERT per metric keeps each compound SELECT well under SQLite's limit
+        selects = [
+            f"SELECT id, '{metric}', {year}, {column} FROM schools WHERE {column} IS NOT NULL"
+            for year, column in year_columns
+        ]
+        db.execute(
+            text(
+                "INSERT INTO school_metric_history (school_id, metric, year, value) "
+                + " UNION ALL ".join(selects)
+            )
+        )
+    db.commit()
+    return db.query(SchoolMetricHistory).count()
+
+
+def ensure_metric_history(db: Session, writable: bool = True) -> int:
+    """
+    Backfill history for older databases before serving; return rows copied.
+
+    Read-only serving cannot write, so it refuses to start rather than serve
+    every school without its historical block.
+    """
+    if not metric_history_needs_backfill(db):
+        return 0
+    if not writable:
+        raise RuntimeError(
+            "school_metric_history is empty but the legacy *_hist_{year} columns hold data; "
+            "re-import the database or start once with DATABASE_MODE=readwrite to backfill it"
+        )
+    return backfill_metric_history(db)
+
+
+def load_metric_history(
+    db: Session, school_ids: Optional[Iterable[int]] = None
+) -> Dict[int, SchoolHistory]:
+    """Fetch non-null history values grouped by school; all schools when ids is None."""
+    query = select(
+        SchoolMetricHistory.school_id,
+        SchoolMetricHistory.metric,
+        SchoolMetricHistory.year,
+        SchoolMetricHistory.value,
+    )
+    if school_ids is not None:
+        ids = list(dict.fromkeys(school_ids))
+        if not ids:
+            return {}
+        query = query.where(SchoolMetricHistory.school_id.in_(ids))
+
+    history: Dict[int, SchoolHistory] = defaultdict(lambda: defaultdict(dict))
+    for school_id, metric, year, value in db.execute(query):
+        history[school_id][metric][year] = value
+    return {school_id: dict(metrics) for school_id, metrics in history.items()}
@@ -0,0 +1,247 @@
+# ABOUTME: Builds SchoolDetail payloads from School rows for the detail endpoints
+# ABOUTME: Materializes pre-serialized detail JSON per school after each import
+
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session, undefer_group
+
+from app.database import TREND_COLUMN_GROUP, School, SchoolDetailJSON
+from app.models import (
+    ACTScores,
+    Demographics,
+    Diversity,
+    HistoricalMetrics,
+    HistoricalYearlyData,
+    SchoolDetail,
+    SchoolMetrics,
+    TrendMetrics,
+    TrendWindow,
+)
+from app.services.metric_history import HISTORICAL_FIELD_MAP, SchoolHistory, load_metric_history
+
+MATERIALIZE_BATCH_SIZE = 500
+
+# Trends are always rendered; history comes from school_metric_history, never
+# from the wide history group.
+DETAIL_COLUMN_GROUPS = (TREND_COLUMN_GROUP,)
+
+TREND_FIELD_MAP = {
+    "enrollment": (
+        "enrollment_trend_1yr",
+        "enrollment_trend_3yr",
+        "enrollment_trend_5yr",
+        "enrollment_trend_10yr",
+        "enrollment_trend_15yr",
+    ),
+    "low_income": (
+        "low_income_trend_1yr",
+        "low_income_trend_3yr",
+        "low_income_trend_5yr",
+        "low_income_trend_10yr",
+        "low_income_trend_15yr",
+    ),
+    "el": (
+        "el_trend_1yr",
+        "el_trend_3yr",
+        "el_trend_5yr",
+        "el_trend_10yr",
+        "el_trend_15yr",
+    ),
+    "white": (
+        "white_trend_1yr",
+        "white_trend_3yr",
+        "white_trend_5yr",
+        "white_trend_10yr",
+        "white_trend_15yr",
+    ),
+    "black": (
+        "black_trend_1yr",
+        "black_trend_3yr",
+        "black_trend_5yr",
+        "black_trend_10yr",
+        "black_trend_15yr",
+    ),
+    "hispanic": (
+        "hispanic_trend_1yr",
+        "hispanic_trend_3yr",
+        "hispanic_trend_5yr",
+        "hispanic_trend_10yr",
+        "hispanic_trend_15yr",
+    ),
+    "asian": (
+        "asian_trend_1yr",
+        "asian_trend_3yr",
+        "asian_trend_5yr",
+        "asian_trend_10yr",
+        "asian_trend_15yr",
+    ),
+    "pacific_islander": (
+        "pacific_islander_trend_1yr",
+        "pacific_islander_trend_3yr",
+        "pacific_islander_trend_5yr",
+        "pacific_islander_trend_10yr",
+        "pacific_islander_trend_15yr",
+    ),
+    "native_american": (
+        "native_american_trend_1yr",
+        "native_american_trend_3yr",
+        "native_american_trend_5yr",
+        "native_american_trend_10yr",
+        "native_american_trend_15yr",
+    ),
+    "two_or_more": (
+        "two_or_more_trend_1yr",
+        "two_or_more_trend_3yr",
+        "two_or_more_trend_5yr",
+        "two_or_more_trend_10yr",
+        "two_or_more_trend_15yr",
+    ),
+    "mena": (
+        "mena_trend_1yr",
+        "mena_trend_3yr",
+        "mena_trend_5yr",
+        "mena_trend_10yr",
+        "mena_trend_15yr",
+    ),
+    "act": (
+        "act_trend_1yr",
+        "act_trend_3yr",
+        "act_trend_5yr",
+        "act_trend_10yr",
+        "act_trend_15yr",
+    ),
+}
+
+
+def build_school_detail(school, history: Optional[SchoolHistory] = None) -> SchoolDetail:
+    """Convert School ORM model to SchoolDetail schema; history is its long-format rows."""
+    act_scores: Optional[ACTScores] = None
+    if any([school.act_ela_avg, school.act_math_avg, school.act_science_avg]):
+        act_scores = ACTScores(
+            ela_avg=school.act_ela_avg,
+            math_avg=school.act_math_avg,
+            science_avg=school.act_science_avg,
+        )
+
+    metrics = SchoolMetrics(
+        enrollment=school.student_enrollment,
+        act=act_scores,
+        demographics=Demographics(
+            el_percentage=school.el_percentage,
+            low_income_percentage=school.low_income_percentage,
+        ),
+        diversity=Diversity(
+            white=school.pct_white,
+            black=school.pct_black,
+            hispanic=school.pct_hispanic,
+            asian=school.pct_asian,
+            pacific_islander=school.pct_pacific_islander,
+            native_american=school.pct_native_american,
+            two_or_more=school.pct_two_or_more,
+            mena=school.pct_mena,
+        ),
+        iar_ela_proficiency_pct=school.iar_ela_proficiency_pct,
+        iar_math_proficiency_pct=school.iar_math_proficiency_pct,
+        iar_overall_proficiency_pct=school.iar_overall_proficiency_pct,
+        trends=_build_trend_metrics(school),
+        historical=_build_historical_metrics(history),
+    )
+
+    return SchoolDetail(
+        id=school.id,
+        rcdts=school.rcdts,
+        school_name=school.school_name,
+        city=school.city,
+        district=school.district,
+        county=school.county,
+        school_type=school.school_type,
+        grades_served=school.grades_served,
+        metrics=metrics,
+    )
+
+
+def _build_trend_metrics(school) -> Optional[TrendMetrics]:
+    trend_payload = {}
+    for metric, fields in TREND_FIELD_MAP.items():
+        one_year = getattr(school, fields[0], None)
+        three_year = getattr(school, fields[1], None)
+        five_year = getattr(school, fields[2], None)
+        ten_year = getattr(school, fields[3], None)
+        fifteen_year = getattr(school, fields[4], None)
+        window = _build_trend_window(one_year, three_year, five_year, ten_year, fifteen_year)
+        if window is not None:
+            trend_payload[metric] = window
+
+    if not trend_payload:
+        return None
+    return TrendMetrics(**trend_payload)
+
+
+def _build_trend_window(
+    one_year: Optional[float],
+    three_year: Optional[float],
+    five_year: Optional[float],
+    ten_year: Optional[float],
+    fifteen_year: Optional[float],
+) -> Optional[TrendWindow]:
+    if all(value is None for value in (one_year, three_year, five_year, ten_year, fifteen_year)):
+        return None
+    return TrendWindow(
+        one_year=one_year,
+        three_year=three_year,
+        five_year=five_year,
+        ten_year=ten_year,
+        fifteen_year=fifteen_year,
+    )
+
+
+def _build_historical_metrics(history: Optional[SchoolHistory]) -> Optional[HistoricalMetrics]:
+    """Build historical yearly data from a school's school_metric_history rows."""
+    historical_payload = {}
+
+    for metric in HISTORICAL_FIELD_MAP:
+        yearly_data = _build_historical_yearly_data((history or {}).get(metric))
+        if yearly_data is not None:
+            historical_payload[metric] = yearly_data
+
+    if not historical_payload:
+        return None
+    return HistoricalMetrics(**historical_payload)
+
+
+def _build_historical_yearly_data(
+    year_values: Optional[Dict[int, float]],
+) -> Optional[HistoricalYearlyData]:
+    """Convert one metric's {year: value} history into the response model."""
+    if not year_values:
+        return None
+    return HistoricalYearlyData(**{f"yr_{year}": value for year, value in year_values.items()})
+
+
+def serialize_school_detail(school, history: Optional[SchoolHistory] = None) -> bytes:
+    """Serialize a School row into the exact JSON body served by the detail endpoint."""
+    return build_school_detail(school, history).model_dump_json().encode("utf-8")
+
+
+def materialize_school_details(db: Session) -> int:
+    """Rebuild the school_detail_json table from the current schools table."""
+    db.query(SchoolDetailJSON).delete()
+    history_by_school = load_metric_history(db)
+
+    count = 0
+    batch = []
+    schools = db.query(School).options(undefer_group(TREND_COLUMN_GROUP))
+    for school in schools.yield_per(MATERIALIZE_BATCH_SIZE):
+        payload = serialize_school_detail(school, history_by_school.get(school.id))
+        batch.append({"rcdts": school.rcdts, "payload": payload})
+        if len(batch) >= MATERIALIZE_BATCH_SIZE:
+            db.bulk_insert_mappings(SchoolDetailJSON, batch)
+            count += len(batch)
+            batch = []
+
+    if batch:
+        db.bulk_insert_mappings(SchoolDetailJSON, batch)
+        count += len(batch)
+
+    db.commit()
+    return count
@@ -0,0 +1,187 @@
+# ABOUTME: Immutable in-memory columnar snapshot of the schools table for hot endpoints
+# ABOUTME: Serves detail, compare, and top-score reads from NumPy arrays with hot-swap on file change
+
+from __future__ import annotations
+
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import Float, Integer, select
+from sqlalchemy.orm import Session
+
+from app.database import School, SchoolDetailJSON, database_file_signature
+from app.services.metric_history import SchoolHistory, load_metric_history
+from app.services.top_scores import RankedSchool
+
+SNAPSHOT_ENV_VAR = "SCHOOL_SNAPSHOT"
+
+_NUMERIC_TYPES = (Integer, Float)
+
+
+class SnapshotRow:
+    """Attribute view over one snapshot row, usable wherever a School is read."""
+
+    __slots__ = ("_snapshot", "_position")
+
+    def __init__(self, snapshot: "SchoolSnapshot", position: int) -> None:
+        self._snapshot = snapshot
+        self._position = position
+
+    def __getattr__(self, name: str):
+        try:
+            return self._snapshot.value(name, self._position)
+        except KeyError:
+            raise AttributeError(name) from None
+
+
+class SchoolSnapshot:
+    """Column arrays for every school: float64 values plus null masks for numbers, objects otherwise."""
+
+    def __init__(
+        self,
+        columns: Dict[str, List[object]],
+        detail_payloads: Optional[Dict[str, bytes]] = None,
+        history: Optional[Dict[int, SchoolHistory]] = None,
+    ) -> None:
+        self._numeric: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._integer_columns = set()
+        self._objects: Dict[str, np.ndarray] = {}
+
+        for column in School.__table__.columns:
+            values = columns[column.name]
+            if isinstance(column.type, _NUMERIC_TYPES):
+                present = np.array([value is not None for value in values], dtype=bool)
+                data = np.array(
+                    [value if value is not None else np.nan for value in values],
+                    dtype=np.float64,
+                )
+                self._numeric[column.name] = (data, present)
+                if isinstance(column.type, Integer):
+                    self._integer_columns.add(column.name)
+            else:
+                array = np.empty(len(values), dtype=object)
+                array[:] = values
+                self._objects[column.name] = array
+
+        self.rcdts_index: Dict[str, int] = {
+            rcdts: position for position, rcdts in enumerate(self._objects["rcdts"])
+        }
+        # Integer rank of each name so ORDER BY school_name can be a numeric sort key
+        names = self._objects["school_name"]
+        self._name_rank = np.empty(len(names), dtype=np.int64)
+        self._name_rank[np.argsort(names.astype(str), kind="stable")] = np.arange(len(names))
+        self.detail_payloads: Dict[str, bytes] = detail_payloads or {}
+        self.history_by_school: Dict[int, SchoolHistory] = history or {}
+
+    @classmethod
+    def from_db(cls, db: Session) -> "SchoolSnapshot":
+        """Load every school row, materialized detail payload, and history row."""
+        table = School.__table__
+        rows = db.execute(select(table)).all()
+        columns = {
+            column.name: [row[index] for row in rows]
+            for index, column in enumerate(table.columns)
+        }
+        payloads = dict(db.execute(select(SchoolDetailJSON.rcdts, SchoolDetailJSON.payload)).all())
+        return cls(columns, payloads, load_metric_history(db))
+
+    def __len__(self) -> int:
+        return len(self.rcdts_index)
+
+    def value(self, name: str, position: int):
+        """Return a single cell as the Python value the ORM would have produced."""
+        if name in self._numeric:
+            data, present = self._numeric[name]
+            if not present[position]:
+                return None
+            if name in self._integer_columns:
+                return int(data[position])
+            return float(data[position])
+        return self._objects[name][position]
+
+    def get(self, rcdts: str) -> Optional[SnapshotRow]:
+        """Look up a school row by RCDTS."""
+        position = self.rcdts_index.get(rcdts)
+        return SnapshotRow(self, position) if position is not None else None
+
+    def get_many(self, rcdts_codes: Iterable[str]) -> Dict[str, SnapshotRow]:
+        """Look up several schools at once, skipping unknown codes."""
+        return {code: row for code in rcdts_codes if (row := self.get(code)) is not None}
+
+    def history(self, school_id: int) -> Optional[SchoolHistory]:
+        """Return a school's long-format history, if it has any."""
+        return self.history_by_school.get(school_id)
+
+    def detail_payload(self, rcdts: str) -> Optional[bytes]:
+        """Return the materialized detail JSON body for a school, if any."""
+        return self.detail_payloads.get(rcdts)
+
+    def top_scores(self, assessment: str, level: str, limit: int = 100) -> List[RankedSchool]:
+        """Vectorized equivalent of fetch_top_scores."""
+        limit = max(1, min(limit, 100))
+
+        ela, ela_present = self._numeric["act_ela_avg"]
+        math, math_present = self._numeric["act_math_avg"]
+        if assessment == "act":
+            scores = (ela + math) / 2
+            mask = ela_present & math_present
+        elif assessment == "iar":
+            scores, mask = self._numeric["iar_overall_proficiency_pct"]
+        else:
+            raise ValueError("Unsupported assessment")
+
+        candidates = np.flatnonzero(mask & (self._objects["level"] == level))
+        order = np.lexsort((self._name_rank[candidates], -scores[candidates]))
+        positions = candidates[order[:limit]]
+
+        return [
+            RankedSchool(
+                rank=idx + 1,
+                rcdts=self._objects["rcdts"][position],
+                school_name=self._objects["school_name"][position],
+                city=self._objects["city"][position],
+                district=self._objects["district"][position],
+                school_type=self._objects["school_type"][position],
+                level=self._objects["level"][position],
+                enrollment=self.value("student_enrollment", position),
+                score=round(float(scores[position]), 2),
+                act_ela_avg=self.value("act_ela_avg", position),
+                act_math_avg=self.value("act_math_avg", position),
+            )
+            for idx, position in enumerate(positions)
+        ]
+
+
+def snapshot_enabled() -> bool:
+    """Whether the API should serve hot endpoints from the in-memory snapshot."""
+    return os.environ.get(SNAPSHOT_ENV_VAR, "").lower() in {"1", "true", "on"}
+
+
+_snapshot: Optional[SchoolSnapshot] = None
+_signature: Optional[Tuple] = None
+_snapshot_lock = threading.Lock()
+
+
+def load_school_snapshot(db: Session) -> Optional[SchoolSnapshot]:
+    """Return the process-wide snapshot, rebuilding it when the database file changes."""
+    global _snapshot, _signature
+    if not snapshot_enabled():
+        return None
+
+    signature = database_file_signature(db)
+    if _snapshot is None or signature != _signature:
+        with _snapshot_lock:
+            if _snapshot is None or signature != _signature:
+                _snapshot = SchoolSnapshot.from_db(db)
+                _signature = signature
+    return _snapshot
+
+
+def reset_school_snapshot() -> None:
+    """Drop the cached snapshot so the next lookup rebuilds it."""
+    global _snapshot, _signature
+    with _snapshot_lock:
+        _snapshot = None
+        _signature = None
@@ -0,0 +1,173 @@
+# ABOUTME: Throughput benchmark for the detail and top-scores endpoints
+# ABOUTME: Serves synthetic schools from a temporary SQLite file through the real FastAPI app
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import json
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from sqlalchemy import Float, Integer, create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+import app.api.top_scores as top_scores_api
+from app.database import Base, School, get_db
+from app.main import app
+from app.services.metric_history import history_from_fields, replace_metric_history
+from app.services.school_detail import materialize_school_details
+from app.services.snapshot import SNAPSHOT_ENV_VAR, reset_school_snapshot
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - httpx ships with the dev extra only
+    httpx = None
+
+LEVELS = ("high", "middle", "elementary")
+
+
+class StdlibJson:
+    """Drop-in for the orjson calls in app.api.top_scores, backed by the json module."""
+
+    @staticmethod
+    def dumps(value) -> bytes:
+        return json.dumps(value, default=dataclasses.asdict, separators=(",", ":")).encode()
+
+
+def seed_schools(db: Session, count: int, seed: int = 0) -> List[str]:
+    """Insert schools with every numeric column filled; return their RCDTS codes."""
+    rng = random.Random(seed)
+    numeric = [
+        column.name
+        for column in School.__table__.columns
+        if isinstance(column.type, (Integer, Float)) and column.name != "id"
+    ]
+    records = []
+    for idx in range(count):
+        record = {
+            "rcdts": f"05-016-2140-17-{idx:04d}",
+            "school_name": f"Benchmark School {idx}",
+            "city": f"City {idx % 300}",
+            "district": f"District {idx % 800}",
+            "school_type": "High School",
+            "level": LEVELS[idx % len(LEVELS)],
+        }
+        for name in numeric:
+            value = rng.uniform(0, 100)
+            record[name] = int(value * 20) if name == "student_enrollment" else round(value, 2)
+        records.append(record)
+    db.bulk_insert_mappings(School, records)
+    db.commit()
+    replace_metric_history(db, {record["rcdts"]: history_from_fields(record) for record in records})
+    return [record["rcdts"] for record in records]
+
+
+async def measure(client: httpx.AsyncClient, paths: List[str], requests: int) -> float:
+    """Issue requests round-robin over paths and return requests per second."""
+    for path in paths[:10]:
+        assert (await client.get(path)).status_code == 200
+    started = time.perf_counter()
+    for idx in range(requests):
+        await client.get(paths[idx % len(paths)])
+    return requests / (time.perf_counter() - started)
+
+
+async def _run_scenarios(
+    codes: List[str], setup: Session, requests: int, compare_json: bool
+) -> Dict[str, float]:
+    detail_paths = [f"/api/schools/{code}" for code in codes]
+    top_paths = [f"/api/top-scores?assessment={assessment}&level=high" for assessment in ("act", "iar")]
+    results: Dict[str, float] = {}
+    # In-process ASGI calls keep transport overhead small next to handler and serialization time
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        results["top-scores (100 results)"] = await measure(client, top_paths, requests)
+        if compare_json:
+            serializer = top_scores_api.orjson
+            top_scores_api.orjson = StdlibJson
+            try:
+                results["top-scores (stdlib json)"] = await measure(client, top_paths, requests)
+            finally:
+                top_scores_api.orjson = serializer
+        results["detail (built per request)"] = await measure(client, detail_paths, requests)
+        materialize_school_details(setup)
+        reset_school_snapshot()
+        results["detail (materialized)"] = await measure(client, detail_paths, requests)
+    return results
+
+
+def run_benchmark(
+    schools: int = 3800, requests: int = 1000, snapshot: bool = True, compare_json: bool = False
+) -> Dict[str, float]:
+    """
+    Return requests/sec for each endpoint scenario against a synthetic database.
+
+    compare_json adds a top-scores run serialized with the stdlib json module
+    instead of orjson, all else equal.
+    """
+    if httpx is None:
+        raise ImportError("The API benchmark requires httpx; install the backend's 'dev' extra (uv sync --extra dev)")
+    previous_snapshot = os.environ.get(SNAPSHOT_ENV_VAR)
+    os.environ[SNAPSHOT_ENV_VAR] = "1" if snapshot else "0"
+    reset_school_snapshot()
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{Path(directory) / 'benchmark.db'}")
+        Base.metadata.create_all(engine)
+        SessionFactory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        def override_get_db():
+            db = SessionFactory()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        setup = SessionFactory()
+        app.dependency_overrides[get_db] = override_get_db
+        try:
+            codes = seed_schools(setup, schools)
+            return asyncio.run(_run_scenarios(codes, setup, requests, compare_json))
+        finally:
+            app.dependency_overrides.pop(get_db, None)
+            setup.close()
+            engine.dispose()
+            reset_school_snapshot()
+            if previous_snapshot is None:
+                os.environ.pop(SNAPSHOT_ENV_VAR, None)
+            else:
+                os.environ[SNAPSHOT_ENV_VAR] = previous_snapshot
+
+
+def main() -> None:  # pragma: no cover
+    """CLI entry point printing requests/sec per endpoint."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark API response throughput")
+    parser.add_argument("--schools", type=int, default=3800, help="Synthetic schools to load")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per scenario")
+    parser.add_argument(
+        "--no-snapshot",
+        action="store_true",
+        help="Read every request from SQLite instead of the in-memory snapshot",
+    )
+    parser.add_argument(
+        "--compare-json",
+        action="store_true",
+        help="Also time top-scores serialized with the stdlib json module instead of orjson",
+    )
+    args = parser.parse_args()
+
+    results = run_benchmark(
+        args.schools, args.requests, snapshot=not args.no_snapshot, compare_json=args.compare_json
+    )
+    for name, rate in results.items():
+        print(f"{name:<28} {rate:>8,.0f} req/s")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
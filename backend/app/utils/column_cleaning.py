@@ -0,0 +1,70 @@
+# ABOUTME: Column-wise numeric cleaning shared by the current and historical importers
+# ABOUTME: Matches the scalar clean_percentage/clean_enrollment helpers value for value
+
+from typing import Any, List
+
+import numpy as np
+import pandas as pd
+
+# Plain decimal literals that float() parses exactly like the scalar cleaners do;
+# anything else (e.g. "N/A", "nan", "1_000") goes through the scalar path.
+_DECIMAL_PATTERN = r"[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?"
+_INT64_LIMIT = 2.0**63
+
+
+def _type_mask(value_types: pd.Series, base) -> np.ndarray:
+    """Mask of values whose type is a subclass of base, checked once per distinct type."""
+    matching = [value_type for value_type in value_types.unique() if issubclass(value_type, base)]
+    return value_types.isin(matching).to_numpy()
+
+
+def clean_numeric_column(values: np.ndarray, scalar_cleaner, as_int: bool) -> List[Any]:
+    """Column-wise equivalent of [scalar_cleaner(v) for v in values]."""
+    result = np.full(len(values), None, dtype=object)
+    if not len(values):
+        return result.tolist()
+
+    value_types = pd.Series(values, dtype=object).map(type)
+    str_mask = _type_mask(value_types, str)
+    number_mask = _type_mask(value_types, (int, float))
+    fallback_mask = ~(str_mask | number_mask)
+
+    # Numbers: NaN -> None, everything else converted directly
+    if number_mask.any():
+        number_positions = np.flatnonzero(number_mask)
+        numbers = values[number_mask]
+        as_float = numbers.astype(np.float64)
+        present = ~np.isnan(as_float)
+        if as_int:
+            ints = _type_mask(value_types[number_mask], int) & ~_type_mask(value_types[number_mask], float)
+            result[number_positions[ints]] = [int(value) for value in numbers[ints]]
+            floats = present & ~ints
+            in_range = floats & (np.abs(np.where(floats, as_float, 0.0)) < _INT64_LIMIT)
+            result[number_positions[in_range]] = as_float[in_range].astype(np.int64).tolist()
+            # inf and huge floats keep the scalar behaviour
+            fallback_mask[number_positions[floats & ~in_range]] = True
+        else:
+            result[number_positions[present]] = as_float[present].tolist()
+
+    # Strings: strip, blank/asterisk -> None, then parse plain decimals in bulk
+    if str_mask.any():
+        string_positions = np.flatnonzero(str_mask)
+        stripped = pd.Series(values[str_mask], dtype=object).str.strip()
+        blank = stripped.isin(["", "*"]).to_numpy()
+        if as_int:
+            normalized = stripped.str.replace(",", "", regex=False)
+        else:
+            normalized = stripped.str.removesuffix("%")
+        decimal = normalized.str.fullmatch(_DECIMAL_PATTERN).to_numpy(dtype=bool) & ~blank
+        parsed = np.full(len(normalized), np.nan)
+        parsed[decimal] = normalized[decimal].to_numpy(dtype=object).astype(np.float64)
+        if as_int:
+            decimal &= np.abs(np.where(decimal, parsed, 0.0)) < _INT64_LIMIT
+            result[string_positions[decimal]] = parsed[decimal].astype(np.int64).tolist()
+        else:
+            result[string_positions[decimal]] = parsed[decimal].tolist()
+        fallback_mask[string_positions[~decimal & ~blank]] = True
+
+    for position in np.flatnonzero(fallback_mask):
+        result[position] = scalar_cleaner(values[position])
+    return result.tolist()
@@ -1,14 +1,26 @@
-# ABOUTME: Converts historical Illinois Report Card TXT files to XLSX format
-# ABOUTME: Maps semicolon-delimited TXT fields to modern XLSX structure for 2010-2017 data
+# ABOUTME: Converts historical Illinois Report Card TXT files to Parquet or XLSX format
+# ABOUTME: Maps semicolon-delimited TXT fields to modern General-sheet structure for 2010-2017 data
+
+import argparse
+import csv
+import importlib.util
 
 import pandas as pd
-import sys
 from pathlib import Path
 
 
 HISTORICAL_DATA_DIR = Path(__file__).resolve().parents[3] / 'data' / 'historical-report-cards'
 _RC10_RCDTS_LOOKUP: dict[tuple[str, str, str], str] | None = None
 
+# Lines parsed per read_csv chunk when streaming legacy TXT files
+TXT_CHUNK_ROWS = 5000
+
+NUMERIC_COLUMNS = [
+    '% White', '% Black', '% Hispanic', '% Asian', '% Native American',
+    '% Two or More Races', '% EL', '# Student Enrollment', '% Low-Income',
+    'ACT Composite', 'ACT ELA', 'ACT Math', 'ACT Reading', 'ACT Science'
+]
+
 
 # Field mappings are defined per file family (0-indexed positions)
 DEFAULT_FIELD_MAPPING = {
@@ -280,54 +292,32 @@ def _normalize_rc10_rcdts(row: dict[str, str]) -> str:
     return lookup.get((school_name, district_name, city)) or lookup.get((school_name, district_name, '')) or rcdts
 
 
-def convert_txt_to_xlsx(txt_file_path: str, output_xlsx_path: str) -> None:
-    """
-    Convert a semicolon-delimited TXT file to XLSX format.
-
-    Args:
-        txt_file_path: Path to input TXT file
-        output_xlsx_path: Path to output XLSX file
-    """
-    print(f"Reading {txt_file_path}...")
-
-    field_mapping = _select_field_mapping(txt_file_path)
-    is_rc10_file = field_mapping is RC10_GENERAL_FIELD_MAPPING
-
-    # Read the TXT file
-    data = []
-    with open(txt_file_path, 'r', encoding='latin-1') as f:
-        for line_num, line in enumerate(f, 1):
-            fields = line.strip().split(';')
+def parquet_engine_available() -> bool:
+    """Whether pandas can read and write Parquet (pyarrow or fastparquet installed)."""
+    return any(importlib.util.find_spec(engine) is not None for engine in ('pyarrow', 'fastparquet'))
 
-            # Extract mapped fields
-            row = {}
-            for field_idx, column_name in field_mapping.items():
-                if field_idx < len(fields):
-                    value = fields[field_idx].strip()
-                    # Convert empty strings to None
-                    row[column_name] = value if value else None
-                else:
-                    row[column_name] = None
 
-            if is_rc10_file:
-                row['RCDTS'] = _normalize_rc10_rcdts(row)
+def _project_txt_chunk(chunk: pd.DataFrame, field_mapping: dict[int, str], is_rc10_file: bool) -> pd.DataFrame:
+    """Rename one chunk's mapped fields, strip them, and coerce the numeric columns."""
+    columns = {}
+    for field_idx, column_name in field_mapping.items():
+        values = chunk[field_idx].tolist()
+        columns[column_name] = [
+            stripped if isinstance(value, str) and (stripped := value.strip()) else None
+            for value in values
+        ]
 
-            data.append(row)
+    if is_rc10_file:
+        rows = zip(columns['RCDTS'], columns['School Name'], columns['District'], columns['City'])
+        columns['RCDTS'] = [
+            _normalize_rc10_rcdts({'RCDTS': rcdts, 'School Name': name, 'District': district, 'City': city})
+            for rcdts, name, district, city in rows
+        ]
 
-            if line_num % 500 == 0:
-                print(f"  Processed {line_num} schools...")
-
-    # Create DataFrame
-    df = pd.DataFrame(data)
+    df = pd.DataFrame(columns)
 
     # Clean numeric columns - convert to proper types
-    numeric_columns = [
-        '% White', '% Black', '% Hispanic', '% Asian', '% Native American',
-        '% Two or More Races', '% EL', '# Student Enrollment', '% Low-Income',
-        'ACT Composite', 'ACT ELA', 'ACT Math', 'ACT Reading', 'ACT Science'
-    ]
-
-    for col in numeric_columns:
+    for col in NUMERIC_COLUMNS:
         if col in df.columns:
             series = df[col]
             if col == '# Student Enrollment':
@@ -337,47 +327,139 @@ def convert_txt_to_xlsx(txt_file_path: str, output_xlsx_path: str) -> None:
             # Replace empty/invalid values with NaN
             df[col] = pd.to_numeric(series, errors='coerce')
 
+    return df
+
+
+def read_txt_report_card(txt_file_path: str) -> pd.DataFrame:
+    """Parse a semicolon-delimited TXT file into General-sheet columns with numeric types."""
+    print(f"Reading {txt_file_path}...")
+
+    field_mapping = _select_field_mapping(txt_file_path)
+    is_rc10_file = field_mapping is RC10_GENERAL_FIELD_MAPPING
+
+    # Stream the file in chunks, parsing only the mapped field positions. Fields are
+    # split on every ';' (no quoting) and rows longer than the mapping are truncated.
+    reader = pd.read_csv(
+        txt_file_path,
+        sep=';',
+        header=None,
+        names=range(max(field_mapping) + 1),
+        usecols=sorted(field_mapping),
+        index_col=False,
+        dtype=str,
+        na_filter=False,
+        skip_blank_lines=False,
+        quoting=csv.QUOTE_NONE,
+        encoding='latin-1',
+        chunksize=TXT_CHUNK_ROWS,
+    )
+
+    chunks = []
+    processed = 0
+    for chunk in reader:
+        chunks.append(_project_txt_chunk(chunk, field_mapping, is_rc10_file))
+        processed += len(chunk)
+        print(f"  Processed {processed} schools...")
+
+    df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=list(field_mapping.values()))
+
     print(f"  Converted {len(df)} schools")
     print(f"  Columns: {list(df.columns)}")
+    return df
+
+
+def _print_summary(output_path: str, df: pd.DataFrame) -> None:
+    print(f"✓ Conversion complete: {output_path}")
+    print(f"  Schools: {len(df)}")
+    print(f"  Non-null ACT scores: {df['ACT Composite'].notna().sum()}")
+    print(f"  Non-null enrollment: {df['# Student Enrollment'].notna().sum()}")
+
+
+def convert_txt_to_xlsx(txt_file_path: str, output_xlsx_path: str) -> None:
+    """
+    Convert a semicolon-delimited TXT file to XLSX format.
+
+    Args:
+        txt_file_path: Path to input TXT file
+        output_xlsx_path: Path to output XLSX file
+    """
+    df = read_txt_report_card(txt_file_path)
 
     # Write to XLSX with a 'General' sheet (matching modern format)
     print(f"Writing to {output_xlsx_path}...")
     with pd.ExcelWriter(output_xlsx_path, engine='openpyxl') as writer:
         df.to_excel(writer, sheet_name='General', index=False)
 
-    print(f"✓ Conversion complete: {output_xlsx_path}")
-    print(f"  Schools: {len(df)}")
-    print(f"  Non-null ACT scores: {df['ACT Composite'].notna().sum()}")
-    print(f"  Non-null enrollment: {df['# Student Enrollment'].notna().sum()}")
+    _print_summary(output_xlsx_path, df)
+
+
+def convert_txt_to_parquet(txt_file_path: str, output_parquet_path: str) -> None:
+    """
+    Convert a semicolon-delimited TXT file to Parquet, skipping the Excel round trip.
+
+    The historical extractor prefers a .parquet file over an .xlsx with the same name.
+    Requires the optional parquet extra (pyarrow).
+    """
+    if not parquet_engine_available():
+        raise ImportError(
+            "Parquet output requires pyarrow; install the backend's 'parquet' extra "
+            "(uv sync --extra parquet) or convert with --format xlsx"
+        )
+
+    df = read_txt_report_card(txt_file_path)
+
+    print(f"Writing to {output_parquet_path}...")
+    df.to_parquet(output_parquet_path, index=False)
+
+    _print_summary(output_parquet_path, df)
+
+
+CONVERTERS = {
+    'parquet': convert_txt_to_parquet,
+    'xlsx': convert_txt_to_xlsx,
+}
 
 
 def main():
-    """Convert all historical TXT files to XLSX."""
-    if len(sys.argv) > 1:
+    """Convert historical TXT files to Parquet (XLSX when no Parquet engine is installed)."""
+    parser = argparse.ArgumentParser(description="Convert legacy Report Card TXT files")
+    parser.add_argument('txt_file', nargs='?', help="Single TXT file to convert (default: all known files)")
+    parser.add_argument('output_file', nargs='?', help="Output path (default: TXT path with the format's suffix)")
+    parser.add_argument(
+        '--format',
+        choices=sorted(CONVERTERS),
+        help="Output format (default: parquet if pyarrow is installed, otherwise xlsx)",
+    )
+    args = parser.parse_args()
+
+    output_format = args.format or ('parquet' if parquet_engine_available() else 'xlsx')
+    convert = CONVERTERS[output_format]
+    suffix = f'.{output_format}'
+
+    if args.txt_file:
         # Convert single file
-        txt_file = sys.argv[1]
-        output_file = sys.argv[2] if len(sys.argv) > 2 else txt_file.replace('.txt', '.xlsx')
-        convert_txt_to_xlsx(txt_file, output_file)
+        output_file = args.output_file or str(Path(args.txt_file).with_suffix(suffix))
+        convert(args.txt_file, output_file)
     else:
         # Convert all files in historical-report-cards directory
         historical_dir = Path('../data/historical-report-cards')
         txt_files = {
-            'rc10.txt': '2010-Report-Card-Public-Data-Set.xlsx',
-            'rc11u.txt': '2011-Report-Card-Public-Data-Set.xlsx',
-            'rc12.txt': '2012-Report-Card-Public-Data-Set.xlsx',
-            'rc13.txt': '2013-Report-Card-Public-Data-Set.xlsx',
-            'rc14.txt': '2014-Report-Card-Public-Data-Set.xlsx',
-            'rc15-assessment.txt': '2015-Report-Card-Public-Data-Set.xlsx',
-            'rc16_assessment.txt': '2016-Report-Card-Public-Data-Set.xlsx',
-            'rc17_assessment.txt': '2017-Report-Card-Public-Data-Set.xlsx',
+            'rc10.txt': '2010-Report-Card-Public-Data-Set',
+            'rc11u.txt': '2011-Report-Card-Public-Data-Set',
+            'rc12.txt': '2012-Report-Card-Public-Data-Set',
+            'rc13.txt': '2013-Report-Card-Public-Data-Set',
+            'rc14.txt': '2014-Report-Card-Public-Data-Set',
+            'rc15-assessment.txt': '2015-Report-Card-Public-Data-Set',
+            'rc16_assessment.txt': '2016-Report-Card-Public-Data-Set',
+            'rc17_assessment.txt': '2017-Report-Card-Public-Data-Set',
         }
 
-        for txt_file, xlsx_file in txt_files.items():
+        for txt_file, output_stem in txt_files.items():
             txt_path = historical_dir / txt_file
             if txt_path.exists():
-                output_path = historical_dir / xlsx_file
+                output_path = historical_dir / f'{output_stem}{suffix}'
                 print(f"\n{'='*60}")
-                convert_txt_to_xlsx(str(txt_path), str(output_path))
+                convert(str(txt_path), str(output_path))
             else:
                 print(f"⚠ Skipping {txt_file} (file not found)")
 
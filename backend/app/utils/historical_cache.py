@@ -0,0 +1,113 @@
+# ABOUTME: On-disk cache of parsed historical report card years
+# ABOUTME: Skips Excel/TXT parsing on reruns while the source files and parser code are unchanged
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+CACHE_FORMAT_VERSION = 1
+_HASH_CHUNK_SIZE = 1 << 20
+
+YearData = Dict[str, Dict[str, Any]]
+
+
+def file_sha256(path: Path) -> str:
+    """Hex digest of a file's contents, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def default_cache_dir(base_path: Path) -> Path:
+    """Cache location next to the source directory, i.e. data/.cache for the bundled files."""
+    return Path(base_path).resolve().parent / ".cache"
+
+
+class ParsedYearCache:
+    """
+    One pickle per (parser, source directory, year) holding the parsed year dict.
+
+    An entry is reused when every parser module is byte-identical and every source
+    file matches by name and size, plus either mtime or content hash.
+    """
+
+    def __init__(
+        self, cache_dir: Path, namespace: str, base_path: Path, parser_sources: Sequence[Path]
+    ) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.namespace = namespace
+        self._source_key = hashlib.sha256(str(Path(base_path).resolve()).encode()).hexdigest()[:12]
+        self._parser_hash = hashlib.sha256(
+            "".join(file_sha256(path) for path in parser_sources).encode()
+        ).hexdigest()
+
+    def entry_path(self, year: int) -> Path:
+        return self.cache_dir / f"{self.namespace}-{year}-{self._source_key}.pkl"
+
+    def load(self, year: int, files: Sequence[Path]) -> Optional[YearData]:
+        """Return the cached year when it is still valid for these source files."""
+        try:
+            with open(self.entry_path(year), "rb") as handle:
+                entry = pickle.load(handle)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Truncated or foreign file; it is rewritten after the next parse
+            return None
+
+        if (
+            not isinstance(entry, dict)
+            or entry.get("format") != CACHE_FORMAT_VERSION
+            or entry.get("parser") != self._parser_hash
+            or not self._sources_match(entry.get("sources", []), files)
+        ):
+            return None
+        return entry["data"]
+
+    def store(self, year: int, files: Sequence[Path], data: YearData) -> None:
+        """Write a parsed year atomically; failures only cost a re-parse next run."""
+        entry = {
+            "format": CACHE_FORMAT_VERSION,
+            "parser": self._parser_hash,
+            "sources": [self._describe(path) for path in files],
+            "data": data,
+        }
+        target = self.entry_path(year)
+        temp_path = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(temp_path, "wb") as handle:
+                pickle.dump(entry, handle, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, target)
+        except OSError as exc:
+            print(f"Could not write historical cache {target}: {exc}")
+            temp_path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _describe(path: Path) -> Dict[str, Any]:
+        stat = path.stat()
+        return {
+            "name": path.name,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": file_sha256(path),
+        }
+
+    @staticmethod
+    def _sources_match(stored: List[Dict[str, Any]], files: Sequence[Path]) -> bool:
+        if [source["name"] for source in stored] != [path.name for path in files]:
+            return False
+        for source, path in zip(stored, files):
+            stat = path.stat()
+            if stat.st_size != source["size"]:
+                return False
+            # A touched but unchanged file (e.g. fresh checkout) still hits via its hash
+            if stat.st_mtime_ns != source["mtime_ns"] and file_sha256(path) != source["sha256"]:
+                return False
+        return True
@@ -9,6 +9,11 @@ from typing import Any, Dict, Iterable, Mapping
 
 import pandas as pd
 
+from app.utils.historical_cache import ParsedYearCache, default_cache_dir
+
+# This module plus the import_data scalar cleaners it applies to every value
+PARSER_SOURCES = tuple(Path(__file__).with_name(name) for name in ("historical_loader.py", "import_data.py"))
+
 EXCEL_GENERAL_COLUMNS: Dict[str, Iterable[str]] = {
     "enrollment": ["# student enrollment", "student enrollment"],
     "low_income_percentage": ["% student enrollment - low income"],
@@ -54,6 +59,21 @@ ACT_COLUMNS: Dict[str, Iterable[str]] = {
 
 TEXT_DELIMITERS = ("|", "\t", ",")
 
+# Normalized headers the Excel parser reads; every other column is skipped
+LOADED_COLUMNS = frozenset(
+    ["rcdts", "level"]
+    + [alias for aliases in EXCEL_GENERAL_COLUMNS.values() for alias in aliases]
+    + [alias for aliases in DIVERSITY_COLUMNS.values() for alias in aliases]
+    + SAT_READING_COLUMNS
+    + SAT_MATH_COLUMNS
+    + SAT_COMPOSITE_COLUMNS
+    + [alias for aliases in ACT_COLUMNS.values() for alias in aliases]
+)
+
+
+def _is_loaded_column(name: Any) -> bool:
+    return isinstance(name, str) and name.strip().lower() in LOADED_COLUMNS
+
 
 def _default_base_path() -> Path:
     return Path(__file__).resolve().parents[3] / "data" / "historical-report-cards"
@@ -62,10 +82,25 @@ def _default_base_path() -> Path:
 class HistoricalDataLoader:
     """Load normalized metrics from historical Excel/TXT sources."""
 
-    def __init__(self, base_path: Path | str | None = None) -> None:
+    def __init__(
+        self,
+        base_path: Path | str | None = None,
+        cache_dir: Path | str | None = None,
+        use_cache: bool = True,
+    ) -> None:
         resolved_path = Path(base_path) if base_path else _default_base_path()
         self.base_path = resolved_path
         self._cache: Dict[int, Dict[str, Dict[str, Any]]] = {}
+        self._parse_cache = (
+            ParsedYearCache(
+                Path(cache_dir) if cache_dir else default_cache_dir(resolved_path),
+                "loader",
+                resolved_path,
+                PARSER_SOURCES,
+            )
+            if use_cache
+            else None
+        )
 
     def load_year(self, year: int) -> Dict[str, Dict[str, Any]]:
         """Return metrics for a given year keyed by RCDTS."""
@@ -77,6 +112,12 @@ class HistoricalDataLoader:
             self._cache[year] = {}
             return {}
 
+        if self._parse_cache is not None:
+            cached = self._parse_cache.load(year, files)
+            if cached is not None:
+                self._cache[year] = cached
+                return cached
+
         merged: Dict[str, Dict[str, Any]] = {}
         for file_path in files:
             suffix = file_path.suffix.lower()
@@ -87,6 +128,8 @@ class HistoricalDataLoader:
             self._merge_records(merged, parsed)
 
         finalized = self._finalize_records(merged)
+        if self._parse_cache is not None:
+            self._parse_cache.store(year, files, finalized)
         self._cache[year] = finalized
         return finalized
 
@@ -112,10 +155,13 @@ class HistoricalDataLoader:
         per_school: Dict[str, Dict[str, Any]] = {}
         excel = pd.ExcelFile(path)
         for sheet in excel.sheet_names:
-            frame = pd.read_excel(excel, sheet_name=sheet)
-            if "RCDTS" not in frame.columns:
+            # Header-only pass so sheets without school rows are never parsed
+            header = pd.read_excel(excel, sheet_name=sheet, nrows=0)
+            if "RCDTS" not in header.columns:
                 continue
 
+            frame = pd.read_excel(excel, sheet_name=sheet, usecols=_is_loaded_column)
+
             for _, row in frame.iterrows():
                 normalized = self._normalize_row(row)
                 rcdts_raw = normalized.get("rcdts")
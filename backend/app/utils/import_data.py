@@ -3,15 +3,37 @@
 
 from __future__ import annotations
 
+import hashlib
+import os
 import re
+import sqlite3
+import time
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
-from sqlalchemy.orm import Session
-
-from app.database import SessionLocal, School, init_db
+from sqlalchemy import create_engine, delete, select, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app.database import (
+    DATABASE_MODE_READWRITE,
+    DATABASE_PATH,
+    FTS_TRIGGERS,
+    Base,
+    School,
+    build_engine,
+    configure_sqlite_pragmas,
+    create_fts_index,
+    ensure_fts_index,
+)
+from app.services.metric_history import history_from_fields, replace_metric_history
+from app.services.school_detail import materialize_school_details
+from app.utils.column_cleaning import clean_numeric_column
 from app.utils.import_historical_trends import (
+    DEMOGRAPHIC_YEARS as TREND_YEARS,
     HistoricalDataExtractor,
     TrendCalculator,
 )
@@ -304,60 +326,117 @@ def normalize_level(school_type: Optional[str]) -> str:
     return "other"
 
 
+PERCENTAGE_COLUMNS = {
+    "el_percentage": "% Student Enrollment - EL",
+    "low_income_percentage": "% Student Enrollment - Low Income",
+    "act_ela_avg": "ACT ELA Average Score - Grade 11",
+    "act_math_avg": "ACT Math Average Score - Grade 11",
+    "act_science_avg": "ACT Science Average Score - Grade 11",
+    "iar_ela_proficiency_pct": "IAR ELA Proficiency Rate - Total",
+    "iar_math_proficiency_pct": "IAR Math Proficiency Rate - Total",
+    "pct_white": "% Student Enrollment - White",
+    "pct_black": "% Student Enrollment - Black or African American",
+    "pct_hispanic": "% Student Enrollment - Hispanic or Latino",
+    "pct_asian": "% Student Enrollment - Asian",
+    "pct_pacific_islander": "% Student Enrollment - Native Hawaiian or Other Pacific Islander",
+    "pct_native_american": "% Student Enrollment - American Indian or Alaska Native",
+    "pct_two_or_more": "% Student Enrollment - Two or More Races",
+    "pct_mena": "% Student Enrollment - Middle Eastern or North African",
+}
+
+
+def clean_percentage_column(values: np.ndarray) -> List[Optional[float]]:
+    """Vectorized clean_percentage over an object array."""
+    return clean_numeric_column(values, clean_percentage, as_int=False)
+
+
+def clean_enrollment_column(values: np.ndarray) -> List[Optional[int]]:
+    """Vectorized clean_enrollment over an object array."""
+    return clean_numeric_column(values, clean_enrollment, as_int=True)
+
+
 def prepare_school_records(
     merged_df: pd.DataFrame,
     calculator: Optional[TrendCalculator] = None,
 ) -> List[dict]:
     """Transform merged rows into dictionaries and optionally append trend fields."""
 
-    records: List[dict] = []
-    for _, row in merged_df.iterrows():
-        iar_ela = clean_percentage(row.get("IAR ELA Proficiency Rate - Total"))
-        iar_math = clean_percentage(row.get("IAR Math Proficiency Rate - Total"))
-        iar_overall = None
-        if iar_ela is not None and iar_math is not None:
-            iar_overall = (iar_ela + iar_math) / 2
-
-        record = {
-            "rcdts": row["RCDTS"],
-            "school_name": row["School Name"],
-            "district": row.get("District"),
-            "city": row.get("City"),
-            "county": row.get("County"),
-            "school_type": row.get("School Type"),
-            "level": normalize_level(row.get("School Type")),
-            "grades_served": row.get("Grades Served"),
-            "student_enrollment": clean_enrollment(row.get("# Student Enrollment")),
-            "el_percentage": clean_percentage(row.get("% Student Enrollment - EL")),
-            "low_income_percentage": clean_percentage(row.get("% Student Enrollment - Low Income")),
-            "act_ela_avg": clean_percentage(row.get("ACT ELA Average Score - Grade 11")),
-            "act_math_avg": clean_percentage(row.get("ACT Math Average Score - Grade 11")),
-            "act_science_avg": clean_percentage(row.get("ACT Science Average Score - Grade 11")),
-            "iar_ela_proficiency_pct": iar_ela,
-            "iar_math_proficiency_pct": iar_math,
-            "iar_overall_proficiency_pct": iar_overall,
-            "pct_white": clean_percentage(row.get("% Student Enrollment - White")),
-            "pct_black": clean_percentage(row.get("% Student Enrollment - Black or African American")),
-            "pct_hispanic": clean_percentage(row.get("% Student Enrollment - Hispanic or Latino")),
-            "pct_asian": clean_percentage(row.get("% Student Enrollment - Asian")),
-            "pct_pacific_islander": clean_percentage(
-                row.get("% Student Enrollment - Native Hawaiian or Other Pacific Islander")
-            ),
-            "pct_native_american": clean_percentage(
-                row.get("% Student Enrollment - American Indian or Alaska Native")
-            ),
-            "pct_two_or_more": clean_percentage(row.get("% Student Enrollment - Two or More Races")),
-            "pct_mena": clean_percentage(row.get("% Student Enrollment - Middle Eastern or North African")),
-        }
-        # Use trend calculator to add both trends and historical yearly data
-        if calculator is not None:
-            trends = calculator.calculate_trends_for_school(record["rcdts"], record)
-            record.update(trends)
-
-            historical_yearly = calculator.extract_historical_yearly_data(record["rcdts"], record)
-            record.update(historical_yearly)
-
-        records.append(record)
+    row_count = len(merged_df)
+
+    def column(name: str) -> np.ndarray:
+        if name not in merged_df.columns:
+            return np.full(row_count, None, dtype=object)
+        return merged_df[name].to_numpy(dtype=object)
+
+    school_types = column("School Type")
+    level_by_type = {value: normalize_level(value) for value in pd.unique(school_types)}
+
+    columns: Dict[str, List[Any]] = {
+        "rcdts": merged_df["RCDTS"].to_numpy(dtype=object).tolist(),
+        "school_name": merged_df["School Name"].to_numpy(dtype=object).tolist(),
+        "district": column("District").tolist(),
+        "city": column("City").tolist(),
+        "county": column("County").tolist(),
+        "school_type": school_types.tolist(),
+        "level": [level_by_type[value] for value in school_types.tolist()],
+        "grades_served": column("Grades Served").tolist(),
+        "student_enrollment": clean_enrollment_column(column("# Student Enrollment")),
+    }
+    for field, source_column in PERCENTAGE_COLUMNS.items():
+        columns[field] = clean_percentage_column(column(source_column))
+
+    columns["iar_overall_proficiency_pct"] = [
+        (ela + math) / 2 if ela is not None and math is not None else None
+        for ela, math in zip(columns["iar_ela_proficiency_pct"], columns["iar_math_proficiency_pct"])
+    ]
+
+    field_order = [
+        "rcdts",
+        "school_name",
+        "district",
+        "city",
+        "county",
+        "school_type",
+        "level",
+        "grades_served",
+        "student_enrollment",
+        "el_percentage",
+        "low_income_percentage",
+        "act_ela_avg",
+        "act_math_avg",
+        "act_science_avg",
+        "iar_ela_proficiency_pct",
+        "iar_math_proficiency_pct",
+        "iar_overall_proficiency_pct",
+        "pct_white",
+        "pct_black",
+        "pct_hispanic",
+        "pct_asian",
+        "pct_pacific_islander",
+        "pct_native_american",
+        "pct_two_or_more",
+        "pct_mena",
+    ]
+    records = [
+        dict(zip(field_order, values))
+        for values in zip(*(columns[field] for field in field_order))
+    ]
+
+    # Use trend calculator to add both trends and historical yearly data
+    if calculator is not None:
+        rcdts_codes = columns["rcdts"]
+        trends = calculator.calculate_trends_batch(rcdts_codes, records)
+        historical_yearly = calculator.extract_historical_yearly_data_batch(rcdts_codes, records)
+        for record, school_trends, school_history in zip(records, trends, historical_yearly):
+            record.update(school_trends)
+            # Wide *_hist_{year} columns only exist for 2010-2025; the long-format
+            # history keeps every year the batch produced
+            record.update(school_history)
+            record["history"] = history_from_fields(school_history)
+
+    for record in records:
+        record["content_hash"] = school_content_hash(record)
+
     return records
 
 
@@ -426,35 +505,265 @@ def _calculate_trend_delta(
     return float(current_value) - float(historical_value)
 
 
-def import_to_database(excel_path: str, db: Session) -> int:
-    """Run full import pipeline: load, clean, and bulk insert to schools table."""
+def import_to_database(
+    excel_path: str,
+    db: Session,
+    workers: Optional[int] = None,
+    use_cache: bool = True,
+    low_memory: bool = False,
+) -> int:
+    """Run full import pipeline: load, clean, and upsert changed rows into the schools table."""
 
     print("Loading Excel data...")
     general_df, act_df, iar_df = load_excel_data(excel_path)
     merged_df = merge_school_data(general_df, act_df, iar_df)
 
     print("Initializing historical trend calculator...")
-    extractor = HistoricalDataExtractor()
+    extractor = HistoricalDataExtractor(use_cache=use_cache, low_memory=low_memory)
     calculator = TrendCalculator(extractor)
 
     try:
+        print("Parsing historical report cards...")
+        # Every year the trend batch reads (2010-2024), not the shorter DEMOGRAPHIC_YEARS above
+        extractor.preload(TREND_YEARS, workers=workers)
         print(f"Preparing {len(merged_df)} school records with trends...")
         records = prepare_school_records(merged_df, calculator=calculator)
     finally:
         extractor.clear_cache()
 
-    print("Clearing existing database...")
-    db.query(School).delete()
-    db.commit()
+    counts = sync_school_rows(db, records)
+    print(
+        "Schools: {inserted} inserted, {updated} updated, {unchanged} unchanged, "
+        "{deleted} deleted".format(**counts)
+    )
 
-    if records:
-        print(f"Inserting {len(records)} schools into database...")
-        db.bulk_insert_mappings(School, records)
-        db.commit()
+    if counts["inserted"] or counts["updated"] or counts["deleted"]:
+        print("Materializing school detail payloads...")
+        materialize_school_details(db)
 
     return len(records)
 
 
+SCHOOL_INSERT_CHUNK_SIZE = 500
+
+# Above this many written or deleted rows, dropping the FTS triggers and
+# rebuilding the index once beats maintaining it row by row
+FTS_TRIGGER_ROW_LIMIT = 500
+
+# Columns produced by prepare_school_records; content_hash covers exactly these
+IMPORTED_COLUMNS = [
+    column.name
+    for column in School.__table__.columns
+    if column.name not in {"id", "content_hash", "created_at"}
+]
+
+
+def school_content_hash(record: Dict[str, Any]) -> str:
+    """sha256 over a record's imported values and history; absent fields hash like NULL."""
+    history = record.get("history") or {}
+    values = (
+        *(record.get(name) for name in IMPORTED_COLUMNS),
+        sorted((metric, sorted(years.items())) for metric, years in history.items()),
+    )
+    return hashlib.sha256(repr(values).encode("utf-8")).hexdigest()
+
+
+def sync_school_rows(db: Session, records: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Make the schools table match records, writing only rows whose content hash
+    changed and deleting schools that are no longer present. Written schools
+    get their school_metric_history rows replaced from record["history"].
+    """
+    ensure_content_hash_column(db)
+    existing = dict(db.execute(select(School.rcdts, School.content_hash)).all())
+    incoming = {record["rcdts"] for record in records}
+
+    changed = [record for record in records if existing.get(record["rcdts"]) != record["content_hash"]]
+    missing = [rcdts for rcdts in existing if rcdts not in incoming]
+    inserted = sum(1 for record in changed if record["rcdts"] not in existing)
+    counts = {
+        "inserted": inserted,
+        "updated": len(changed) - inserted,
+        "unchanged": len(records) - len(changed),
+        "deleted": len(missing),
+    }
+    if not changed and not missing:
+        return counts
+
+    # The FTS triggers would index every written row one at a time; for large
+    # loads drop them and rebuild the index in one pass afterwards
+    had_fts_triggers = len(changed) + len(missing) > FTS_TRIGGER_ROW_LIMIT and _drop_fts_triggers(db)
+
+    started = time.perf_counter()
+    try:
+        for start in range(0, len(missing), SCHOOL_INSERT_CHUNK_SIZE):
+            db.execute(delete(School).where(School.rcdts.in_(missing[start : start + SCHOOL_INSERT_CHUNK_SIZE])))
+        if changed:
+            # An empty table (e.g. the shadow build, whose unique rcdts index is only
+            # created after the load) has nothing to conflict with: plain INSERT
+            upsert_school_rows(db, changed, update_existing=bool(existing))
+        replace_metric_history(db, {record["rcdts"]: record.get("history") or {} for record in changed})
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+    finally:
+        # Restore the triggers even when the write failed: the API never
+        # rebuilds them, so a failed import would otherwise leave search stale
+        if had_fts_triggers:
+            print("Rebuilding search index...")
+            create_fts_index(db.get_bind())
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    written = len(changed) + len(missing)
+    print(f"Wrote {written} schools in {elapsed:.2f}s ({written / elapsed:,.0f} rows/sec)")
+    return counts
+
+
+def upsert_school_rows(
+    db: Session, records: List[Dict[str, Any]], update_existing: bool = True
+) -> None:
+    """INSERT ... ON CONFLICT(rcdts) DO UPDATE over chunks of rows with one statement."""
+    keys = [*IMPORTED_COLUMNS, "content_hash"]
+    statement = sqlite_insert(School.__table__)
+    if update_existing:
+        statement = statement.on_conflict_do_update(
+            index_elements=["rcdts"],
+            set_={key: statement.excluded[key] for key in keys if key != "rcdts"},
+        )
+    for start in range(0, len(records), SCHOOL_INSERT_CHUNK_SIZE):
+        # executemany needs the same keys in every row; absent fields write NULL
+        chunk = [
+            {key: record.get(key) for key in keys}
+            for record in records[start : start + SCHOOL_INSERT_CHUNK_SIZE]
+        ]
+        db.execute(statement, chunk)
+
+
+def ensure_content_hash_column(db: Session) -> None:
+    """Add schools.content_hash to databases imported before it existed."""
+    columns = {row[1] for row in db.execute(text("PRAGMA table_info(schools)"))}
+    if "content_hash" not in columns:
+        db.execute(text("ALTER TABLE schools ADD COLUMN content_hash VARCHAR(64)"))
+        db.commit()
+
+
+def _drop_fts_triggers(db: Session) -> bool:
+    """Drop the schools_fts sync triggers; return True if any existed.
+
+    sync_school_rows recreates them when its write fails; only a killed import
+    leaves them missing, which ensure_fts_index treats as stale.
+    """
+    names = ", ".join(f"'{trigger}'" for trigger in FTS_TRIGGERS)
+    existing = db.execute(
+        text(f"SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name IN ({names})")
+    ).scalar()
+    for trigger in FTS_TRIGGERS:
+        db.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+    db.commit()
+    return bool(existing)
+
+
+# The shadow file is private until the rename, so the load skips journaling and fsync
+SHADOW_BUILD_PRAGMAS = {"journal_mode": "OFF", "synchronous": "OFF", "temp_store": "MEMORY"}
+
+
+def build_database(
+    excel_path: str,
+    database_path: str = DATABASE_PATH,
+    workers: Optional[int] = None,
+    use_cache: bool = True,
+    low_memory: bool = False,
+) -> int:
+    """
+    Import into a sibling shadow file and atomically rename it over database_path.
+
+    Readers of the live database keep seeing the previous data until the swap.
+    Secondary indexes and the FTS index are built once after the bulk load.
+    """
+    target = Path(database_path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    shadow = target.with_name(f".{target.name}.building-{os.getpid()}")
+    shadow.unlink(missing_ok=True)
+
+    shadow_engine = create_engine(f"sqlite:///{shadow}")
+    configure_sqlite_pragmas(shadow_engine, SHADOW_BUILD_PRAGMAS)
+    try:
+        tables = Base.metadata.sorted_tables
+        with shadow_engine.begin() as conn:
+            for table in tables:
+                conn.execute(CreateTable(table))
+
+        db = sessionmaker(autocommit=False, autoflush=False, bind=shadow_engine)()
+        try:
+            count = import_to_database(
+                excel_path, db, workers=workers, use_cache=use_cache, low_memory=low_memory
+            )
+        finally:
+            db.close()
+
+        print("Building indexes...")
+        with shadow_engine.begin() as conn:
+            for table in tables:
+                for index in sorted(table.indexes, key=lambda index: index.name):
+                    conn.execute(CreateIndex(index))
+        create_fts_index(shadow_engine)
+        with shadow_engine.connect() as conn:
+            conn.exec_driver_sql("ANALYZE")
+            conn.commit()
+            conn.exec_driver_sql("VACUUM")
+    except BaseException:
+        shadow_engine.dispose()
+        shadow.unlink(missing_ok=True)
+        raise
+    shadow_engine.dispose()
+
+    print(f"Swapping {shadow.name} into {target}...")
+    try:
+        _swap_database_file(shadow, target)
+    except BaseException:
+        shadow.unlink(missing_ok=True)
+        raise
+    return count
+
+
+def _swap_database_file(shadow: Path, target: Path) -> None:
+    """Durably rename shadow over target, leaving the live WAL empty for new readers."""
+    with open(shadow, "rb+") as handle:
+        os.fsync(handle.fileno())
+
+    if target.exists():
+        # Readers still on the old file share its -wal/-shm names with the new
+        # file; any frame left behind would be replayed over the new database.
+        _checkpoint_live_wal(target)
+
+    os.replace(shadow, target)
+
+
+# How long the swap waits for readers holding an old WAL snapshot to finish
+SWAP_CHECKPOINT_TIMEOUT = 30.0
+SWAP_CHECKPOINT_RETRY_DELAY = 0.05
+
+
+def _checkpoint_live_wal(target: Path) -> None:
+    """Fold the whole WAL back into target, retrying while readers pin old frames."""
+    deadline = time.monotonic() + SWAP_CHECKPOINT_TIMEOUT
+    live = sqlite3.connect(target)
+    try:
+        while True:
+            # (busy, log frames, checkpointed frames); (0, -1, -1) outside WAL mode
+            busy, log, checkpointed = live.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+            if busy == 0 and log == checkpointed:
+                return
+            if time.monotonic() >= deadline:
+                raise RuntimeError(
+                    f"Could not checkpoint {target.name}: readers still hold an old snapshot "
+                    f"after {SWAP_CHECKPOINT_TIMEOUT:.0f}s; the live database was left unchanged"
+                )
+            time.sleep(SWAP_CHECKPOINT_RETRY_DELAY)
+    finally:
+        live.close()
+
+
 YEAR_PATTERN = re.compile(r"(20\d{2})")
 
 
@@ -471,15 +780,50 @@ def main() -> None:  # pragma: no cover
 
     parser = argparse.ArgumentParser(description="Load Illinois Report Card data into SQLite")
     parser.add_argument("excel_path", help="Path to 2025 Report Card Excel file")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Processes used to parse historical files (default: all cores; 1 disables parallelism)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-parse historical files instead of reusing data/.cache",
+    )
+    parser.add_argument(
+        "--low-memory",
+        action="store_true",
+        help="Stream historical sheets row by row, one year at a time, to bound memory use",
+    )
+    parser.add_argument(
+        "--database",
+        default=DATABASE_PATH,
+        help=f"SQLite file to replace atomically (default: {DATABASE_PATH})",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Upsert only changed schools into the existing database instead of rebuilding it",
+    )
     args = parser.parse_args()
 
-    init_db()
-    db = SessionLocal()
-    try:
-        count = import_to_database(args.excel_path, db)
-        print(f"Imported {count} schools successfully")
-    finally:
-        db.close()
+    # Parallel workers would each hold a workbook, so low-memory mode defaults to one
+    workers = args.workers if args.workers is not None or not args.low_memory else 1
+    options = dict(workers=workers, use_cache=not args.no_cache, low_memory=args.low_memory)
+    if args.incremental:
+        target_engine = build_engine(DATABASE_MODE_READWRITE, args.database)
+        Base.metadata.create_all(bind=target_engine)
+        ensure_fts_index(target_engine)
+        db = sessionmaker(autocommit=False, autoflush=False, bind=target_engine)()
+        try:
+            count = import_to_database(args.excel_path, db, **options)
+        finally:
+            db.close()
+            target_engine.dispose()
+    else:
+        count = build_database(args.excel_path, args.database, **options)
+    print(f"Imported {count} schools successfully")
 
 
 if __name__ == "__main__":  # pragma: no cover
@@ -4,18 +4,35 @@
 from __future__ import annotations
 
 import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
+import numpy as np
 import pandas as pd
-from sqlalchemy import text
+from openpyxl import load_workbook
+from openpyxl.cell.cell import ERROR_CODES
+from sqlalchemy import select, text
 from sqlalchemy.orm import Session
 
 from app.database import School, SessionLocal, init_db
+from app.services.metric_history import history_from_fields, replace_metric_history
+from app.services.school_detail import materialize_school_details
+from app.utils.column_cleaning import clean_numeric_column
+from app.utils.convert_txt_to_xlsx import parquet_engine_available
+from app.utils.historical_cache import ParsedYearCache, default_cache_dir
 
 # Historical file configuration
 HISTORICAL_DATA_PATH = Path(__file__).resolve().parents[3] / "data" / "historical-report-cards"
 
+# Modules whose code decides what a parsed year contains; editing any of them
+# invalidates the on-disk parse cache
+PARSER_SOURCES = tuple(
+    Path(__file__).with_name(name)
+    for name in ("import_historical_trends.py", "column_cleaning.py", "convert_txt_to_xlsx.py")
+)
+
 # Years to process (2025 is current, looking back 15 years to 2010)
 CURRENT_YEAR = 2025
 DEMOGRAPHIC_YEARS = [2024, 2023, 2022, 2021, 2020, 2019, 2018, 2017, 2016, 2015, 2014, 2013, 2012, 2011, 2010]
@@ -25,6 +42,113 @@ ACT_YEARS = [2017, 2016, 2015, 2014, 2013, 2012, 2011, 2010]  # Years with direc
 # Trend windows
 TREND_WINDOWS = [1, 3, 5, 10, 15]
 
+DIVERSITY_METRICS = [
+    'white', 'black', 'hispanic', 'asian',
+    'pacific_islander', 'native_american', 'two_or_more', 'mena'
+]
+
+# Every schools column update_school_trends can write, in a fixed order so the
+# staged rows share one INSERT statement
+TREND_FIELDS = [
+    f'{metric}_trend_{window}yr'
+    for metric in ['act', 'enrollment', 'low_income', 'el', *DIVERSITY_METRICS]
+    for window in TREND_WINDOWS
+]
+TREND_STAGING_TABLE = 'school_trend_updates'
+
+# Extracted per-school fields stacked into (school x DEMOGRAPHIC_YEARS) arrays
+# by the batch API; act_scores sub-keys are flattened to act_ela/math/science.
+PANEL_FIELDS = (
+    'enrollment', 'low_income_percentage', 'el_percentage', *DIVERSITY_METRICS,
+    'sat_composite', 'sat_reading', 'sat_math',
+    'act_composite', 'act_ela', 'act_math', 'act_science',
+)
+
+# Normalized header aliases per extracted metric, in priority order. Each file
+# format names the same metric differently; the first non-empty value wins.
+METRIC_COLUMN_ALIASES: Dict[str, List[str]] = {
+    'enrollment': [
+        '# student enrollment',
+        'student enrollment',
+        'student enrollment - total',  # 2018 format
+    ],
+    'low_income_percentage': [
+        '% student enrollment - low income',  # 2019+ format
+        'student enrollment - low income %',  # 2018 format
+        '% low-income',  # 2010-2017 format
+        '% low income',  # Alternative old format
+    ],
+    'el_percentage': [
+        '% student enrollment - el',  # 2019+ format
+        'student enrollment - el %',  # 2018 format
+        '% el',  # 2010-2017 format (if exists)
+        '% english learners',  # Alternative old format
+    ],
+    'white': ['% student enrollment - white', 'student enrollment - white %', '% white'],
+    'black': ['% student enrollment - black or african american', 'student enrollment - black or african american %', '% black'],
+    'hispanic': ['% student enrollment - hispanic or latino', 'student enrollment - hispanic or latino %', '% hispanic'],
+    'asian': ['% student enrollment - asian', 'student enrollment - asian %', '% asian'],
+    'pacific_islander': ['% student enrollment - native hawaiian or other pacific islander', 'student enrollment - native hawaiian or other pacific islander %', '% native hawaiian or other pacific islander'],
+    'native_american': ['% student enrollment - american indian or alaska native', 'student enrollment - american indian or alaska native %', '% native american', '% american indian or alaska native'],
+    'two_or_more': ['% student enrollment - two or more races', 'student enrollment - two or more races %', '% two or more races'],
+    'mena': ['% student enrollment - middle eastern or north african', 'student enrollment - middle eastern or north african %', '% mena'],
+    'sat_reading': [
+        'sat reading average score',
+        'sat ebrw average score',
+        'sat reading average',  # 2019 format
+        'ela',  # 2018 PARCC-SAT file format (last column)
+    ],
+    'sat_math': [
+        'sat math average score',
+        'sat math average',  # 2019 format
+        'math',  # 2018 PARCC-SAT file format (last column)
+    ],
+    'act_composite': [
+        'act composite score - grade 11',  # Newer format
+        'act average composite score',
+        'average act composite score',
+        'act composite',  # 2010-2017 format
+    ],
+}
+
+# Direct ACT subject scores, stored under school['act_scores'][subject]
+ACT_SCORE_COLUMN_ALIASES: Dict[str, List[str]] = {
+    'ela': [
+        'act ela average score - grade 11',
+        'act ela',  # 2010-2017 format
+        'act reading',  # Alternative old format
+    ],
+    'math': [
+        'act math average score - grade 11',
+        'act math',  # 2010-2017 format
+    ],
+    'science': [
+        'act science average score - grade 11',
+        'act science',  # 2010-2017 format
+    ],
+}
+
+# Every normalized header _extract_from_excel reads; other columns are skipped
+EXTRACTED_COLUMNS = frozenset(
+    ['rcdts']
+    + [alias for aliases in METRIC_COLUMN_ALIASES.values() for alias in aliases]
+    + [alias for aliases in ACT_SCORE_COLUMN_ALIASES.values() for alias in aliases]
+)
+
+# Rows read when sniffing a sheet: the header plus the column-shift sample
+HEADER_SNIFF_ROWS = 11
+
+# Rows buffered per extraction batch by the low-memory streaming reader
+STREAM_CHUNK_ROWS = 2000
+
+# pandas' default na_values plus Excel error codes: the streaming reader maps
+# these to missing so it sees the same cells pd.read_excel would
+_MISSING_CELL_STRINGS = frozenset([
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND',
+    '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+    *ERROR_CODES,
+])
+
 # SAT to ACT concordance table with ranges
 SAT_TO_ACT_RANGES = [
     (1570, 1600, 36), (1530, 1560, 35), (1490, 1520, 34), (1450, 1480, 33),
@@ -112,6 +236,48 @@ def sat_to_act_precise(sat_composite: float) -> Optional[float]:
     return None
 
 
+def sat_to_act_precise_array(sat_composites: np.ndarray) -> np.ndarray:
+    """Vectorized sat_to_act_precise; NaN in, NaN out."""
+    scores = np.asarray(sat_composites, dtype=np.float64)
+    result = np.full(scores.shape, np.nan)
+    pending = ~np.isnan(scores)
+    needs_rounding = np.zeros(scores.shape, dtype=bool)
+
+    def settle(mask: np.ndarray, values, rounded: bool) -> None:
+        nonlocal pending
+        result[mask] = values[mask] if isinstance(values, np.ndarray) else values
+        needs_rounding[mask] = rounded
+        pending &= ~mask
+
+    settle(pending & (scores >= SAT_TO_ACT_RANGES[0][1]), float(SAT_TO_ACT_RANGES[0][2]), False)
+    settle(pending & (scores <= SAT_TO_ACT_RANGES[-1][0]), float(SAT_TO_ACT_RANGES[-1][2]), False)
+
+    # Gaps between adjacent ranges interpolate between their ACT scores
+    for i in range(len(SAT_TO_ACT_RANGES) - 1):
+        current_min = SAT_TO_ACT_RANGES[i][0]
+        next_max = SAT_TO_ACT_RANGES[i + 1][1]
+        in_gap = pending & (next_max < scores) & (scores < current_min)
+        if in_gap.any():
+            lower_act = SAT_TO_ACT_RANGES[i + 1][2]
+            upper_act = SAT_TO_ACT_RANGES[i][2]
+            progress = (scores - next_max) / (current_min - next_max)
+            settle(in_gap, lower_act + (progress * (upper_act - lower_act)), True)
+
+    for i, (min_sat, max_sat, act_score) in enumerate(SAT_TO_ACT_RANGES):
+        in_range = pending & (min_sat <= scores) & (scores <= max_sat)
+        if not in_range.any():
+            continue
+        if i in (0, len(SAT_TO_ACT_RANGES) - 1):
+            settle(in_range, float(act_score), False)
+        else:
+            upper_act = SAT_TO_ACT_RANGES[i - 1][2]
+            progress = (scores - min_sat) / (max_sat - min_sat)
+            settle(in_range, act_score + (progress * (upper_act - act_score)), True)
+
+    result[needs_rounding] = round_like_python(result[needs_rounding], 1)
+    return result
+
+
 def clean_percentage(value: Any) -> Optional[float]:
     """Convert percentage-like values to float, handling asterisks and empty values."""
     if value is None or (isinstance(value, float) and pd.isna(value)):
@@ -155,6 +321,33 @@ def clean_enrollment(value: Any) -> Optional[int]:
     return None
 
 
+def clean_percentage_column(values: np.ndarray) -> List[Optional[float]]:
+    """Vectorized clean_percentage over an object array."""
+    return clean_numeric_column(values, clean_percentage, as_int=False)
+
+
+def clean_enrollment_column(values: np.ndarray) -> List[Optional[int]]:
+    """Vectorized clean_enrollment over an object array."""
+    return clean_numeric_column(values, clean_enrollment, as_int=True)
+
+
+def _excel_cell_value(value: Any) -> Any:
+    """Convert a raw openpyxl cell value the way pd.read_excel does."""
+    if isinstance(value, str):
+        return None if value in _MISSING_CELL_STRINGS else value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _trim_empty_cells(row: Sequence[Any]) -> List[Any]:
+    """Drop trailing empty cells, as pandas does before padding rows."""
+    cells = list(row)
+    while cells and (cells[-1] is None or cells[-1] == ''):
+        cells.pop()
+    return cells
+
+
 def normalize_rcdts(rcdts: str) -> str:
     """Remove hyphens from RCDTS for consistent lookups."""
     return rcdts.replace("-", "")
@@ -168,9 +361,25 @@ def normalize_column_name(col: str) -> str:
 class HistoricalDataExtractor:
     """Extract and normalize data from historical Report Card Excel files."""
 
-    def __init__(self, base_path: Path = HISTORICAL_DATA_PATH):
+    def __init__(
+        self,
+        base_path: Path = HISTORICAL_DATA_PATH,
+        cache_dir: Optional[Path] = None,
+        use_cache: bool = True,
+        low_memory: bool = False,
+    ):
         self.base_path = base_path
+        # Stream sheets through read-only openpyxl instead of whole-sheet DataFrames
+        self.low_memory = low_memory
         self._cache: Dict[int, Dict[str, Dict[str, Any]]] = {}
+        self._failed_files: set[Path] = set()
+        # Parsed years persist under data/.cache so reruns skip Excel parsing
+        self.cache_dir = Path(cache_dir or default_cache_dir(base_path)) if use_cache else None
+        self._parse_cache = (
+            ParsedYearCache(self.cache_dir, "extractor", base_path, PARSER_SOURCES)
+            if self.cache_dir is not None
+            else None
+        )
 
     def load_year(self, year: int) -> Dict[str, Dict[str, Any]]:
         """
@@ -188,10 +397,21 @@ class HistoricalDataExtractor:
             self._cache[year] = {}
             return {}
 
+        if self._parse_cache is not None:
+            cached = self._parse_cache.load(year, file_paths)
+            if cached is not None:
+                self._cache[year] = cached
+                return cached
+
         # Process all files and merge data
         merged_data: Dict[str, Dict[str, Any]] = {}
         for file_path in file_paths:
-            file_data = self._extract_from_excel(file_path)
+            if file_path.suffix == '.parquet':
+                file_data = self._extract_from_parquet(file_path)
+            elif self.low_memory:
+                file_data = self._extract_from_excel_streaming(file_path)
+            else:
+                file_data = self._extract_from_excel(file_path)
 
             # Merge data for each school
             for rcdts, school_data in file_data.items():
@@ -200,12 +420,39 @@ class HistoricalDataExtractor:
                 # Update with new data, preserving existing values
                 merged_data[rcdts].update(school_data)
 
+        if self._parse_cache is not None and not self._failed_files.intersection(file_paths):
+            self._parse_cache.store(year, file_paths, merged_data)
+
         self._cache[year] = merged_data
         return merged_data
 
+    def preload(self, years: Iterable[int] = DEMOGRAPHIC_YEARS, workers: Optional[int] = None) -> None:
+        """
+        Parse several years up front, one year per worker process.
+
+        workers=None uses every core; workers=1 parses sequentially in this process.
+        Years already in the cache are skipped.
+        """
+        pending = [year for year in dict.fromkeys(years) if year not in self._cache]
+        if workers == 1 or len(pending) <= 1:
+            for year in pending:
+                self.load_year(year)
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(
+                _load_year_in_worker,
+                [self.base_path] * len(pending),
+                [self.cache_dir] * len(pending),
+                [self.low_memory] * len(pending),
+                pending,
+            )
+            for year, year_data in zip(pending, results):
+                self._cache[year] = year_data
+
     def _find_files_for_year(self, year: int) -> List[Path]:
         """
-        Find all Excel files for a given year.
+        Find all Excel (or converted Parquet) files for a given year.
         Returns list of matching files (may be multiple for years like 2018).
         """
         if not self.base_path.exists():
@@ -214,9 +461,12 @@ class HistoricalDataExtractor:
         year_str = str(year)
         year_short = year_str[-2:]  # e.g., "24" for 2024
 
+        # Parquet conversions of legacy TXT years are only usable with an engine installed
+        patterns = ["*.xlsx", "*.parquet"] if parquet_engine_available() else ["*.xlsx"]
+
         # Collect all candidate files, excluding temp/layout files
         candidates = []
-        for file_path in self.base_path.glob("*.xlsx"):
+        for file_path in chain.from_iterable(self.base_path.glob(pattern) for pattern in patterns):
             filename = file_path.stem.lower()
 
             # Skip temp files and layout files
@@ -230,6 +480,10 @@ class HistoricalDataExtractor:
                 # For recent years, match "YY-RC" pattern (e.g., "24-RC-Pub-Data-Set.xlsx")
                 candidates.append(file_path)
 
+        # A .parquet conversion replaces the workbook with the same name
+        parquet_stems = {p.stem.lower() for p in candidates if p.suffix == '.parquet'}
+        candidates = [p for p in candidates if p.suffix == '.parquet' or p.stem.lower() not in parquet_stems]
+
         # Sort to ensure consistent ordering (Report Card files before PARCC/supplemental)
         # This ensures base data loads first, then supplemental data merges in
         candidates.sort(key=lambda p: (
@@ -284,244 +538,253 @@ class HistoricalDataExtractor:
                 if sheet_name.lower() in ['notes', 'important notes']:
                     continue
 
-                # Read completely raw to handle column shift
+                # Sniff the header row(s) and the rows used for shift detection first
                 header_row = 6 if is_2018_parcc else 0
-                df_raw = pd.read_excel(excel, sheet_name=sheet_name, header=None)
-
-                if len(df_raw) == 0:
-                    continue
-
-                # Extract headers from appropriate row
-                if header_row >= len(df_raw):
+                df_head = pd.read_excel(
+                    excel, sheet_name=sheet_name, header=None, nrows=header_row + HEADER_SNIFF_ROWS
+                )
+                wanted = self._sheet_columns(df_head, header_row)
+                if wanted is None:
                     continue
-                headers = list(df_raw.iloc[header_row])
-
-                # Check if there's a column shift (column 1 all NaN in data rows)
-                has_shift = False
-                if len(df_raw.columns) > 1 and len(df_raw) > 1:
-                    if df_raw.iloc[1:11, 1].isna().all():  # Check first 10 data rows
-                        has_shift = True
 
-                if has_shift:
-                    # Drop the unnamed data column (index 1)
-                    df_raw = df_raw.drop(df_raw.columns[1], axis=1)
-                    # Also remove the header for that column
-                    headers = [headers[i] for i in range(len(headers)) if i != 1]
+                # Read only the columns some alias table asks for
+                df_raw = pd.read_excel(
+                    excel,
+                    sheet_name=sheet_name,
+                    header=None,
+                    usecols=[position for position, _ in wanted],
+                )
 
-                # Now create dataframe with corrected headers
                 # For 2018 PARCC, start after header row (row 7); for others, start at row 1
                 data_start_row = header_row + 1
                 df = df_raw.iloc[data_start_row:].copy()
-                df.columns = headers
+                df.columns = [name for _, name in wanted]
                 df = df.reset_index(drop=True)
 
-                if 'RCDTS' not in df.columns:
-                    continue
+                self._extract_sheet(df, schools_data)
 
-                # Normalize column names
-                df.columns = [normalize_column_name(col) for col in df.columns]
+        except Exception as e:
+            print(f"Error reading {file_path}: {e}")
+            self._failed_files.add(file_path)
+            return {}
 
-                for _, row in df.iterrows():
-                    rcdts = self._extract_rcdts(row)
-                    if not rcdts:
-                        continue
+        return schools_data
 
-                    # Initialize school data dict
-                    if rcdts not in schools_data:
-                        schools_data[rcdts] = {}
+    def _extract_from_parquet(self, file_path: Path) -> Dict[str, Dict[str, Any]]:
+        """Extract data from a General-sheet Parquet file written by convert_txt_to_parquet."""
+        schools_data: Dict[str, Dict[str, Any]] = {}
 
-                    school = schools_data[rcdts]
+        try:
+            df = pd.read_parquet(file_path)
+            if 'RCDTS' not in df.columns:
+                return {}
 
-                    # Extract data based on sheet content
-                    self._extract_demographics(row, school)
-                    self._extract_diversity(row, school)
-                    self._extract_sat(row, school)
-                    self._extract_act(row, school)
+            names = [normalize_column_name(col) for col in df.columns]
+            wanted = [position for position, name in enumerate(names) if name in EXTRACTED_COLUMNS]
+            df = df.iloc[:, wanted].reset_index(drop=True)
+            df.columns = [names[position] for position in wanted]
+
+            self._extract_sheet(df, schools_data)
 
         except Exception as e:
             print(f"Error reading {file_path}: {e}")
+            self._failed_files.add(file_path)
             return {}
 
         return schools_data
 
-    def _extract_rcdts(self, row: pd.Series) -> Optional[str]:
-        """Extract and normalize RCDTS from a row."""
-        rcdts = row.get('rcdts')
-        if rcdts is None or (isinstance(rcdts, float) and pd.isna(rcdts)):
+    def _sheet_columns(self, df_head: pd.DataFrame, header_row: int) -> Optional[List[Tuple[int, str]]]:
+        """(position, normalized header) of the columns to read, or None to skip the sheet."""
+        if len(df_head) == 0:
             return None
-        return normalize_rcdts(str(rcdts).strip())
 
-    def _extract_demographics(self, row: pd.Series, school: Dict[str, Any]) -> None:
-        """Extract enrollment and demographic percentages."""
-        # Enrollment
-        enrollment_cols = [
-            '# student enrollment',
-            'student enrollment',
-            'student enrollment - total',  # 2018 format
-        ]
-        for col in enrollment_cols:
-            if col in row.index:
-                val = clean_enrollment(row[col])
-                if val is not None:
-                    school['enrollment'] = val
-                    break
-
-        # Low income percentage (try both new and old formats)
-        low_income_cols = [
-            '% student enrollment - low income',  # 2019+ format
-            'student enrollment - low income %',  # 2018 format
-            '% low-income',  # 2010-2017 format
-            '% low income',  # Alternative old format
-        ]
-        for col in low_income_cols:
-            if col in row.index:
-                val = clean_percentage(row[col])
-                if val is not None:
-                    school['low_income_percentage'] = val
-                    break
-
-        # English Learner percentage (try both new and old formats)
-        el_cols = [
-            '% student enrollment - el',  # 2019+ format
-            'student enrollment - el %',  # 2018 format
-            '% el',  # 2010-2017 format (if exists)
-            '% english learners',  # Alternative old format
-        ]
-        for col in el_cols:
-            if col in row.index:
-                val = clean_percentage(row[col])
-                if val is not None:
-                    school['el_percentage'] = val
-                    break
-
-    def _extract_diversity(self, row: pd.Series, school: Dict[str, Any]) -> None:
-        """Extract racial/ethnic diversity percentages."""
-        # Map: [(column_name_variants, key), ...]
-        diversity_cols = [
-            (['% student enrollment - white', 'student enrollment - white %', '% white'], 'white'),
-            (['% student enrollment - black or african american', 'student enrollment - black or african american %', '% black'], 'black'),
-            (['% student enrollment - hispanic or latino', 'student enrollment - hispanic or latino %', '% hispanic'], 'hispanic'),
-            (['% student enrollment - asian', 'student enrollment - asian %', '% asian'], 'asian'),
-            (['% student enrollment - native hawaiian or other pacific islander', 'student enrollment - native hawaiian or other pacific islander %', '% native hawaiian or other pacific islander'], 'pacific_islander'),
-            (['% student enrollment - american indian or alaska native', 'student enrollment - american indian or alaska native %', '% native american', '% american indian or alaska native'], 'native_american'),
-            (['% student enrollment - two or more races', 'student enrollment - two or more races %', '% two or more races'], 'two_or_more'),
-            (['% student enrollment - middle eastern or north african', 'student enrollment - middle eastern or north african %', '% mena'], 'mena'),
-        ]
+        # Extract headers from appropriate row
+        if header_row >= len(df_head):
+            return None
+        headers = list(df_head.iloc[header_row])
+        positions = list(range(len(headers)))
 
-        for col_variants, key in diversity_cols:
-            for col in col_variants:
-                if col in row.index:
-                    val = clean_percentage(row[col])
-                    if val is not None:
-                        school[key] = val
-                        break
-
-    def _extract_sat(self, row: pd.Series, school: Dict[str, Any]) -> None:
-        """Extract SAT scores and compute composite."""
-        # Try multiple column name variations
-        reading_cols = [
-            'sat reading average score',
-            'sat ebrw average score',
-            'sat reading average',  # 2019 format
-            'ela',  # 2018 PARCC-SAT file format (last column)
-        ]
-        math_cols = [
-            'sat math average score',
-            'sat math average',  # 2019 format
-            'math',  # 2018 PARCC-SAT file format (last column)
-        ]
+        # Check if there's a column shift (column 1 all NaN in data rows)
+        has_shift = False
+        if len(df_head.columns) > 1 and len(df_head) > 1:
+            if df_head.iloc[1:11, 1].isna().all():  # Check first 10 data rows
+                has_shift = True
 
-        reading = None
-        math = None
-
-        for col in reading_cols:
-            if col in row.index:
-                reading = clean_percentage(row[col])
-                if reading is not None:
-                    break
-
-        for col in math_cols:
-            if col in row.index:
-                math = clean_percentage(row[col])
-                if math is not None:
-                    break
-
-        if reading is not None:
-            school['sat_reading'] = reading
-        if math is not None:
-            school['sat_math'] = math
-        if reading is not None and math is not None:
-            school['sat_composite'] = reading + math
-
-    def _extract_act(self, row: pd.Series, school: Dict[str, Any]) -> None:
-        """Extract direct ACT scores (composite, ELA, Math, Science for older years)."""
-        # ACT Composite
-        composite_cols = [
-            'act composite score - grade 11',  # Newer format
-            'act average composite score',
-            'average act composite score',
-            'act composite',  # 2010-2017 format
-        ]
-        for col in composite_cols:
-            if col in row.index:
-                val = clean_percentage(row[col])
-                if val is not None:
-                    school['act_composite'] = val
-                    break
-
-        # ACT ELA/Reading
-        ela_cols = [
-            'act ela average score - grade 11',
-            'act ela',  # 2010-2017 format
-            'act reading',  # Alternative old format
-        ]
-        for col in ela_cols:
-            if col in row.index:
-                val = clean_percentage(row[col])
-                if val is not None:
-                    if 'act_scores' not in school:
-                        school['act_scores'] = {}
-                    school['act_scores']['ela'] = val
-                    break
-
-        # ACT Math
-        math_cols = [
-            'act math average score - grade 11',
-            'act math',  # 2010-2017 format
-        ]
-        for col in math_cols:
-            if col in row.index:
-                val = clean_percentage(row[col])
-                if val is not None:
-                    if 'act_scores' not in school:
-                        school['act_scores'] = {}
-                    school['act_scores']['math'] = val
-                    break
-
-        # ACT Science
-        science_cols = [
-            'act science average score - grade 11',
-            'act science',  # 2010-2017 format
-        ]
-        for col in science_cols:
-            if col in row.index:
-                val = clean_percentage(row[col])
-                if val is not None:
-                    if 'act_scores' not in school:
-                        school['act_scores'] = {}
-                    school['act_scores']['science'] = val
-                    break
+        if has_shift:
+            # Drop the unnamed data column (index 1) along with its header
+            headers = [headers[i] for i in positions if i != 1]
+            positions = [i for i in positions if i != 1]
+
+        if 'RCDTS' not in headers:
+            return None
+
+        names = [normalize_column_name(col) for col in headers]
+        return [(position, name) for position, name in zip(positions, names) if name in EXTRACTED_COLUMNS]
+
+    def _extract_from_excel_streaming(self, file_path: Path) -> Dict[str, Dict[str, Any]]:
+        """
+        Memory-bounded variant of _extract_from_excel.
+
+        Rows stream from a read-only openpyxl workbook and only the wanted cells of
+        STREAM_CHUNK_ROWS rows at a time are held before extraction.
+        """
+        schools_data: Dict[str, Dict[str, Any]] = {}
+
+        try:
+            workbook = load_workbook(file_path, read_only=True, data_only=True, keep_links=False)
+            try:
+                is_2018_parcc = 'parcc' in file_path.stem.lower() and '2018' in file_path.stem.lower()
+                header_row = 6 if is_2018_parcc else 0
+
+                for sheet in workbook.worksheets:
+                    if sheet.title.lower() in ['notes', 'important notes']:
+                        continue
+
+                    rows = sheet.iter_rows(values_only=True)
+                    head = [
+                        [_excel_cell_value(value) for value in _trim_empty_cells(row)]
+                        for row in islice(rows, header_row + HEADER_SNIFF_ROWS)
+                    ]
+                    while head and not head[-1]:
+                        head.pop()
+                    width = max((len(row) for row in head), default=0)
+                    df_head = pd.DataFrame(
+                        [row + [None] * (width - len(row)) for row in head], dtype=object
+                    )
+
+                    wanted = self._sheet_columns(df_head, header_row)
+                    if wanted is None:
+                        continue
+
+                    names = [name for _, name in wanted]
+                    chunk: List[List[Any]] = []
+                    for row in chain(head[header_row + 1:], rows):
+                        chunk.append([
+                            _excel_cell_value(row[position]) if position < len(row) else None
+                            for position, _ in wanted
+                        ])
+                        if len(chunk) == STREAM_CHUNK_ROWS:
+                            self._extract_sheet(pd.DataFrame(chunk, columns=names, dtype=object), schools_data)
+                            chunk = []
+                    if chunk:
+                        self._extract_sheet(pd.DataFrame(chunk, columns=names, dtype=object), schools_data)
+            finally:
+                workbook.close()
+
+        except Exception as e:
+            print(f"Error reading {file_path}: {e}")
+            self._failed_files.add(file_path)
+            return {}
+
+        return schools_data
+
+    def _extract_sheet(self, df: pd.DataFrame, schools_data: Dict[str, Dict[str, Any]]) -> None:
+        """Extract every metric from one normalized sheet, a whole column at a time."""
+        # Ambiguous duplicate headers never yielded a value row by row, so skip them
+        label_counts = df.columns.value_counts()
+        unique_labels = set(label_counts.index[label_counts == 1])
+        positions = {label: index for index, label in enumerate(df.columns) if label in unique_labels}
+
+        rcdts_index = positions.get('rcdts', list(df.columns).index('rcdts'))
+        row_schools: List[Optional[Dict[str, Any]]] = []
+        for rcdts in df.iloc[:, rcdts_index].to_numpy(dtype=object).tolist():
+            if rcdts is None or (isinstance(rcdts, float) and pd.isna(rcdts)):
+                row_schools.append(None)
+                continue
+            code = normalize_rcdts(str(rcdts).strip())
+            row_schools.append(schools_data.setdefault(code, {}) if code else None)
+
+        def resolve(aliases: Sequence[str], cleaner) -> List[Any]:
+            """First non-null cleaned value across the alias columns, per row."""
+            resolved = np.full(len(df), None, dtype=object)
+            missing = np.ones(len(df), dtype=bool)
+            for alias in aliases:
+                if alias not in positions or not missing.any():
+                    continue
+                cleaned = np.empty(len(df), dtype=object)
+                cleaned[:] = cleaner(df.iloc[:, positions[alias]].to_numpy(dtype=object))
+                take = missing & np.fromiter((value is not None for value in cleaned), dtype=bool, count=len(df))
+                resolved[take] = cleaned[take]
+                missing &= ~take
+            return resolved.tolist()
+
+        def assign(key: str, values: List[Any]) -> None:
+            for school, value in zip(row_schools, values):
+                if school is not None and value is not None:
+                    school[key] = value
+
+        extracted = {}
+        for key, aliases in METRIC_COLUMN_ALIASES.items():
+            cleaner = clean_enrollment_column if key == 'enrollment' else clean_percentage_column
+            extracted[key] = resolve(aliases, cleaner)
+            assign(key, extracted[key])
+
+        assign('sat_composite', [
+            reading + math if reading is not None and math is not None else None
+            for reading, math in zip(extracted['sat_reading'], extracted['sat_math'])
+        ])
+
+        for subject, aliases in ACT_SCORE_COLUMN_ALIASES.items():
+            values = resolve(aliases, clean_percentage_column)
+            for school, value in zip(row_schools, values):
+                if school is not None and value is not None:
+                    school.setdefault('act_scores', {})[subject] = value
 
     def clear_cache(self) -> None:
         """Clear cached data."""
         self._cache.clear()
 
 
+YEAR_COLUMN = {year: column for column, year in enumerate(DEMOGRAPHIC_YEARS)}
+
+
+def _load_year_in_worker(
+    base_path: Path, cache_dir: Optional[Path], low_memory: bool, year: int
+) -> Dict[str, Dict[str, Any]]:
+    """Process-pool entry point: parse one year with a fresh extractor."""
+    extractor = HistoricalDataExtractor(
+        base_path, cache_dir=cache_dir, use_cache=cache_dir is not None, low_memory=low_memory
+    )
+    return extractor.load_year(year)
+
+
+def _current_column(rows: Sequence[Dict[str, Any]], field: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Current-year values as float64 plus a mask of which rows have one."""
+    values = [row.get(field) for row in rows]
+    present = np.array([value is not None for value in values], dtype=bool)
+    floats = np.array([float(value) if value is not None else np.nan for value in values], dtype=np.float64)
+    return floats, present
+
+
+def round_like_python(values: np.ndarray, digits: int) -> np.ndarray:
+    """Element-wise round(value, digits) with Python's exact semantics."""
+    scaled = values * 10.0**digits
+    rounded = np.round(values, digits)
+    # np.round scales, rints, and divides; that only disagrees with Python's
+    # correctly rounded round() when the scaled value sits on or next to a tie.
+    fraction = scaled - np.floor(scaled)
+    near_tie = np.abs(fraction - 0.5) < 1e-6
+    positions = np.flatnonzero(near_tie)
+    rounded[positions] = [round(value, digits) for value in values[positions].tolist()]
+    return rounded
+
+
+def _assign_rounded(
+    records: List[Dict[str, Any]], key: str, values: np.ndarray, mask: np.ndarray, digits: int
+) -> None:
+    """Write round(value, digits) into records wherever mask holds and the value exists."""
+    positions = np.flatnonzero(mask & ~np.isnan(values))
+    rounded = round_like_python(values[positions], digits)
+    for position, value in zip(positions.tolist(), rounded.tolist()):
+        records[position][key] = value
+
+
 class TrendCalculator:
     """Calculate trend deltas for schools using historical data."""
 
     def __init__(self, extractor: HistoricalDataExtractor):
         self.extractor = extractor
+        self._panel: Optional[Tuple[Tuple[str, ...], Dict[str, np.ndarray]]] = None
 
     def calculate_trends_for_school(
         self,
@@ -867,90 +1130,227 @@ class TrendCalculator:
                 # Note: SAT doesn't have Science, so act_science_hist will be None for SAT years
 
 
-def update_school_trends(db: Session, excel_path: str) -> int:
-    """
-    Update trend fields for all schools in the database.
-    Reads current school data from DB, calculates trends from historical files,
-    and updates the trend columns.
-    """
-    extractor = HistoricalDataExtractor()
-    calculator = TrendCalculator(extractor)
+    # ------------------------------------------------------------------
+    # Batch API: one (school x year) array per field for every school at
+    # once. Produces the same dicts as the per-school methods above, except
+    # that NaN values read from a historical file are treated as missing.
+    # ------------------------------------------------------------------
 
-    schools = db.query(School).all()
-    updated_count = 0
-    batch_size = 100
-    updates = []
-
-    for i, school in enumerate(schools):
-        # Build current data dict from school model
-        current_data = {
-            'act_ela_avg': school.act_ela_avg,
-            'act_math_avg': school.act_math_avg,
-            'student_enrollment': school.student_enrollment,
-            'low_income_percentage': school.low_income_percentage,
-            'el_percentage': school.el_percentage,
-            'pct_white': school.pct_white,
-            'pct_black': school.pct_black,
-            'pct_hispanic': school.pct_hispanic,
-            'pct_asian': school.pct_asian,
-            'pct_pacific_islander': school.pct_pacific_islander,
-            'pct_native_american': school.pct_native_american,
-            'pct_two_or_more': school.pct_two_or_more,
-            'pct_mena': school.pct_mena,
-        }
+    def calculate_trends_batch(
+        self,
+        rcdts_codes: Sequence[str],
+        current_rows: Sequence[Dict[str, Any]],
+    ) -> List[Dict[str, float]]:
+        """Vectorized calculate_trends_for_school over many schools."""
+        panel = self._build_panel(rcdts_codes)
+        trends: List[Dict[str, float]] = [{} for _ in rcdts_codes]
+
+        # ACT composite: SAT years converted, direct ACT years as-is
+        ela, ela_present = _current_column(current_rows, 'act_ela_avg')
+        math, math_present = _current_column(current_rows, 'act_math_avg')
+        current_act = (ela + math) / 2.0
+        act_present = ela_present & math_present
+        act_series = {year: sat_to_act_precise_array(panel['sat_composite'][:, YEAR_COLUMN[year]]) for year in SAT_YEARS}
+        act_series.update({year: panel['act_composite'][:, YEAR_COLUMN[year]] for year in ACT_YEARS})
 
-        # Calculate trends
-        trends = calculator.calculate_trends_for_school(school.rcdts, current_data)
+        for window in TREND_WINDOWS:
+            target_year = CURRENT_YEAR - window
+            historical = act_series.get(target_year)
+            if historical is None and target_year == 2020:
+                historical = act_series.get(2019)
+            if historical is not None:
+                _assign_rounded(trends, f'act_trend_{window}yr', current_act - historical, act_present, 2)
+
+        demographic_fields = {
+            'enrollment': ('student_enrollment', 'enrollment'),
+            'low_income': ('low_income_percentage', 'low_income_percentage'),
+            'el': ('el_percentage', 'el_percentage'),
+        }
+        metric_sources = list(demographic_fields.items()) + [
+            (metric, (f'pct_{metric}', metric)) for metric in DIVERSITY_METRICS
+        ]
+        for metric, (current_field, panel_field) in metric_sources:
+            current, present = _current_column(current_rows, current_field)
+            for window in TREND_WINDOWS:
+                target_year = CURRENT_YEAR - window
+                historical = panel[panel_field][:, YEAR_COLUMN[target_year]]
+                _assign_rounded(trends, f'{metric}_trend_{window}yr', current - historical, present, 2)
 
-        if trends:
-            update_record = {'rcdts': school.rcdts}
-            update_record.update(trends)
-            updates.append(update_record)
+        return trends
 
-        updated_count += 1
+    def extract_historical_yearly_data_batch(
+        self,
+        rcdts_codes: Sequence[str],
+        current_rows: Sequence[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """Vectorized extract_historical_yearly_data over many schools."""
+        panel = self._build_panel(rcdts_codes)
+        historical: List[Dict[str, Any]] = [{} for _ in rcdts_codes]
+        everyone = np.ones(len(rcdts_codes), dtype=bool)
 
-        # Execute batch updates using raw SQL
-        if (i + 1) % batch_size == 0 and updates:
-            _execute_batch_updates(db, updates)
-            updates = []
-            print(f"Updated {updated_count} schools...")
+        for record, current_data in zip(historical, current_rows):
+            self._add_current_year_historical(record, current_data)
 
-    # Final batch
-    if updates:
-        _execute_batch_updates(db, updates)
+        for year in DEMOGRAPHIC_YEARS:
+            column = YEAR_COLUMN[year]
+
+            enrollment = panel['enrollment'][:, column]
+            for position in np.flatnonzero(~np.isnan(enrollment)):
+                historical[position][f'enrollment_hist_{year}'] = int(enrollment[position])
+
+            # Direct ACT scores win; SAT conversions fill in when they are absent
+            composite = panel['act_composite'][:, column]
+            has_composite = ~np.isnan(composite)
+            _assign_rounded(historical, f'act_hist_{year}', composite, everyone, 1)
+            has_scores = np.zeros(len(rcdts_codes), dtype=bool)
+            for subject in ('ela', 'math', 'science'):
+                scores = panel[f'act_{subject}'][:, column]
+                has_scores |= ~np.isnan(scores)
+                _assign_rounded(historical, f'act_{subject}_hist_{year}', scores, everyone, 1)
+
+            sat_act = sat_to_act_precise_array(panel['sat_composite'][:, column])
+            _assign_rounded(historical, f'act_hist_{year}', sat_act, ~has_composite, 1)
+            for subject, sat_field in (('ela', 'sat_reading'), ('math', 'sat_math')):
+                # Section scores are doubled onto the composite scale before conversion
+                converted = sat_to_act_precise_array(panel[sat_field][:, column] * 2)
+                _assign_rounded(historical, f'act_{subject}_hist_{year}', converted, ~has_scores, 1)
+
+            _assign_rounded(historical, f'el_hist_{year}', panel['el_percentage'][:, column], everyone, 1)
+            _assign_rounded(
+                historical, f'low_income_hist_{year}', panel['low_income_percentage'][:, column], everyone, 1
+            )
+            for metric in DIVERSITY_METRICS:
+                _assign_rounded(historical, f'{metric}_hist_{year}', panel[metric][:, column], everyone, 1)
 
-    extractor.clear_cache()
-    return updated_count
+        return historical
 
+    def _build_panel(self, rcdts_codes: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Stack every extracted field into (school x year) float arrays, NaN when missing."""
+        codes = tuple(normalize_rcdts(code) for code in rcdts_codes)
+        if self._panel is not None and self._panel[0] == codes:
+            return self._panel[1]
 
-def _execute_batch_updates(db: Session, updates: List[Dict[str, Any]]) -> None:
-    """Execute trend updates using raw SQL for reliability."""
-    for record in updates:
-        rcdts = record.pop('rcdts')
+        panel = {field: np.full((len(codes), len(DEMOGRAPHIC_YEARS)), np.nan) for field in PANEL_FIELDS}
+        for year in DEMOGRAPHIC_YEARS:
+            year_data = self.extractor.load_year(year)
+            if not year_data or not codes:
+                continue
+            frame = pd.DataFrame.from_dict(year_data, orient='index')
+            if 'act_scores' in frame.columns:
+                act_scores = frame.pop('act_scores')
+                for subject in ('ela', 'math', 'science'):
+                    frame[f'act_{subject}'] = [
+                        scores.get(subject) if isinstance(scores, dict) else None for scores in act_scores
+                    ]
+            frame = frame.reindex(list(codes))
+            for field in PANEL_FIELDS:
+                if field in frame.columns:
+                    panel[field][:, YEAR_COLUMN[year]] = frame[field].to_numpy(dtype=np.float64, na_value=np.nan)
+
+        self._panel = (codes, panel)
+        return panel
+
+
+def update_school_trends(
+    db: Session, excel_path: str, workers: Optional[int] = None, low_memory: bool = False
+) -> int:
+    """
+    Update trend fields for all schools in the database.
+    Reads current school data from DB, calculates trends from historical files,
+    and updates the trend columns.
+    """
+    extractor = HistoricalDataExtractor(low_memory=low_memory)
+    extractor.preload(DEMOGRAPHIC_YEARS, workers=workers)
+    calculator = TrendCalculator(extractor)
 
-        if not record:
-            continue
+    current_fields = [
+        'act_ela_avg', 'act_math_avg', 'act_science_avg', 'student_enrollment', 'low_income_percentage',
+        'el_percentage',
+        *(f'pct_{metric}' for metric in DIVERSITY_METRICS),
+    ]
+    # Plain column tuples; the trend calculation never needs full ORM objects
+    rows = db.execute(
+        select(School.rcdts, *(getattr(School, field) for field in current_fields))
+    ).all()
+    rcdts_codes = [row[0] for row in rows]
+    current_rows = [dict(zip(current_fields, row[1:])) for row in rows]
+
+    # Calculate trends for every school in one vectorized pass
+    all_trends = calculator.calculate_trends_batch(rcdts_codes, current_rows)
+
+    staged = apply_trend_updates(db, rcdts_codes, all_trends)
+    print(f"Updated trends for {staged} schools")
+
+    # History rows come straight from the batch output, so years added to the
+    # historical files land in school_metric_history without a schema change
+    all_history = calculator.extract_historical_yearly_data_batch(rcdts_codes, current_rows)
+    written = replace_metric_history(
+        db, {code: history_from_fields(fields) for code, fields in zip(rcdts_codes, all_history)}
+    )
+    print(f"Wrote {written} metric history rows")
+
+    # Trends and history feed the detail payloads, so refresh the materialized JSON
+    materialize_school_details(db)
 
-        # Build SET clause
-        set_clauses = [f"{field} = :{field}" for field in record.keys()]
-        sql = f"UPDATE schools SET {', '.join(set_clauses)} WHERE rcdts = :rcdts"
+    extractor.clear_cache()
+    return len(rows)
 
-        params = record.copy()
-        params['rcdts'] = rcdts
 
-        db.execute(text(sql), params)
+def apply_trend_updates(
+    db: Session, rcdts_codes: Sequence[str], all_trends: Sequence[Dict[str, float]]
+) -> int:
+    """
+    Write computed trends with one executemany into a temp table and a single
+    UPDATE ... FROM, committed as one transaction.
 
-    db.commit()
+    Only the trend keys present for a school are written; missing keys keep
+    their current column value.
+    """
+    rows = [
+        {'rcdts': rcdts, **{field: trends.get(field) for field in TREND_FIELDS}}
+        for rcdts, trends in zip(rcdts_codes, all_trends)
+        if trends
+    ]
+    if not rows:
+        return 0
+
+    column_defs = ', '.join(f'{field} REAL' for field in TREND_FIELDS)
+    set_clause = ', '.join(
+        f'{field} = COALESCE({TREND_STAGING_TABLE}.{field}, schools.{field})' for field in TREND_FIELDS
+    )
+    try:
+        db.execute(text(f"DROP TABLE IF EXISTS temp.{TREND_STAGING_TABLE}"))
+        db.execute(text(f"CREATE TEMP TABLE {TREND_STAGING_TABLE} (rcdts TEXT PRIMARY KEY, {column_defs})"))
+        db.execute(
+            text(
+                f"INSERT INTO {TREND_STAGING_TABLE} (rcdts, {', '.join(TREND_FIELDS)}) "
+                f"VALUES (:rcdts, {', '.join(f':{field}' for field in TREND_FIELDS)})"
+            ),
+            rows,
+        )
+        db.execute(
+            text(
+                f"UPDATE schools SET {set_clause} FROM {TREND_STAGING_TABLE} "
+                f"WHERE schools.rcdts = {TREND_STAGING_TABLE}.rcdts"
+            )
+        )
+        db.execute(text(f"DROP TABLE temp.{TREND_STAGING_TABLE}"))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return len(rows)
 
 
 if __name__ == "__main__":
     import sys
 
     if len(sys.argv) < 2:
-        print("Usage: python -m app.utils.import_historical_trends <path_to_2025_excel>")
+        print("Usage: python -m app.utils.import_historical_trends <path_to_2025_excel> [workers]")
         sys.exit(1)
 
     excel_path = sys.argv[1]
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
 
     # Ensure database is initialized
     init_db()
@@ -958,7 +1358,7 @@ if __name__ == "__main__":
     # Update trends
     db = SessionLocal()
     try:
-        count = update_school_trends(db, excel_path)
+        count = update_school_trends(db, excel_path, workers=workers)
         print(f"Successfully updated trends for {count} schools")
     finally:
         db.close()
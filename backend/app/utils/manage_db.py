@@ -0,0 +1,64 @@
+# ABOUTME: Operator commands for derived database structures like the FTS index
+# ABOUTME: Run explicitly after schema changes instead of rebuilding on every startup
+
+from __future__ import annotations
+
+from sqlalchemy import select
+
+from app.database import (
+    FTS_SCHEMA_HASH,
+    META_FTS_ROW_COUNT,
+    META_FTS_SCHEMA_HASH,
+    Base,
+    SchemaMeta,
+    create_fts_index,
+    engine,
+    fts_index_is_current,
+)
+
+
+def rebuild_fts(target_engine=engine) -> None:
+    """Force a full rebuild of the schools_fts index."""
+    Base.metadata.create_all(bind=target_engine)
+    create_fts_index(target_engine)
+
+
+def fts_status(target_engine=engine) -> dict:
+    """Report stored FTS metadata alongside the expected schema hash."""
+    Base.metadata.create_all(bind=target_engine)
+    with target_engine.connect() as conn:
+        meta = dict(
+            conn.execute(
+                select(SchemaMeta.key, SchemaMeta.value).where(
+                    SchemaMeta.key.in_([META_FTS_SCHEMA_HASH, META_FTS_ROW_COUNT])
+                )
+            ).all()
+        )
+    return {
+        "current": fts_index_is_current(target_engine),
+        "expected_hash": FTS_SCHEMA_HASH,
+        "stored_hash": meta.get(META_FTS_SCHEMA_HASH),
+        "indexed_rows": meta.get(META_FTS_ROW_COUNT),
+    }
+
+
+def main() -> None:  # pragma: no cover
+    """CLI entry point for database maintenance commands."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Maintain derived SQLite structures")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("rebuild", help="Drop and rebuild the schools_fts index")
+    subparsers.add_parser("status", help="Show whether the schools_fts index is current")
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        rebuild_fts()
+        print("Rebuilt schools_fts index")
+    else:
+        for key, value in fts_status().items():
+            print(f"{key}: {value}")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -8,6 +8,8 @@ from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 from app.database import Base, create_fts_index, get_db
 from app.main import app
+from app.services.autocomplete import reset_autocomplete_index
+from app.services.snapshot import reset_school_snapshot
 
 
 @pytest.fixture(scope="function")
@@ -45,5 +47,9 @@ def test_db(test_engine) -> Session:
 def client(test_db):
     """Provide FastAPI TestClient with test database."""
     app.dependency_overrides[get_db] = lambda: test_db
+    reset_autocomplete_index()
+    reset_school_snapshot()
     yield TestClient(app)
     app.dependency_overrides.clear()
+    reset_autocomplete_index()
+    reset_school_snapshot()
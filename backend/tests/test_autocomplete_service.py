@@ -0,0 +1,120 @@
+# ABOUTME: Tests for the in-memory autocomplete prefix index
+# ABOUTME: Validates normalization, prefix matching, and result ranking
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, School
+from app.services.autocomplete import (
+    AutocompleteEntry,
+    AutocompleteIndex,
+    load_autocomplete_index,
+    normalize_text,
+    reset_autocomplete_index,
+)
+
+
+def make_entry(idx: int, school_name: str, city: str, district: str | None = None) -> AutocompleteEntry:
+    return AutocompleteEntry(
+        id=idx,
+        rcdts=f"11-111-1111-11-{idx:04d}",
+        school_name=school_name,
+        city=city,
+        district=district,
+        school_type="High School",
+    )
+
+
+def test_normalize_text_folds_case_accents_and_punctuation():
+    assert normalize_text("  St. Mary's  École ") == "st mary s ecole"
+    assert normalize_text(None) == ""
+
+
+def test_search_matches_partial_words():
+    index = AutocompleteIndex(
+        [
+            make_entry(1, "Naperville North High School", "Naperville"),
+            make_entry(2, "Lincoln Elementary", "Springfield"),
+        ]
+    )
+
+    results = index.search("naper")
+
+    assert [entry.id for entry in results] == [1]
+
+
+def test_search_requires_every_token_to_match():
+    index = AutocompleteIndex(
+        [
+            make_entry(1, "Elk Grove High School", "Elk Grove Village"),
+            make_entry(2, "Grove Elementary", "Oak Park"),
+        ]
+    )
+
+    assert [entry.id for entry in index.search("elk gro")] == [1]
+    assert index.search("elk zzz") == []
+
+
+def test_search_ranks_name_matches_above_city_and_district():
+    index = AutocompleteIndex(
+        [
+            make_entry(1, "Central Elementary", "Lincoln", "Lincoln ESD 27"),
+            make_entry(2, "Washington Middle", "Aurora", "Lincoln Way CHSD 210"),
+            make_entry(3, "Lincoln High School", "Chicago"),
+        ]
+    )
+
+    results = index.search("linc")
+
+    assert [entry.id for entry in results] == [3, 1, 2]
+
+
+def test_search_respects_limit_and_empty_queries():
+    index = AutocompleteIndex(
+        [make_entry(i, f"Test School {i}", "Chicago") for i in range(1, 11)]
+    )
+
+    assert len(index.search("test", limit=3)) == 3
+    assert index.search("   ") == []
+    assert index.search("!!") == []
+
+
+def test_load_autocomplete_index_caches_until_reset(test_db):
+    reset_autocomplete_index()
+    test_db.add(School(rcdts="01", school_name="Naperville Central", city="Naperville", level="high"))
+    test_db.commit()
+
+    first = load_autocomplete_index(test_db)
+    assert len(first) == 1
+
+    test_db.add(School(rcdts="02", school_name="Naperville North", city="Naperville", level="high"))
+    test_db.commit()
+    assert load_autocomplete_index(test_db) is first
+
+    reset_autocomplete_index()
+    assert len(load_autocomplete_index(test_db)) == 2
+    reset_autocomplete_index()
+
+
+def test_load_autocomplete_index_rebuilds_after_in_place_write(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'schools.db'}")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        reset_autocomplete_index()
+        db.add(School(rcdts="01", school_name="Naperville Central", city="Naperville", level="high"))
+        db.commit()
+        first = load_autocomplete_index(db)
+
+        # An incremental import renames a school without replacing the file
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE schools SET school_name = 'Naperville North' WHERE rcdts = '01'"))
+
+        rebuilt = load_autocomplete_index(db)
+        assert rebuilt is not first
+        assert [entry.school_name for entry in rebuilt.search("north")] == ["Naperville North"]
+        assert load_autocomplete_index(db) is rebuilt
+    finally:
+        reset_autocomplete_index()
+        db.close()
+        engine.dispose()
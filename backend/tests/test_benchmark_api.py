@@ -0,0 +1,38 @@
+# ABOUTME: Smoke test for the API throughput benchmark utility
+# ABOUTME: Runs a tiny benchmark to keep the script working as endpoints evolve
+
+import os
+
+import orjson
+
+import app.api.top_scores as top_scores_api
+from app.services.snapshot import SNAPSHOT_ENV_VAR
+from app.services.top_scores import RankedSchool
+from app.utils.benchmark_api import StdlibJson, run_benchmark
+
+
+def test_run_benchmark_reports_every_scenario():
+    before = os.environ.get(SNAPSHOT_ENV_VAR)
+
+    results = run_benchmark(schools=30, requests=5)
+
+    assert set(results) == {"top-scores (100 results)", "detail (built per request)", "detail (materialized)"}
+    assert all(rate > 0 for rate in results.values())
+    assert os.environ.get(SNAPSHOT_ENV_VAR) == before
+
+
+def test_run_benchmark_compares_stdlib_json_and_restores_orjson():
+    results = run_benchmark(schools=30, requests=5, compare_json=True)
+
+    assert results["top-scores (stdlib json)"] > 0
+    assert top_scores_api.orjson is orjson
+
+
+def test_stdlib_json_writes_the_same_body_as_orjson():
+    school = RankedSchool(
+        rank=1, rcdts="01", school_name="North High", city="Chicago", district=None,
+        school_type="High School", level="high", enrollment=880, score=21.5, act_ela_avg=21.0,
+    )
+    body = {"results": [school]}
+
+    assert StdlibJson.dumps(body) == orjson.dumps(body)
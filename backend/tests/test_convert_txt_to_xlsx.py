@@ -6,7 +6,9 @@ from pathlib import Path
 import pandas as pd
 import pytest
 
-from app.utils.convert_txt_to_xlsx import convert_txt_to_xlsx
+from app.utils import convert_txt_to_xlsx as converter
+from app.utils.convert_txt_to_xlsx import convert_txt_to_parquet, convert_txt_to_xlsx
+from app.utils import import_historical_trends
 from app.utils.import_historical_trends import HistoricalDataExtractor
 
 
@@ -275,3 +277,102 @@ def test_convert_rc17_general_supports_elk_grove(tmp_path, rc17_txt_path):
     assert elk["white"] == pytest.approx(42.9, rel=0, abs=0.05)
     assert elk["act_composite"] == pytest.approx(21.4, rel=0, abs=0.05)
     assert elk["act_scores"]["math"] == pytest.approx(21.8, rel=0, abs=0.05)
+
+
+def write_rc15_txt(path: Path) -> Path:
+    """Two-school rc15 layout TXT with the fields the RC15 mapping reads."""
+    lines = []
+    for rcdts, name, enrollment, white, act in [
+        ("050162140170002", "Elk Grove High School", "1,918", "42.9", "21.4"),
+        ("150162990250001", "Oak Park High School", "3,301", "", "*"),
+    ]:
+        fields = [""] * 270
+        fields[0], fields[3], fields[20], fields[13], fields[53], fields[253] = (
+            rcdts, name, enrollment, white, "34.5", act
+        )
+        lines.append(";".join(fields))
+    path.write_text("\n".join(lines) + "\n", encoding="latin-1")
+    return path
+
+
+def test_parquet_conversion_loads_like_xlsx(tmp_path):
+    pytest.importorskip("pyarrow")
+    txt_path = write_rc15_txt(tmp_path / "rc15.txt")
+    xlsx_dir = tmp_path / "xlsx"
+    parquet_dir = tmp_path / "parquet"
+    xlsx_dir.mkdir()
+    parquet_dir.mkdir()
+
+    convert_txt_to_xlsx(str(txt_path), str(xlsx_dir / "2015-Report-Card-Public-Data-Set.xlsx"))
+    convert_txt_to_parquet(str(txt_path), str(parquet_dir / "2015-Report-Card-Public-Data-Set.parquet"))
+
+    from_xlsx = HistoricalDataExtractor(base_path=xlsx_dir, use_cache=False).load_year(2015)
+    from_parquet = HistoricalDataExtractor(base_path=parquet_dir, use_cache=False).load_year(2015)
+
+    assert from_parquet == from_xlsx
+    assert from_parquet["050162140170002"]["enrollment"] == 1918
+
+
+def test_convert_txt_to_parquet_requires_engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(converter, "parquet_engine_available", lambda: False)
+    txt_path = write_rc15_txt(tmp_path / "rc15.txt")
+
+    with pytest.raises(ImportError, match="pyarrow"):
+        convert_txt_to_parquet(str(txt_path), str(tmp_path / "out.parquet"))
+
+
+def test_extractor_prefers_parquet_conversion_when_readable(tmp_path, monkeypatch):
+    for suffix in (".xlsx", ".parquet"):
+        (tmp_path / f"2014-Report-Card-Public-Data-Set{suffix}").touch()
+    (tmp_path / "2014-PARCC-Supplement.xlsx").touch()
+    extractor = HistoricalDataExtractor(base_path=tmp_path, use_cache=False)
+
+    monkeypatch.setattr(import_historical_trends, "parquet_engine_available", lambda: True)
+    assert [path.name for path in extractor._find_files_for_year(2014)] == [
+        "2014-Report-Card-Public-Data-Set.parquet",
+        "2014-PARCC-Supplement.xlsx",
+    ]
+
+    monkeypatch.setattr(import_historical_trends, "parquet_engine_available", lambda: False)
+    assert [path.name for path in extractor._find_files_for_year(2014)] == [
+        "2014-Report-Card-Public-Data-Set.xlsx",
+        "2014-PARCC-Supplement.xlsx",
+    ]
+
+
+def test_read_txt_report_card_streams_ragged_lines_in_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(converter, "TXT_CHUNK_ROWS", 2)
+    full = [""] * 300
+    full[0], full[3], full[20], full[13], full[253] = " 050162140170002 ", "Elk Grove", "1,918", " 42.9 ", "*"
+    long_line = full + ["extra"] * 200
+    long_line[0], long_line[20] = "150162990250001", "bad"
+    lines = [";".join(full), "", "160000000000001;x;y;Short School", ";".join(long_line)]
+    txt_path = tmp_path / "rc15.txt"
+    txt_path.write_text("\n".join(lines) + "\n", encoding="latin-1")
+
+    df = converter.read_txt_report_card(str(txt_path))
+
+    assert list(df.columns) == list(converter.RC15_GENERAL_FIELD_MAPPING.values())
+    assert df["RCDTS"].tolist()[:1] == ["050162140170002"]
+    assert pd.isna(df["RCDTS"][1])
+    assert df["School Name"][2] == "Short School"
+    assert df["# Student Enrollment"].tolist()[0] == 1918
+    assert pd.isna(df["# Student Enrollment"][3])
+    assert df["% White"][0] == pytest.approx(42.9)
+    assert df["ACT Composite"].isna().all()
+
+
+@pytest.mark.parametrize("engine_available, expected", [(True, "parquet"), (False, "xlsx")])
+def test_main_defaults_to_parquet_only_with_engine(tmp_path, monkeypatch, engine_available, expected):
+    calls = []
+    monkeypatch.setattr(converter, "parquet_engine_available", lambda: engine_available)
+    monkeypatch.setattr(
+        converter,
+        "CONVERTERS",
+        {fmt: lambda txt, out, fmt=fmt: calls.append((fmt, Path(out).name)) for fmt in ("parquet", "xlsx")},
+    )
+    monkeypatch.setattr("sys.argv", ["convert_txt_to_xlsx", str(tmp_path / "rc15.txt")])
+
+    converter.main()
+
+    assert calls == [(expected, f"rc15.{expected}")]
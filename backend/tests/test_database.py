@@ -1,19 +1,33 @@
 # ABOUTME: Tests for database models and CRUD operations
 # ABOUTME: Validates School model, FTS search, and data integrity
 
+import sqlite3
 from pathlib import Path
 
 import pytest
-from sqlalchemy import text
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import OperationalError
 
 from app.database import (
+    HISTORY_COLUMN_GROUP,
+    TREND_COLUMN_GROUP,
     Base,
     School,
+    META_FTS_SCHEMA_HASH,
+    build_engine,
+    build_fts_match_query,
+    configure_sqlite_pragmas,
     engine,
+    ensure_current_schema,
+    ensure_fts_index,
+    fts_index_is_current,
     get_db,
     get_school_by_rcdts,
+    get_schools_by_rcdts,
     init_db,
+    missing_schema_objects,
     search_schools,
+    sqlite_pragmas_from_env,
 )
 
 
@@ -87,6 +101,73 @@ def test_fts_search_by_city(test_db, test_engine):
     assert len(results) == 1
 
 
+def test_search_schools_returns_projected_rows(test_db):
+    """search_schools returns lightweight rows with only search result fields."""
+    test_db.add_all(
+        [
+            School(
+                rcdts="01",
+                school_name="Elk Grove High School",
+                city="Elk Grove Village",
+                district="Township HSD 214",
+                school_type="High School",
+                level="high",
+                student_enrollment=1775,
+            ),
+            School(rcdts="02", school_name="Lincoln Elementary", city="Springfield", level="elementary"),
+        ]
+    )
+    test_db.commit()
+
+    results = search_schools(test_db, "elk grove", limit=5)
+
+    assert len(results) == 1
+    row = results[0]
+    assert not isinstance(row, School)
+    assert row._fields == ("id", "rcdts", "school_name", "city", "district", "school_type")
+    assert row.rcdts == "01"
+    assert row.district == "Township HSD 214"
+
+
+def test_build_fts_match_query_quotes_tokens_and_prefixes_last():
+    """Free text becomes quoted FTS5 phrases with a prefix on the last token."""
+    assert build_fts_match_query("elk gro") == '"elk" "gro"*'
+    assert build_fts_match_query("o'fallon") == '"o" "fallon"*'
+    assert build_fts_match_query("lincoln OR") == '"lincoln" "OR"*'
+    assert build_fts_match_query(" ?! ") == ""
+
+
+def test_search_schools_matches_partial_last_word(test_db):
+    """A partially typed last word matches through the FTS prefix index."""
+    test_db.add_all(
+        [
+            School(rcdts="01", school_name="Naperville North High School", city="Naperville", level="high"),
+            School(rcdts="02", school_name="Lincoln Elementary", city="Springfield", level="elementary"),
+        ]
+    )
+    test_db.commit()
+
+    results = search_schools(test_db, "naper", limit=5)
+
+    assert [row.rcdts for row in results] == ["01"]
+
+
+def test_search_schools_ranks_name_matches_above_city_and_district(test_db):
+    """Weighted bm25 ranks school name hits ahead of city, then district hits."""
+    test_db.add_all(
+        [
+            School(rcdts="01", school_name="Central School", city="Aurora", district="Lincoln District", level="high"),
+            School(rcdts="02", school_name="Central School", city="Lincoln", district="Aurora District", level="high"),
+            School(rcdts="03", school_name="Lincoln School", city="Aurora", district="Aurora District", level="high"),
+        ]
+    )
+    test_db.commit()
+
+    results = search_schools(test_db, "lincoln", limit=5)
+
+    assert [row.rcdts for row in results] == ["03", "02", "01"]
+
+
 def test_school_repr():
     """Test School __repr__ includes key fields."""
     school = School(
@@ -208,3 +289,303 @@ def test_get_school_by_rcdts_not_found(test_db):
     """Invalid RCDTS returns None."""
     result = get_school_by_rcdts(test_db, "INVALID-RCDTS")
     assert result is None
+
+
+def test_get_schools_by_rcdts_returns_found_schools(test_db):
+    """Bulk lookup returns matching schools keyed by RCDTS and skips unknown codes."""
+    test_db.add_all(
+        [
+            School(rcdts="01", school_name="North High", city="Chicago", level="high"),
+            School(rcdts="02", school_name="South High", city="Springfield", level="high"),
+        ]
+    )
+    test_db.commit()
+
+    result = get_schools_by_rcdts(test_db, ["02", "01", "99", "02", ""])
+
+    assert set(result) == {"01", "02"}
+    assert result["02"].school_name == "South High"
+    assert get_schools_by_rcdts(test_db, []) == {}
+
+
+def test_ensure_fts_index_skips_rebuild_when_current(test_engine):
+    """A freshly built index is current, so ensure_fts_index leaves it alone."""
+    assert fts_index_is_current(test_engine)
+    assert ensure_fts_index(test_engine) is False
+
+
+def test_ensure_fts_index_rebuilds_on_schema_hash_change(test_engine):
+    """A stored hash from an older DDL version forces a rebuild."""
+    with test_engine.connect() as conn:
+        conn.execute(
+            text("UPDATE schema_meta SET value = 'stale' WHERE key = :key"),
+            {"key": META_FTS_SCHEMA_HASH},
+        )
+        conn.commit()
+
+    assert not fts_index_is_current(test_engine)
+    assert ensure_fts_index(test_engine) is True
+    assert fts_index_is_current(test_engine)
+
+
+def test_ensure_fts_index_rebuilds_when_rows_are_missing(test_engine, test_db):
+    """Schools written while the triggers were absent get indexed by the rebuild."""
+    with test_engine.connect() as conn:
+        conn.execute(text("DROP TRIGGER schools_fts_insert"))
+        conn.commit()
+    test_db.add(School(rcdts="01", school_name="Hidden Valley High", city="Normal", level="high"))
+    test_db.commit()
+
+    assert search_schools(test_db, "Hidden") == []
+    assert ensure_fts_index(test_engine) is True
+    assert [row.rcdts for row in search_schools(test_db, "Hidden")] == ["01"]
+
+
+def test_fts_triggers_follow_renames_and_deletes(test_engine, test_db):
+    """Renamed and deleted schools leave no stale tokens in the external-content index."""
+    test_db.add_all(
+        [
+            School(rcdts="01", school_name="Hidden Valley High", city="Normal", level="high"),
+            School(rcdts="02", school_name="Lakeview High", city="Decatur", level="high"),
+        ]
+    )
+    test_db.commit()
+
+    test_db.execute(text("UPDATE schools SET school_name = 'Prairie Ridge High' WHERE rcdts = '01'"))
+    test_db.execute(text("UPDATE schools SET act_ela_avg = 20.0 WHERE rcdts = '02'"))
+    test_db.execute(text("DELETE FROM schools WHERE rcdts = '02'"))
+    test_db.commit()
+
+    assert search_schools(test_db, "Hidden") == []
+    assert search_schools(test_db, "Lakeview") == []
+    assert [row.rcdts for row in search_schools(test_db, "Prairie")] == ["01"]
+    with test_engine.connect() as conn:
+        conn.execute(text("INSERT INTO schools_fts(schools_fts, rank) VALUES ('integrity-check', 1)"))
+
+
+def test_sqlite_pragmas_from_env_defaults_and_overrides():
+    """Defaults enable WAL and mmap; environment variables override them."""
+    defaults = sqlite_pragmas_from_env({})
+    assert defaults["journal_mode"] == "WAL"
+    assert int(defaults["mmap_size"]) > 0
+    assert defaults["query_only"] == "OFF"
+
+    overridden = sqlite_pragmas_from_env(
+        {"SQLITE_JOURNAL_MODE": "delete", "SQLITE_MMAP_SIZE": "0", "SQLITE_QUERY_ONLY": "1"}
+    )
+    assert overridden["journal_mode"] == "DELETE"
+    assert overridden["mmap_size"] == "0"
+    assert overridden["query_only"] == "ON"
+
+    with pytest.raises(ValueError):
+        sqlite_pragmas_from_env({"SQLITE_JOURNAL_MODE": "WAL; DROP TABLE schools"})
+
+
+def test_configure_sqlite_pragmas_applies_on_connect(tmp_path):
+    """Every pooled connection gets the configured pragmas, and query_only blocks writes."""
+    db_path = tmp_path / "pragmas.db"
+    writer = create_engine(f"sqlite:///{db_path}")
+    configure_sqlite_pragmas(writer, sqlite_pragmas_from_env({}))
+    Base.metadata.create_all(writer)
+    writer.dispose()
+
+    reader = create_engine(f"sqlite:///{db_path}")
+    configure_sqlite_pragmas(
+        reader, sqlite_pragmas_from_env({"SQLITE_QUERY_ONLY": "1", "SQLITE_CACHE_SIZE": "-2048"})
+    )
+    with reader.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA cache_size")).scalar() == -2048
+        assert conn.execute(text("PRAGMA temp_store")).scalar() == 2
+        assert conn.execute(text("SELECT COUNT(*) FROM schools")).scalar() == 0
+        with pytest.raises(OperationalError):
+            conn.execute(text("INSERT INTO schools (rcdts, school_name, city, level) VALUES ('1', 'A', 'B', 'high')"))
+    reader.dispose()
+
+
+def _write_school_file(db_path):
+    writer = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(writer)
+    with writer.connect() as conn:
+        conn.execute(text("INSERT INTO schools (rcdts, school_name, city, level) VALUES ('01', 'North High', 'Chicago', 'high')"))
+        conn.commit()
+    writer.dispose()
+
+
+def test_build_engine_immutable_mode_is_read_only(tmp_path):
+    """Immutable mode serves reads from the file and rejects writes."""
+    db_path = tmp_path / "immutable.db"
+    _write_school_file(db_path)
+
+    reader = build_engine("immutable", str(db_path), sqlite_pragmas_from_env({}))
+    with reader.connect() as conn:
+        assert conn.execute(text("SELECT school_name FROM schools")).scalar() == "North High"
+        with pytest.raises(OperationalError):
+            conn.execute(text("DELETE FROM schools"))
+    reader.dispose()
+
+
+def test_build_engine_memory_mode_copies_file(tmp_path):
+    """Memory mode loads the file once and shares the copy across pooled connections."""
+    db_path = tmp_path / "memory.db"
+    _write_school_file(db_path)
+
+    reader = build_engine("memory", str(db_path), sqlite_pragmas_from_env({}))
+    db_path.unlink()
+
+    with reader.connect() as first, reader.connect() as second:
+        assert first.execute(text("SELECT COUNT(*) FROM schools")).scalar() == 1
+        assert second.execute(text("SELECT rcdts FROM schools")).scalar() == "01"
+    # Closing every pooled connection keeps the copy: the engine's anchor holds it
+    reader.dispose()
+    with reader.connect() as reopened:
+        assert reopened.execute(text("SELECT COUNT(*) FROM schools")).scalar() == 1
+    reader.dispose()
+
+
+def test_reopen_engine_if_replaced_switches_to_swapped_file(tmp_path, monkeypatch):
+    """A file renamed over DATABASE_PATH is picked up by sessions created afterwards."""
+    import app.database as database_module
+    from sqlalchemy.orm import sessionmaker
+
+    live_path = tmp_path / "schools.db"
+    _write_school_file(live_path)
+    live_engine = build_engine("memory", str(live_path), sqlite_pragmas_from_env({}))
+    monkeypatch.setattr(database_module, "DATABASE_MODE", "memory")
+    monkeypatch.setattr(database_module, "DATABASE_PATH", str(live_path))
+    monkeypatch.setattr(database_module, "engine", live_engine)
+    monkeypatch.setattr(database_module, "SessionLocal", sessionmaker(bind=live_engine))
+
+    assert database_module.reopen_engine_if_replaced() is False
+    assert database_module.reopen_engine_if_replaced() is False
+
+    shadow_path = tmp_path / "shadow.db"
+    _write_school_file(shadow_path)
+    conn = sqlite3.connect(shadow_path)
+    conn.execute("UPDATE schools SET school_name = 'South High'")
+    conn.commit()
+    conn.close()
+    shadow_path.replace(live_path)
+
+    assert database_module.reopen_engine_if_replaced() is True
+    assert database_module.engine is not live_engine
+    db = database_module.SessionLocal()
+    try:
+        assert db.execute(text("SELECT school_name FROM schools")).scalar() == "South High"
+    finally:
+        db.close()
+    database_module.engine.dispose()
+
+
+def test_reopen_engine_if_replaced_detects_swap_before_first_request(tmp_path, monkeypatch):
+    """The engine's file is recorded when it is built, not when the first request arrives."""
+    import app.database as database_module
+    from sqlalchemy.orm import sessionmaker
+
+    live_path = tmp_path / "schools.db"
+    _write_school_file(live_path)
+    live_engine = build_engine("readwrite", str(live_path), {})
+    monkeypatch.setattr(database_module, "DATABASE_MODE", "readwrite")
+    monkeypatch.setattr(database_module, "DATABASE_PATH", str(live_path))
+    monkeypatch.setattr(database_module, "engine", live_engine)
+    monkeypatch.setattr(database_module, "SessionLocal", sessionmaker(bind=live_engine))
+
+    shadow_path = tmp_path / "shadow.db"
+    _write_school_file(shadow_path)
+    shadow_path.replace(live_path)
+
+    assert database_module.reopen_engine_if_replaced() is True
+    assert database_module.engine is not live_engine
+    assert database_module.reopen_engine_if_replaced() is False
+    database_module.engine.dispose()
+
+
+def test_build_engine_rejects_unknown_mode():
+    """Typos in DATABASE_MODE fail loudly instead of falling back silently."""
+    with pytest.raises(ValueError):
+        build_engine("readonly")
+
+
+def test_trend_and_history_columns_are_deferred(test_db):
+    """Plain lookups skip trend/history columns; column groups load them in the same SELECT."""
+    test_db.add(
+        School(
+            rcdts="01",
+            school_name="North High",
+            city="Chicago",
+            level="high",
+            enrollment_trend_1yr=5.0,
+            enrollment_hist_2024=880,
+        )
+    )
+    test_db.commit()
+    test_db.expunge_all()
+
+    plain = get_school_by_rcdts(test_db, "01")
+    assert {"enrollment_trend_1yr", "enrollment_hist_2024"} <= inspect(plain).unloaded
+    assert "school_name" not in inspect(plain).unloaded
+    test_db.expunge_all()
+
+    detail = get_schools_by_rcdts(test_db, ["01"], (TREND_COLUMN_GROUP,))["01"]
+    assert "enrollment_trend_1yr" not in inspect(detail).unloaded
+    assert "enrollment_hist_2024" in inspect(detail).unloaded
+    test_db.expunge_all()
+
+    full = get_school_by_rcdts(test_db, "01", (TREND_COLUMN_GROUP, HISTORY_COLUMN_GROUP))
+    assert not {"enrollment_trend_1yr", "enrollment_hist_2024"} & inspect(full).unloaded
+    assert full.enrollment_hist_2024 == 880
+
+
+def write_baseline_school_file(db_path: Path) -> None:
+    """A database as the original importer left it: schools only, without content_hash."""
+    writer = create_engine(f"sqlite:///{db_path}")
+    School.__table__.create(writer)
+    with writer.begin() as conn:
+        conn.execute(text("ALTER TABLE schools DROP COLUMN content_hash"))
+        conn.execute(
+            text(
+                "INSERT INTO schools (rcdts, school_name, city, level, enrollment_hist_2024) "
+                "VALUES ('01', 'North High', 'Chicago', 'high', 880)"
+            )
+        )
+    writer.dispose()
+
+
+def test_ensure_current_schema_upgrades_baseline_database(tmp_path):
+    """Readwrite serving adds the tables and columns introduced after the first importer."""
+    db_path = tmp_path / "baseline.db"
+    write_baseline_school_file(db_path)
+    target = create_engine(f"sqlite:///{db_path}")
+
+    assert sorted(missing_schema_objects(target)) == [
+        "schema_meta",
+        "school_detail_json",
+        "school_metric_history",
+        "schools.content_hash",
+    ]
+    ensure_current_schema(target, "readwrite")
+
+    assert missing_schema_objects(target) == []
+    with target.connect() as conn:
+        assert conn.execute(text("SELECT school_name, content_hash FROM schools")).one() == ("North High", None)
+    target.dispose()
+
+
+def test_ensure_current_schema_refuses_outdated_read_only_database(tmp_path):
+    """Read-only modes cannot upgrade, so startup fails with the missing objects named."""
+    db_path = tmp_path / "baseline.db"
+    write_baseline_school_file(db_path)
+    reader = build_engine("immutable", str(db_path), sqlite_pragmas_from_env({}))
+
+    with pytest.raises(RuntimeError, match="school_detail_json.*DATABASE_MODE=readwrite"):
+        ensure_current_schema(reader, "immutable")
+    reader.dispose()
+
+
+def test_ensure_current_schema_ignores_database_not_imported_yet(tmp_path):
+    target = create_engine(f"sqlite:///{tmp_path / 'empty.db'}")
+
+    ensure_current_schema(target, "immutable")
+
+    assert inspect(target).get_table_names() == []
+    target.dispose()
@@ -0,0 +1,238 @@
+# ABOUTME: Tests for HistoricalDataExtractor parsing of yearly Report Card workbooks
+# ABOUTME: Uses small generated Excel files to validate preload and extraction behavior
+
+import os
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from app.utils.import_historical_trends import HistoricalDataExtractor
+
+YEARS = (2019, 2016, 2012)
+
+
+def write_report_card(base_path: Path, year: int, offset: int) -> None:
+    """Write a minimal general sheet shaped like the yearly public data sets."""
+    frame = pd.DataFrame(
+        {
+            "RCDTS": ["050162140170002", "150162990250001", "010010010260001"],
+            "School Name": ["Elk Grove High School", "Oak Park", "Quincy"],
+            "# Student Enrollment": [2000 + offset, "1,450", None],
+            "% Low-Income": [22.2 + offset, "35.5%", 48.0],
+            "% White": [59.4, 40.1 + offset, 70.0],
+            "ACT Composite": [22.5, None, 19.0 + offset],
+            "ACT Math": [22.2, 21.0, None],
+        }
+    )
+    with pd.ExcelWriter(base_path / f"{year}-Report-Card-Public-Data-Set.xlsx") as writer:
+        frame.to_excel(writer, sheet_name="General", index=False)
+        pd.DataFrame({"Note": ["ignored"]}).to_excel(writer, sheet_name="Notes", index=False)
+
+
+@pytest.fixture
+def report_card_dir(tmp_path: Path) -> Path:
+    for offset, year in enumerate(YEARS):
+        write_report_card(tmp_path, year, offset)
+    return tmp_path
+
+
+def test_preload_in_worker_processes_matches_sequential_load(report_card_dir):
+    sequential = HistoricalDataExtractor(base_path=report_card_dir)
+    expected = {year: sequential.load_year(year) for year in YEARS}
+
+    parallel = HistoricalDataExtractor(base_path=report_card_dir)
+    parallel.preload(YEARS, workers=2)
+
+    assert parallel._cache == expected
+    assert expected[2016]["050162140170002"]["enrollment"] == 2001
+    assert expected[2012]["010010010260001"]["act_composite"] == 21.0
+
+
+def test_preload_skips_cached_and_missing_years(report_card_dir):
+    extractor = HistoricalDataExtractor(base_path=report_card_dir)
+    extractor._cache[2019] = {"sentinel": {}}
+
+    extractor.preload([2019, 2010], workers=1)
+
+    assert extractor._cache[2019] == {"sentinel": {}}
+    assert extractor._cache[2010] == {}
+
+
+def test_parsed_years_are_reused_from_disk_cache(report_card_dir, tmp_path_factory, monkeypatch):
+    cache_dir = tmp_path_factory.mktemp("parse-cache")
+    first = HistoricalDataExtractor(base_path=report_card_dir, cache_dir=cache_dir)
+    expected = first.load_year(2019)
+    assert list(cache_dir.glob("extractor-2019-*.pkl"))
+
+    def fail(*_args):
+        raise AssertionError("cached year was re-parsed")
+
+    monkeypatch.setattr(HistoricalDataExtractor, "_extract_from_excel", fail)
+    source = report_card_dir / "2019-Report-Card-Public-Data-Set.xlsx"
+    # Touching a file without changing its bytes still hits through the content hash
+    os.utime(source, ns=(0, 0))
+
+    assert HistoricalDataExtractor(base_path=report_card_dir, cache_dir=cache_dir).load_year(2019) == expected
+
+
+def test_disk_cache_is_invalidated_when_source_changes(report_card_dir, tmp_path_factory):
+    cache_dir = tmp_path_factory.mktemp("parse-cache")
+    HistoricalDataExtractor(base_path=report_card_dir, cache_dir=cache_dir).load_year(2016)
+
+    write_report_card(report_card_dir, 2016, offset=40)
+    reloaded = HistoricalDataExtractor(base_path=report_card_dir, cache_dir=cache_dir).load_year(2016)
+
+    assert reloaded["050162140170002"]["enrollment"] == 2040
+
+
+def test_disk_cache_can_be_disabled(report_card_dir, tmp_path_factory):
+    cache_dir = tmp_path_factory.mktemp("parse-cache")
+    extractor = HistoricalDataExtractor(base_path=report_card_dir, cache_dir=cache_dir, use_cache=False)
+
+    extractor.load_year(2012)
+
+    assert extractor.cache_dir is None
+    assert not any(cache_dir.iterdir())
+
+
+def test_extract_sheet_resolves_aliases_per_column(tmp_path):
+    frame = pd.DataFrame(
+        {
+            "RCDTS": ["05-016-2140-17-0002", "05-016-2140-17-0002", None, "15-016-2990-25-0001"],
+            "% Student Enrollment - Low Income": ["*", "31.5%", 9.0, None],
+            "% Low-Income": [30.0, 12.0, 9.0, " 44.4 "],
+            "Student Enrollment": ["2,044", None, 1, "bad"],
+            "SAT Reading Average": [510, 520, 500, None],
+            "SAT Math Average": [490, None, 500, 505],
+            "ACT Math": [None, "22.2", 20, None],
+            "% White": [10, 20, 30, 40],
+            "% White ": [11, 21, 31, 41],
+        }
+    )
+    path = tmp_path / "2019-Report-Card-Public-Data-Set.xlsx"
+    frame.to_excel(path, sheet_name="General", index=False)
+
+    data = HistoricalDataExtractor(base_path=tmp_path, use_cache=False)._extract_from_excel(path)
+
+    # Later rows for the same school overwrite only the values they provide
+    assert data["050162140170002"] == {
+        "enrollment": 2044,
+        "low_income_percentage": 31.5,
+        "sat_reading": 520.0,
+        "sat_math": 490.0,
+        "sat_composite": 1000.0,
+        "act_scores": {"math": 22.2},
+    }
+    # Duplicate headers after normalization are ambiguous and skipped
+    assert data["150162990250001"] == {"low_income_percentage": 44.4, "sat_math": 505.0}
+    assert len(data) == 2
+
+
+def test_extract_reads_only_alias_columns_and_sniffs_other_sheets(tmp_path, monkeypatch):
+    general = pd.DataFrame(
+        {
+            "RCDTS": ["050162140170002"],
+            "School Name": ["Elk Grove High School"],
+            "% White": [59.4],
+            "Unrelated Metric": [1.0],
+        }
+    )
+    path = tmp_path / "2016-Report-Card-Public-Data-Set.xlsx"
+    with pd.ExcelWriter(path) as writer:
+        general.to_excel(writer, sheet_name="General", index=False)
+        pd.DataFrame({"Finance": [1, 2]}).to_excel(writer, sheet_name="Finance", index=False)
+
+    calls = []
+    read_excel = pd.read_excel
+
+    def recording_read_excel(*args, **kwargs):
+        calls.append((kwargs["sheet_name"], kwargs.get("nrows"), kwargs.get("usecols")))
+        return read_excel(*args, **kwargs)
+
+    monkeypatch.setattr(pd, "read_excel", recording_read_excel)
+    data = HistoricalDataExtractor(base_path=tmp_path, use_cache=False)._extract_from_excel(path)
+
+    assert data == {"050162140170002": {"white": 59.4}}
+    assert calls == [("General", 11, None), ("General", None, [0, 2]), ("Finance", 11, None)]
+
+
+def write_parcc_workbook(base_path: Path) -> Path:
+    """2018 PARCC-SAT layout: title rows, header on row 7, and an empty shifted column."""
+    rows = [["2018 PARCC and SAT results"], [], ["Illinois State Board of Education"], [], [], []]
+    rows.append(["RCDTS", None, "School Name", "ELA", "Math", "% White", "ACT Composite"])
+    for idx in range(25):
+        rows.append(
+            [
+                f"05-016-2140-17-{idx % 20:04d}",
+                None,
+                f"School {idx}",
+                ["N/A", "#DIV/0!", 480.0, "510"][idx % 4],
+                [500, None, "*", 505.5][idx % 4],
+                "45.2%" if idx % 3 else "nan",
+                20.0 + idx,
+            ]
+        )
+    path = base_path / "2018-PARCC-SAT.xlsx"
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame(rows).to_excel(writer, sheet_name="Results", index=False, header=False)
+    return path
+
+
+def test_streaming_extraction_matches_dataframe_extraction(tmp_path, report_card_dir, monkeypatch):
+    monkeypatch.setattr("app.utils.import_historical_trends.STREAM_CHUNK_ROWS", 4)
+    parcc = write_parcc_workbook(tmp_path)
+    extractor = HistoricalDataExtractor(base_path=tmp_path, use_cache=False)
+
+    for path in [parcc, *sorted(report_card_dir.glob("*.xlsx"))]:
+        expected = extractor._extract_from_excel(path)
+        assert expected
+        assert extractor._extract_from_excel_streaming(path) == expected
+
+    parcc_data = extractor._extract_from_excel(parcc)
+    assert parcc_data["050162140170003"]["sat_composite"] == 510.0 + 505.5
+    assert parcc_data["050162140170003"]["white"] == 45.2
+
+
+def test_low_memory_extractor_loads_years_through_streaming_reader(report_card_dir, monkeypatch):
+    def fail(*_args):
+        raise AssertionError("DataFrame reader used in low-memory mode")
+
+    monkeypatch.setattr(HistoricalDataExtractor, "_extract_from_excel", fail)
+    extractor = HistoricalDataExtractor(base_path=report_card_dir, use_cache=False, low_memory=True)
+
+    assert extractor.load_year(2019)["050162140170002"]["enrollment"] == 2000
+
+
+def test_disk_cache_is_invalidated_when_a_parser_module_changes(report_card_dir, tmp_path_factory, monkeypatch):
+    from app.utils import import_historical_trends
+
+    cache_dir = tmp_path_factory.mktemp("parse-cache")
+    helper = tmp_path_factory.mktemp("parser") / "column_cleaning.py"
+    helper.write_text("VERSION = 1\n")
+    monkeypatch.setattr(
+        import_historical_trends, "PARSER_SOURCES", (Path(import_historical_trends.__file__), helper)
+    )
+    HistoricalDataExtractor(base_path=report_card_dir, cache_dir=cache_dir).load_year(2019)
+    parses = []
+    original = HistoricalDataExtractor._extract_from_excel
+
+    def counting(self, *args):
+        parses.append(args)
+        return original(self, *args)
+
+    monkeypatch.setattr(HistoricalDataExtractor, "_extract_from_excel", counting)
+    HistoricalDataExtractor(base_path=report_card_dir, cache_dir=cache_dir).load_year(2019)
+    assert not parses
+
+    helper.write_text("VERSION = 2\n")
+    HistoricalDataExtractor(base_path=report_card_dir, cache_dir=cache_dir).load_year(2019)
+    assert parses
+
+
+def test_parser_sources_cover_shared_cleaning_code():
+    from app.utils import import_historical_trends
+
+    names = {path.name for path in import_historical_trends.PARSER_SOURCES}
+    assert {"import_historical_trends.py", "column_cleaning.py", "convert_txt_to_xlsx.py"} <= names
+    assert all(path.is_file() for path in import_historical_trends.PARSER_SOURCES)
@@ -5,7 +5,7 @@ from pathlib import Path
 
 import pandas as pd
 
-from app.utils.historical_loader import HistoricalDataLoader, _default_base_path
+from app.utils.historical_loader import HistoricalDataLoader, _default_base_path, _is_loaded_column
 
 
 def _write_excel_fixture(base_dir: Path, filename: str, general_rows, assessment_rows=None) -> Path:
@@ -169,3 +169,43 @@ def test_default_base_path_points_to_repo_root():
     expected = _default_base_path()
     assert loader.base_path == expected
     assert loader.base_path.exists()
+
+
+def test_load_year_reuses_disk_cache_until_source_changes(tmp_path, monkeypatch):
+    historical_dir = tmp_path / "data" / "historical-report-cards"
+    historical_dir.mkdir(parents=True)
+    rows = [{"RCDTS": "11-111-1111-11-0004", "Level": "School", "# Student Enrollment": "410"}]
+    fixture = _write_excel_fixture(historical_dir, "2021-Report-Card-Public-Data-Set.xlsx", rows)
+
+    first = HistoricalDataLoader(base_path=historical_dir).load_year(2021)
+    assert list((tmp_path / "data" / ".cache").glob("loader-2021-*.pkl"))
+
+    original_parse = HistoricalDataLoader._parse_excel_file
+    monkeypatch.setattr(HistoricalDataLoader, "_parse_excel_file", lambda *_: {})
+    assert HistoricalDataLoader(base_path=historical_dir).load_year(2021) == first
+
+    monkeypatch.setattr(HistoricalDataLoader, "_parse_excel_file", original_parse)
+    rows[0]["# Student Enrollment"] = "9410"
+    _write_excel_fixture(historical_dir, fixture.name, rows)
+    assert HistoricalDataLoader(base_path=historical_dir).load_year(2021)["11-111-1111-11-0004"]["enrollment"] == 9410
+
+
+def test_parse_excel_reads_only_known_columns(tmp_path):
+    historical_dir = tmp_path / "data" / "historical-report-cards"
+    historical_dir.mkdir(parents=True)
+    rows = [
+        {
+            "RCDTS": "11-111-1111-11-0005",
+            "Level": "School",
+            "# Student Enrollment": "300",
+            "Unrelated Metric": "not a number",
+        }
+    ]
+    path = _write_excel_fixture(historical_dir, "2020-Report-Card-Public-Data-Set.xlsx", rows)
+
+    assert HistoricalDataLoader(base_path=historical_dir, use_cache=False)._parse_excel_file(path) == {
+        "11-111-1111-11-0005": {"enrollment": 300}
+    }
+    assert _is_loaded_column(" RCDTS ")
+    assert not _is_loaded_column("Unrelated Metric")
+    assert not _is_loaded_column(7)
@@ -1,18 +1,28 @@
 # ABOUTME: Tests for Excel data import and cleaning functions
 # ABOUTME: Validates data parsing, cleaning, and database insertion
 
+import sqlite3
+import time
+from types import SimpleNamespace
+
 import pandas as pd
 import pytest
+from sqlalchemy import delete, text
 
 from app.database import School
 import app.utils.import_data as import_data_module
 from app.utils.import_data import (
     load_excel_data,
     clean_percentage,
+    clean_percentage_column,
     clean_enrollment,
+    clean_enrollment_column,
     merge_school_data,
     prepare_school_records,
     import_to_database,
+    build_database,
+    school_content_hash,
+    sync_school_rows,
 )
 
 
@@ -106,6 +116,59 @@ def test_prepare_school_records_includes_iar_fields():
     assert records[0]["iar_overall_proficiency_pct"] == 51.75
 
 
+MESSY_VALUES = [
+    None,
+    float("nan"),
+    "*",
+    " * ",
+    "",
+    "45.5%",
+    "45.5 %",
+    "1,234",
+    "1,234.9",
+    "+.5",
+    "1e3",
+    "nan",
+    "N/A",
+    45,
+    45.5,
+    True,
+]
+
+
+def _same_values(left, right):
+    return len(left) == len(right) and all(
+        type(a) is type(b) and (a == b or (a != a and b != b)) for a, b in zip(left, right)
+    )
+
+
+def test_clean_columns_match_scalar_cleaners():
+    """Column-wise cleaning returns exactly what the scalar cleaners return per value."""
+    import numpy as np
+
+    values = np.array(MESSY_VALUES, dtype=object)
+
+    assert _same_values(clean_percentage_column(values), [clean_percentage(v) for v in MESSY_VALUES])
+    assert _same_values(clean_enrollment_column(values), [clean_enrollment(v) for v in MESSY_VALUES])
+    assert clean_percentage_column(np.array([], dtype=object)) == []
+
+
+def test_prepare_school_records_tolerates_missing_columns():
+    """Absent optional columns become None instead of raising."""
+    merged_df = pd.DataFrame(
+        [
+            {"RCDTS": "11-111-1111-11-0001", "School Name": "A", "School Type": "High School"},
+            {"RCDTS": "11-111-1111-11-0002", "School Name": "B", "School Type": "Middle School"},
+        ]
+    )
+
+    records = prepare_school_records(merged_df)
+
+    assert [record["level"] for record in records] == ["high", "middle"]
+    assert records[0]["student_enrollment"] is None
+    assert records[1]["pct_mena"] is None
+
+
 @pytest.mark.slow
 def test_load_excel_data_returns_dataframes():
     """Loading Excel file yields General/ACT dataframes."""
@@ -190,3 +253,322 @@ def test_import_handles_suppressed_data(test_db):
 
     school_with_null = test_db.query(School).filter(School.act_ela_avg.is_(None)).first()
     assert school_with_null is not None
+
+
+def fake_import(names):
+    def _import(excel_path, db, **kwargs):
+        db.bulk_insert_mappings(
+            School,
+            [
+                {"rcdts": f"05-016-2140-17-{idx:04d}", "school_name": name, "city": "Elk Grove Village", "level": "high"}
+                for idx, name in enumerate(names)
+            ],
+        )
+        db.commit()
+        return len(names)
+
+    return _import
+
+
+def test_build_database_swaps_shadow_file_over_live_database(tmp_path, monkeypatch):
+    target = tmp_path / "schools.db"
+    monkeypatch.setattr(import_data_module, "import_to_database", fake_import(["Old High"]))
+    build_database("unused.xlsx", str(target))
+    reader = sqlite3.connect(target)
+    reader.execute("PRAGMA journal_mode=WAL")
+    old_inode = target.stat().st_ino
+
+    monkeypatch.setattr(import_data_module, "import_to_database", fake_import(["Elk Grove High", "Rolling Meadows"]))
+    assert build_database("unused.xlsx", str(target)) == 2
+
+    # An already-open reader keeps the old file; new connections see the new one
+    assert reader.execute("SELECT school_name FROM schools").fetchall() == [("Old High",)]
+    reader.close()
+    assert target.stat().st_ino != old_inode
+    assert [path.name for path in tmp_path.iterdir() if "building" in path.name] == []
+
+    fresh = sqlite3.connect(target)
+    try:
+        matches = fresh.execute(
+            "SELECT s.school_name FROM schools_fts JOIN schools s ON s.id = schools_fts.rowid "
+            "WHERE schools_fts MATCH 'meadows*'"
+        ).fetchall()
+        index_names = {row[0] for row in fresh.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        stats = fresh.execute("SELECT COUNT(*) FROM sqlite_stat1").fetchone()[0]
+    finally:
+        fresh.close()
+    assert matches == [("Rolling Meadows",)]
+    assert "ix_schools_rcdts" in index_names
+    assert stats > 0
+
+
+def test_build_database_failure_leaves_live_database_untouched(tmp_path, monkeypatch):
+    target = tmp_path / "schools.db"
+    monkeypatch.setattr(import_data_module, "import_to_database", fake_import(["Old High"]))
+    build_database("unused.xlsx", str(target))
+
+    def broken_import(*args, **kwargs):
+        raise ValueError("bad workbook")
+
+    monkeypatch.setattr(import_data_module, "import_to_database", broken_import)
+    with pytest.raises(ValueError):
+        build_database("unused.xlsx", str(target))
+
+    conn = sqlite3.connect(target)
+    try:
+        assert conn.execute("SELECT school_name FROM schools").fetchall() == [("Old High",)]
+    finally:
+        conn.close()
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["schools.db"]
+
+
+def pin_stale_wal_snapshot(target):
+    """Leave uncheckpointed WAL frames behind a reader holding an older snapshot."""
+    writer = sqlite3.connect(target)
+    writer.execute("PRAGMA journal_mode=WAL")
+    reader = sqlite3.connect(target, isolation_level=None, check_same_thread=False)
+    reader.execute("BEGIN")
+    assert reader.execute("SELECT school_name FROM schools").fetchall() == [("Old High",)]
+    writer.execute("UPDATE schools SET school_name = 'Stale High'")
+    writer.commit()
+    writer.close()
+    return reader
+
+
+def test_build_database_waits_for_readers_before_swapping(tmp_path, monkeypatch):
+    target = tmp_path / "schools.db"
+    monkeypatch.setattr(import_data_module, "import_to_database", fake_import(["Old High"]))
+    build_database("unused.xlsx", str(target))
+    reader = pin_stale_wal_snapshot(target)
+    retries = []
+
+    def release_reader(delay):
+        # The first checkpoint came back busy; the reader finishes while the swap waits
+        retries.append(delay)
+        if reader.in_transaction:
+            reader.execute("COMMIT")
+
+    patched_time = SimpleNamespace(monotonic=time.monotonic, perf_counter=time.perf_counter, sleep=release_reader)
+    monkeypatch.setattr(import_data_module, "time", patched_time)
+    monkeypatch.setattr(import_data_module, "import_to_database", fake_import(["Elk Grove High"]))
+    try:
+        assert build_database("unused.xlsx", str(target)) == 1
+    finally:
+        reader.close()
+    assert retries
+
+    # The stale WAL was folded into the old file, so nothing replays over the new one
+    fresh = sqlite3.connect(target)
+    try:
+        assert fresh.execute("SELECT school_name FROM schools").fetchall() == [("Elk Grove High",)]
+    finally:
+        fresh.close()
+
+
+def test_build_database_aborts_swap_while_reader_pins_wal(tmp_path, monkeypatch):
+    target = tmp_path / "schools.db"
+    monkeypatch.setattr(import_data_module, "import_to_database", fake_import(["Old High"]))
+    build_database("unused.xlsx", str(target))
+    reader = pin_stale_wal_snapshot(target)
+    old_inode = target.stat().st_ino
+
+    monkeypatch.setattr(import_data_module, "SWAP_CHECKPOINT_TIMEOUT", 0.2)
+    monkeypatch.setattr(import_data_module, "import_to_database", fake_import(["Elk Grove High"]))
+    try:
+        with pytest.raises(RuntimeError, match="old snapshot"):
+            build_database("unused.xlsx", str(target))
+    finally:
+        reader.execute("COMMIT")
+        reader.close()
+
+    assert target.stat().st_ino == old_inode
+    assert [path.name for path in tmp_path.iterdir() if "building" in path.name] == []
+    fresh = sqlite3.connect(target)
+    try:
+        assert fresh.execute("SELECT school_name FROM schools").fetchall() == [("Stale High",)]
+    finally:
+        fresh.close()
+
+
+def stub_import_pipeline(monkeypatch, records):
+    from app.utils.import_historical_trends import HistoricalDataExtractor
+
+    monkeypatch.setattr(import_data_module, "load_excel_data", lambda path: (None, None, None))
+    monkeypatch.setattr(import_data_module, "merge_school_data", lambda *frames: pd.DataFrame(index=range(len(records))))
+    monkeypatch.setattr(HistoricalDataExtractor, "preload", lambda *args, **kwargs: None)
+    monkeypatch.setattr(
+        import_data_module,
+        "prepare_school_records",
+        lambda df, calculator: [{**record, "content_hash": school_content_hash(record)} for record in records],
+    )
+
+
+def test_import_to_database_bulk_loads_then_rebuilds_fts(test_db, monkeypatch):
+    from app.database import FTS_TRIGGERS, fts_index_is_current, search_schools
+
+    test_db.add(School(rcdts="99", school_name="Stale Academy", city="Peoria", level="high"))
+    test_db.commit()
+    stub_import_pipeline(
+        monkeypatch,
+        [
+            {"rcdts": "05-016-2140-17-0002", "school_name": "Elk Grove High", "city": "Elk Grove Village", "level": "high"},
+            {"rcdts": "15-016-2990-25-0001", "school_name": "Oak Park High", "city": "Oak Park", "level": "high",
+             "act_ela_avg": 21.5, "district": "Oak Park SD 200"},
+        ],
+    )
+    monkeypatch.setattr(import_data_module, "SCHOOL_INSERT_CHUNK_SIZE", 1)
+    monkeypatch.setattr(import_data_module, "FTS_TRIGGER_ROW_LIMIT", 0)
+    dropped = []
+    drop_fts_triggers = import_data_module._drop_fts_triggers
+    monkeypatch.setattr(import_data_module, "_drop_fts_triggers", lambda db: dropped.append(1) or drop_fts_triggers(db))
+
+    assert import_to_database("unused.xlsx", test_db) == 2
+
+    assert dropped == [1]
+    schools = test_db.query(School).order_by(School.rcdts).all()
+    assert [(school.school_name, school.act_ela_avg) for school in schools] == [
+        ("Elk Grove High", None),
+        ("Oak Park High", 21.5),
+    ]
+    assert fts_index_is_current(test_db.get_bind())
+    assert [row.school_name for row in search_schools(test_db, "oak")] == ["Oak Park High"]
+    assert search_schools(test_db, "stale") == []
+    triggers = {row[0] for row in test_db.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'"))}
+    assert triggers == set(FTS_TRIGGERS)
+
+
+
+def test_sync_school_rows_restores_fts_triggers_when_write_fails(test_db, monkeypatch):
+    from app.database import FTS_TRIGGERS, fts_index_is_current, search_schools
+
+    test_db.add(School(rcdts="01", school_name="Oak Park High", city="Oak Park", level="high"))
+    test_db.commit()
+    monkeypatch.setattr(import_data_module, "FTS_TRIGGER_ROW_LIMIT", 0)
+
+    def fail_midway(db, records, update_existing=True):
+        db.execute(delete(School))
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(import_data_module, "upsert_school_rows", fail_midway)
+    record = {"rcdts": "02", "school_name": "Elk Grove High", "city": "Elk Grove Village", "level": "high"}
+
+    with pytest.raises(RuntimeError, match="disk full"):
+        sync_school_rows(test_db, [{**record, "content_hash": school_content_hash(record)}])
+
+    triggers = {row[0] for row in test_db.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'"))}
+    assert triggers == set(FTS_TRIGGERS)
+    assert fts_index_is_current(test_db.get_bind())
+    assert [row.school_name for row in search_schools(test_db, "oak")] == ["Oak Park High"]
+
+    # Later single-row writes are indexed by the restored triggers
+    test_db.add(School(rcdts="03", school_name="Maine East High", city="Park Ridge", level="high"))
+    test_db.commit()
+    assert [row.school_name for row in search_schools(test_db, "maine")] == ["Maine East High"]
+
+
+def test_import_to_database_upserts_only_changed_schools(test_db, monkeypatch, capsys):
+    from app.database import fts_index_is_current, search_schools
+
+    base = {"city": "Elk Grove Village", "level": "high"}
+    first = [
+        {"rcdts": "01", "school_name": "Elk Grove High", "act_ela_avg": 20.0, **base},
+        {"rcdts": "02", "school_name": "Conant High", "act_ela_avg": 22.0, **base},
+        {"rcdts": "03", "school_name": "Closed Academy", **base},
+    ]
+    stub_import_pipeline(monkeypatch, first)
+    import_to_database("unused.xlsx", test_db)
+    ids = dict(test_db.query(School.rcdts, School.id).all())
+    created = dict(test_db.query(School.rcdts, School.created_at).all())
+    assert "3 inserted, 0 updated, 0 unchanged, 0 deleted" in capsys.readouterr().out
+
+    second = [
+        {"rcdts": "01", "school_name": "Elk Grove High", "act_ela_avg": 20.0, **base},
+        {"rcdts": "02", "school_name": "James B. Conant High", **base},
+        {"rcdts": "04", "school_name": "New Prairie High", **base},
+    ]
+    stub_import_pipeline(monkeypatch, second)
+    import_to_database("unused.xlsx", test_db)
+    assert "1 inserted, 1 updated, 1 unchanged, 1 deleted" in capsys.readouterr().out
+
+    test_db.expire_all()
+    rows = {school.rcdts: school for school in test_db.query(School).all()}
+    assert sorted(rows) == ["01", "02", "04"]
+    assert (rows["02"].id, rows["02"].school_name, rows["02"].act_ela_avg) == (ids["02"], "James B. Conant High", None)
+    assert rows["01"].created_at == created["01"]
+    assert rows["02"].content_hash == school_content_hash(second[1])
+    assert fts_index_is_current(test_db.get_bind())
+    assert [row.school_name for row in search_schools(test_db, "james")] == ["James B. Conant High"]
+    assert search_schools(test_db, "closed") == []
+
+    materialized = []
+    monkeypatch.setattr(import_data_module, "materialize_school_details", lambda db: materialized.append(db))
+    import_to_database("unused.xlsx", test_db)
+    assert "0 inserted, 0 updated, 3 unchanged, 0 deleted" in capsys.readouterr().out
+    assert materialized == []
+
+
+def test_import_to_database_adds_content_hash_to_older_databases(test_engine, test_db, monkeypatch):
+    with test_engine.begin() as conn:
+        conn.execute(text("ALTER TABLE schools DROP COLUMN content_hash"))
+    stub_import_pipeline(monkeypatch, [{"rcdts": "01", "school_name": "Elk Grove High", "city": "X", "level": "high"}])
+
+    assert import_to_database("unused.xlsx", test_db) == 1
+    assert test_db.query(School.content_hash).scalar() is not None
+
+
+def test_build_database_runs_real_import_into_shadow(tmp_path, monkeypatch):
+    target = tmp_path / "schools.db"
+    stub_import_pipeline(
+        monkeypatch,
+        [
+            {"rcdts": "01", "school_name": "Elk Grove High", "city": "Elk Grove Village", "level": "high"},
+            {"rcdts": "02", "school_name": "Conant High", "city": "Hoffman Estates", "level": "high"},
+        ],
+    )
+
+    assert build_database("unused.xlsx", str(target)) == 2
+    # A second full build replaces the file again rather than upserting into it
+    assert build_database("unused.xlsx", str(target)) == 2
+
+    conn = sqlite3.connect(target)
+    try:
+        rows = conn.execute("SELECT rcdts, content_hash IS NOT NULL FROM schools ORDER BY rcdts").fetchall()
+        details = conn.execute("SELECT COUNT(*) FROM school_detail_json").fetchone()[0]
+    finally:
+        conn.close()
+    assert rows == [("01", 1), ("02", 1)]
+    assert details == 2
+
+
+def test_import_to_database_preloads_every_trend_year(test_db, monkeypatch):
+    from app.utils.import_historical_trends import HistoricalDataExtractor
+
+    stub_import_pipeline(monkeypatch, [{"rcdts": "01", "school_name": "Elk Grove High", "city": "X", "level": "high"}])
+    preloaded = []
+    monkeypatch.setattr(
+        HistoricalDataExtractor, "preload", lambda self, years, workers=None: preloaded.append((list(years), workers))
+    )
+
+    import_to_database("unused.xlsx", test_db, workers=3)
+
+    assert preloaded == [(list(range(2024, 2009, -1)), 3)]
+
+
+def test_import_to_database_writes_history_rows_for_changed_schools(test_db, monkeypatch):
+    from app.services.metric_history import load_metric_history
+
+    base = {"city": "X", "level": "high"}
+    first = [
+        {"rcdts": "01", "school_name": "Elk Grove High", "history": {"enrollment": {2026: 1900, 2024: 1850}}, **base},
+        {"rcdts": "02", "school_name": "Conant High", "history": {"act": {2023: 21.0}}, **base},
+    ]
+    stub_import_pipeline(monkeypatch, first)
+    import_to_database("unused.xlsx", test_db)
+
+    # Only a new history year changes for 01; 02 disappears from the source
+    second = [{**first[0], "history": {"enrollment": {2027: 1950, 2026: 1900, 2024: 1850}}}]
+    stub_import_pipeline(monkeypatch, second)
+    import_to_database("unused.xlsx", test_db)
+
+    school = test_db.query(School).one()
+    assert load_metric_history(test_db) == {school.id: {"enrollment": {2027: 1950.0, 2026: 1900.0, 2024: 1850.0}}}
@@ -1,6 +1,7 @@
 # ABOUTME: Tests for FastAPI application initialization and configuration
 # ABOUTME: Validates app setup, CORS, and health check endpoint
 
+import pytest
 from fastapi.testclient import TestClient
 
 
@@ -52,3 +53,51 @@ def test_openapi_includes_top_scores_route():
 
     schema = app.openapi()
     assert "/api/top-scores" in schema["paths"]
+
+
+@pytest.mark.parametrize("snapshot", ["0", "1"])
+def test_lifespan_upgrades_baseline_database_before_serving(tmp_path, monkeypatch, snapshot):
+    """Detail and compare work, history included, on a database built by the original importer."""
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.orm import sessionmaker
+
+    from app import database
+    from app.database import School
+    from app.main import app
+    from app.services.autocomplete import reset_autocomplete_index
+    from app.services.snapshot import SNAPSHOT_ENV_VAR, reset_school_snapshot
+
+    db_path = tmp_path / "schools.db"
+    writer = create_engine(f"sqlite:///{db_path}")
+    School.__table__.create(writer)
+    with writer.begin() as conn:
+        conn.execute(text("ALTER TABLE schools DROP COLUMN content_hash"))
+        conn.execute(
+            text(
+                "INSERT INTO schools (rcdts, school_name, city, level, enrollment_hist_2024) VALUES "
+                "('01', 'North High', 'Chicago', 'high', 880), ('02', 'South High', 'Chicago', 'high', NULL)"
+            )
+        )
+    writer.dispose()
+
+    live_engine = database.build_engine("readwrite", str(db_path), {})
+    monkeypatch.setattr(database, "DATABASE_PATH", str(db_path))
+    monkeypatch.setattr(database, "engine", live_engine)
+    monkeypatch.setattr(database, "SessionLocal", sessionmaker(bind=live_engine))
+    monkeypatch.setenv(SNAPSHOT_ENV_VAR, snapshot)
+    reset_autocomplete_index()
+    reset_school_snapshot()
+    try:
+        with TestClient(app) as client:
+            detail = client.get("/api/schools/01")
+            compare = client.get("/api/schools/compare", params={"rcdts": "01,02"})
+    finally:
+        reset_autocomplete_index()
+        reset_school_snapshot()
+        live_engine.dispose()
+
+    assert detail.status_code == 200
+    assert detail.json()["school_name"] == "North High"
+    assert detail.json()["metrics"]["historical"]["enrollment"]["yr_2024"] == 880
+    assert compare.status_code == 200
+    assert [school["metrics"]["historical"] for school in compare.json()["schools"]][1] is None
@@ -0,0 +1,24 @@
+# ABOUTME: Tests for the database maintenance CLI helpers
+# ABOUTME: Verifies forced FTS rebuilds and status reporting
+
+from app.database import FTS_SCHEMA_HASH, School
+from app.utils.manage_db import fts_status, rebuild_fts
+
+
+def test_fts_status_reports_current_index(test_engine):
+    """Status reflects the hash and row count stored by the last build."""
+    status = fts_status(test_engine)
+
+    assert status["current"] is True
+    assert status["stored_hash"] == FTS_SCHEMA_HASH
+    assert status["indexed_rows"] == "0"
+
+
+def test_rebuild_fts_refreshes_row_count(test_engine, test_db):
+    """A forced rebuild records the latest school count."""
+    test_db.add(School(rcdts="01", school_name="North High", city="Chicago", level="high"))
+    test_db.commit()
+
+    rebuild_fts(test_engine)
+
+    assert fts_status(test_engine)["indexed_rows"] == "1"
@@ -0,0 +1,128 @@
+# ABOUTME: Tests for the long-format school_metric_history table
+# ABOUTME: Validates rows written from trend batch fields and detail payloads built from them
+
+import pytest
+
+from app.database import School, SchoolMetricHistory
+from app.services.metric_history import (
+    ensure_metric_history,
+    history_from_fields,
+    load_metric_history,
+    replace_metric_history,
+)
+from app.services.school_detail import build_school_detail
+
+
+def create_school(**overrides) -> School:
+    defaults = dict(
+        rcdts="11-111-1111-11-0001",
+        school_name="North High",
+        city="Chicago",
+        level="high",
+        pct_white=40.0,
+    )
+    defaults.update(overrides)
+    return School(**defaults)
+
+
+def test_history_from_fields_groups_batch_output_by_metric():
+    fields = {
+        "enrollment_hist_2024": 880,
+        "enrollment_hist_2019": 840,
+        "act_hist_2023": 19.5,
+        "act_ela_hist_2026": 20.1,
+        "el_hist_2022": None,
+        "act_trend_1yr": 0.5,
+    }
+
+    assert history_from_fields(fields) == {
+        "enrollment": {2024: 880, 2019: 840},
+        "act": {2023: 19.5},
+        "act_ela": {2026: 20.1},
+    }
+
+
+def test_replace_metric_history_writes_any_year(test_db):
+    school = create_school()
+    test_db.add(school)
+    test_db.commit()
+
+    history = {"enrollment": {2026: 900, 2024: 880}, "act": {2023: 19.5}}
+    assert replace_metric_history(test_db, {school.rcdts: history, "unknown": {"act": {2024: 1.0}}}) == 3
+    assert load_metric_history(test_db, [school.id]) == {
+        school.id: {"enrollment": {2026: 900.0, 2024: 880.0}, "act": {2023: 19.5}}
+    }
+    assert load_metric_history(test_db, []) == {}
+
+
+def test_replace_metric_history_replaces_rows_and_prunes_deleted_schools(test_db):
+    kept = create_school()
+    removed = create_school(rcdts="11-111-1111-11-0002", school_name="South High")
+    test_db.add_all([kept, removed])
+    test_db.commit()
+    replace_metric_history(
+        test_db,
+        {kept.rcdts: {"act": {2023: 19.5}}, removed.rcdts: {"act": {2023: 18.0}}},
+    )
+
+    test_db.delete(removed)
+    test_db.commit()
+    replace_metric_history(test_db, {kept.rcdts: {"enrollment": {2024: 880}}})
+
+    rows = test_db.query(SchoolMetricHistory.school_id, SchoolMetricHistory.metric).all()
+    assert rows == [(kept.id, "enrollment")]
+
+
+def test_build_school_detail_renders_history_rows_including_new_years(test_db):
+    school = create_school()
+    test_db.add(school)
+    test_db.commit()
+    replace_metric_history(test_db, {school.rcdts: {"enrollment": {2026: 900, 2024: 880}}})
+
+    history = load_metric_history(test_db, [school.id])[school.id]
+    enrollment = build_school_detail(school, history).model_dump()["metrics"]["historical"]["enrollment"]
+
+    assert (enrollment["yr_2026"], enrollment["yr_2024"], enrollment["yr_2019"]) == (900.0, 880.0, None)
+    assert build_school_detail(school).metrics.historical is None
+
+
+def test_detail_endpoint_reads_history_table(client, test_db):
+    school = create_school(enrollment_hist_2019=700)
+    test_db.add(school)
+    test_db.commit()
+    replace_metric_history(test_db, {school.rcdts: {"enrollment": {2019: 840}, "act": {2023: 19.5}}})
+
+    response = client.get(f"/api/schools/{school.rcdts}")
+
+    historical = response.json()["metrics"]["historical"]
+    # The wide column is never read; the long table is the only source
+    assert historical["enrollment"]["yr_2019"] == 840.0
+    assert historical["act"]["yr_2023"] == 19.5
+
+
+def test_ensure_metric_history_backfills_legacy_wide_columns(test_db):
+    school = create_school(enrollment_hist_2024=880, enrollment_hist_2019=840, act_hist_2023=19.5)
+    test_db.add(school)
+    test_db.commit()
+
+    assert ensure_metric_history(test_db) == 3
+    assert load_metric_history(test_db) == {
+        school.id: {"enrollment": {2024: 880.0, 2019: 840.0}, "act": {2023: 19.5}}
+    }
+    # Once the long table has rows the wide columns are never read again
+    assert ensure_metric_history(test_db) == 0
+
+
+def test_ensure_metric_history_skips_databases_without_history(test_db):
+    test_db.add(create_school())
+    test_db.commit()
+
+    assert ensure_metric_history(test_db, writable=False) == 0
+
+
+def test_ensure_metric_history_refuses_read_only_backfill(test_db):
+    test_db.add(create_school(act_hist_2023=19.5))
+    test_db.commit()
+
+    with pytest.raises(RuntimeError, match="DATABASE_MODE=readwrite"):
+        ensure_metric_history(test_db, writable=False)
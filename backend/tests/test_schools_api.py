@@ -5,7 +5,9 @@ from unittest.mock import patch
 
 from sqlalchemy.exc import OperationalError
 
-from app.database import School
+from app.database import School, SchoolDetailJSON, get_school_detail_json
+from app.services.metric_history import replace_metric_history
+from app.services.school_detail import materialize_school_details
 
 
 def test_get_school_detail_returns_full_info(client, test_db):
@@ -175,6 +177,30 @@ def test_compare_schools_skips_nonexistent_schools(client, test_db):
     data = response.json()
     assert len(data["schools"]) == 1
     assert data["schools"][0]["school_name"] == "Real School"
+    assert data["missing"] == ["99-999-9999-99-9999"]
+
+
+def test_compare_schools_preserves_request_order(client, test_db):
+    """GET /api/schools/compare returns schools in the order they were requested."""
+    test_db.add_all(
+        [
+            School(rcdts="05-016-2140-17-0001", school_name="First Inserted", city="Chicago", level="high"),
+            School(rcdts="05-016-2140-17-0002", school_name="Second Inserted", city="Chicago", level="high"),
+        ]
+    )
+    test_db.commit()
+
+    response = client.get(
+        "/api/schools/compare?rcdts=05-016-2140-17-0002,05-016-2140-17-0001"
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [school["school_name"] for school in data["schools"]] == [
+        "Second Inserted",
+        "First Inserted",
+    ]
+    assert data["missing"] == []
 
 
 def test_compare_schools_handles_three_schools(client, test_db):
@@ -260,3 +286,47 @@ def test_get_school_detail_returns_all_trend_windows(client, test_db):
     assert act_trends["five_year"] == 2.5
     assert act_trends["ten_year"] == 5.0
     assert act_trends["fifteen_year"] == 7.5
+
+
+def test_get_school_detail_serves_materialized_payload(client, test_db):
+    """GET /api/schools/{rcdts} returns the stored JSON body when materialized."""
+    test_db.add(
+        SchoolDetailJSON(
+            rcdts="05-016-2140-17-0005",
+            payload=b'{"rcdts":"05-016-2140-17-0005","school_name":"Cached School"}',
+        )
+    )
+    test_db.commit()
+
+    response = client.get("/api/schools/05-016-2140-17-0005")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json()["school_name"] == "Cached School"
+
+
+def test_materialized_payload_matches_live_detail(client, test_db):
+    """materialize_school_details stores exactly what the live builder returns."""
+    school = School(
+        rcdts="05-016-2140-17-0006",
+        school_name="Materialized High School",
+        city="Chicago",
+        level="high",
+        student_enrollment=1200,
+        act_ela_avg=19.0,
+        act_math_avg=20.0,
+        enrollment_trend_1yr=12.0,
+    )
+    test_db.add(school)
+    test_db.commit()
+    replace_metric_history(test_db, {school.rcdts: {"enrollment": {2024: 1188}}})
+
+    live = client.get("/api/schools/05-016-2140-17-0006").json()
+
+    assert materialize_school_details(test_db) == 1
+    assert get_school_detail_json(test_db, "05-016-2140-17-0006") is not None
+
+    cached = client.get("/api/schools/05-016-2140-17-0006").json()
+    assert cached == live
+    assert cached["metrics"]["act"]["overall_avg"] == 19.5
+    assert cached["metrics"]["historical"]["enrollment"]["yr_2024"] == 1188
@@ -120,3 +120,40 @@ def test_search_handles_special_characters(client, test_db):
     assert response.status_code == 200
     data = response.json()
     assert data["total"] >= 1
+
+
+def test_autocomplete_returns_prefix_matches(client, test_db):
+    """GET /api/autocomplete matches partial words that FTS token search misses."""
+    test_db.add_all(
+        [
+            School(
+                rcdts="05-016-2140-17-0001",
+                school_name="Naperville Central High School",
+                city="Naperville",
+                district="Naperville CUSD 203",
+                school_type="High School",
+                level="high",
+            ),
+            School(
+                rcdts="05-016-2140-17-0002",
+                school_name="Lincoln Elementary",
+                city="Springfield",
+                level="elementary",
+            ),
+        ]
+    )
+    test_db.commit()
+
+    response = client.get("/api/autocomplete?q=naper")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 1
+    assert data["results"][0]["school_name"] == "Naperville Central High School"
+    assert data["results"][0]["district"] == "Naperville CUSD 203"
+
+
+def test_autocomplete_validates_query_parameters(client):
+    """GET /api/autocomplete requires q and caps limit at 20."""
+    assert client.get("/api/autocomplete").status_code == 422
+    assert client.get("/api/autocomplete?q=a&limit=21").status_code == 422
@@ -0,0 +1,93 @@
+# ABOUTME: Tests for the in-memory columnar school snapshot
+# ABOUTME: Validates parity with ORM-backed detail, compare, and top-score reads
+
+from app.database import School
+from app.services.metric_history import load_metric_history, replace_metric_history
+from app.services.school_detail import build_school_detail
+from app.services.snapshot import SchoolSnapshot, load_school_snapshot
+from app.services.top_scores import fetch_top_scores
+
+
+def create_school(idx: int, **overrides) -> School:
+    defaults = dict(
+        rcdts=f"11-111-1111-11-{idx:04d}",
+        school_name=f"School {idx}",
+        city="Chicago",
+        district="District",
+        school_type="High School",
+        level="high",
+        student_enrollment=900 + idx,
+        act_ela_avg=22.0 + idx,
+        act_math_avg=23.0 + idx,
+        iar_overall_proficiency_pct=60.0 + idx,
+    )
+    defaults.update(overrides)
+    return School(**defaults)
+
+
+def test_snapshot_rows_build_identical_school_detail(test_db):
+    school = create_school(
+        1,
+        enrollment_trend_1yr=25.0,
+        act_trend_3yr=1.25,
+        act_science_avg=None,
+    )
+    test_db.add(school)
+    test_db.commit()
+    replace_metric_history(test_db, {school.rcdts: {"enrollment": {2024: 880}, "act": {2019: 19.5}}})
+
+    snapshot = SchoolSnapshot.from_db(test_db)
+    row = snapshot.get(school.rcdts)
+    history = load_metric_history(test_db, [school.id])[school.id]
+
+    assert snapshot.history(row.id) == history
+    assert build_school_detail(row, snapshot.history(row.id)) == build_school_detail(school, history)
+    assert row.student_enrollment == 901
+    assert isinstance(row.student_enrollment, int)
+    assert row.act_science_avg is None
+    assert snapshot.get("missing") is None
+
+
+def test_snapshot_top_scores_match_database_ranking(test_db):
+    test_db.add_all(
+        [
+            create_school(1),
+            create_school(2, act_math_avg=None),
+            create_school(3),
+            create_school(4, school_name="Alpha", act_ela_avg=25.0, act_math_avg=26.0),
+            create_school(5, level="middle"),
+        ]
+    )
+    test_db.commit()
+
+    snapshot = SchoolSnapshot.from_db(test_db)
+
+    for assessment in ("act", "iar"):
+        assert snapshot.top_scores(assessment, "high", 10) == fetch_top_scores(
+            test_db, assessment=assessment, level="high", limit=10
+        )
+
+
+def test_load_school_snapshot_is_opt_in(test_db, monkeypatch):
+    monkeypatch.delenv("SCHOOL_SNAPSHOT", raising=False)
+    assert load_school_snapshot(test_db) is None
+
+
+def test_api_serves_from_snapshot_when_enabled(client, test_db, monkeypatch):
+    monkeypatch.setenv("SCHOOL_SNAPSHOT", "1")
+    test_db.add_all([create_school(1), create_school(2)])
+    test_db.commit()
+
+    detail = client.get("/api/schools/11-111-1111-11-0001")
+    compare = client.get("/api/schools/compare?rcdts=11-111-1111-11-0002,11-111-1111-11-0001,bogus")
+    top = client.get("/api/top-scores?assessment=act&level=high")
+
+    assert detail.status_code == 200
+    assert detail.json()["school_name"] == "School 1"
+    assert [school["rcdts"] for school in compare.json()["schools"]] == [
+        "11-111-1111-11-0002",
+        "11-111-1111-11-0001",
+    ]
+    assert compare.json()["missing"] == ["bogus"]
+    assert [entry["rank"] for entry in top.json()["results"]] == [1, 2]
+    assert client.get("/api/schools/unknown").status_code == 404
@@ -2,6 +2,8 @@
 # ABOUTME: Validates ranking response and query validation for top scores API
 
 from app.database import School
+from app.models import TopScoreEntry, TopScoresResponse
+from app.services.top_scores import fetch_top_scores
 
 
 def create_school(idx: int, **overrides) -> School:
@@ -42,3 +44,20 @@ def test_top_scores_validates_query_params(client):
 
     response = client.get("/api/top-scores?assessment=sat&level=high")
     assert response.status_code == 422
+
+
+def test_top_scores_payload_matches_response_model(client, test_db):
+    test_db.add_all([create_school(1), create_school(2, student_enrollment=None, district=None)])
+    test_db.commit()
+
+    response = client.get("/api/top-scores?assessment=act&level=high")
+
+    assert response.headers["content-type"] == "application/json"
+    expected = TopScoresResponse(
+        results=[
+            TopScoreEntry(**ranked.__dict__)
+            for ranked in fetch_top_scores(test_db, assessment="act", level="high")
+        ]
+    )
+    assert response.json() == expected.model_dump()
+    assert list(response.json()["results"][0]) == list(TopScoreEntry.model_fields)
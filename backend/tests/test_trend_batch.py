@@ -0,0 +1,170 @@
+# ABOUTME: Tests for the vectorized whole-state TrendCalculator batch API
+# ABOUTME: Validates batch trends and yearly history match the per-school methods exactly
+
+import random
+
+import numpy as np
+from sqlalchemy import event
+
+from app.database import School
+from app.services.metric_history import load_metric_history
+from app.utils import import_historical_trends
+from app.utils.import_historical_trends import (
+    DEMOGRAPHIC_YEARS,
+    DIVERSITY_METRICS,
+    HistoricalDataExtractor,
+    TrendCalculator,
+    apply_trend_updates,
+    normalize_rcdts,
+    round_like_python,
+    sat_to_act_precise,
+    sat_to_act_precise_array,
+)
+
+CURRENT_FIELDS = [
+    "act_ela_avg",
+    "act_math_avg",
+    "act_science_avg",
+    "student_enrollment",
+    "low_income_percentage",
+    "el_percentage",
+] + [f"pct_{metric}" for metric in DIVERSITY_METRICS]
+
+
+def build_calculator(codes, rng):
+    """TrendCalculator over a prefilled extractor cache with sparse, mixed data."""
+    extractor = HistoricalDataExtractor()
+    for year in DEMOGRAPHIC_YEARS:
+        year_data = {}
+        for code in codes:
+            if rng.random() < 0.1:
+                continue
+            school = {}
+            for field in ["enrollment", "low_income_percentage", "el_percentage", *DIVERSITY_METRICS]:
+                if rng.random() < 0.8:
+                    school[field] = rng.randint(10, 3000) if field == "enrollment" else round(rng.uniform(0, 100), 1)
+            if rng.random() < 0.5:
+                school["sat_reading"] = rng.uniform(300, 800)
+                school["sat_math"] = rng.uniform(300, 800)
+                school["sat_composite"] = school["sat_reading"] + school["sat_math"]
+            if rng.random() < 0.5:
+                if rng.random() < 0.7:
+                    school["act_composite"] = rng.uniform(12, 30)
+                scores = {subject: rng.uniform(12, 30) for subject in ("ela", "math", "science") if rng.random() < 0.6}
+                if scores:
+                    school["act_scores"] = scores
+            year_data[normalize_rcdts(code)] = school
+        extractor._cache[year] = year_data
+    return TrendCalculator(extractor)
+
+
+def build_current_rows(codes, rng):
+    rows = []
+    for _ in codes:
+        rows.append(
+            {
+                field: rng.randint(10, 3000) if field == "student_enrollment" else rng.uniform(0, 100)
+                for field in CURRENT_FIELDS
+                if rng.random() < 0.85
+            }
+        )
+    return rows
+
+
+def test_batch_methods_match_per_school_methods():
+    rng = random.Random(7)
+    codes = [f"05-016-2140-17-{idx:04d}" for idx in range(200)]
+    calculator = build_calculator(codes, rng)
+    rows = build_current_rows(codes, rng)
+
+    trends = calculator.calculate_trends_batch(codes, rows)
+    history = calculator.extract_historical_yearly_data_batch(codes, rows)
+
+    for code, row, batch_trends, batch_history in zip(codes, rows, trends, history):
+        expected_trends = calculator.calculate_trends_for_school(code, row)
+        expected_history = calculator.extract_historical_yearly_data(code, row)
+        assert list(batch_trends.items()) == list(expected_trends.items())
+        assert batch_history == expected_history
+        assert {key: type(value) for key, value in batch_history.items()} == {
+            key: type(value) for key, value in expected_history.items()
+        }
+
+
+def test_batch_methods_handle_unknown_schools():
+    calculator = TrendCalculator(HistoricalDataExtractor())
+    for year in DEMOGRAPHIC_YEARS:
+        calculator.extractor._cache[year] = {}
+
+    trends = calculator.calculate_trends_batch(["00-000-0000-00-0000"], [{"act_ela_avg": 20.0}])
+
+    assert trends == [{}]
+
+
+def test_round_like_python_matches_builtin_round_on_ties():
+    values = [x / 200 for x in range(-2000, 2000)] + [2.675, 0.125, 1.005, 1e-9, -0.05]
+    array = np.array(values)
+
+    for digits in (1, 2):
+        assert round_like_python(array, digits).tolist() == [round(value, digits) for value in values]
+
+
+def test_sat_to_act_precise_array_matches_scalar_conversion():
+    composites = [None, 400, 590, 1000.5, 1234.0, 1600, 1650.0]
+    array = np.array([np.nan if value is None else value for value in composites])
+
+    converted = sat_to_act_precise_array(array).tolist()
+
+    for value, result in zip(composites, converted):
+        expected = sat_to_act_precise(value)
+        assert (np.isnan(result) and expected is None) or result == expected
+
+
+def test_apply_trend_updates_stages_rows_and_keeps_missing_trends(test_db, test_engine):
+    test_db.add_all(
+        [
+            School(rcdts="01", school_name="A", city="X", level="high", enrollment_trend_1yr=5.0, act_trend_3yr=1.0),
+            School(rcdts="02", school_name="B", city="X", level="high", white_trend_15yr=-2.0),
+        ]
+    )
+    test_db.commit()
+
+    statements = []
+    event.listen(test_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    staged = apply_trend_updates(
+        test_db, ["01", "02", "03"], [{"enrollment_trend_1yr": 12.5, "mena_trend_10yr": 0.25}, {}, {"el_trend_5yr": 1.0}]
+    )
+
+    assert staged == 2
+    assert sum(statement.startswith("INSERT INTO school_trend_updates") for statement in statements) == 1
+    assert sum(statement.startswith("UPDATE schools") for statement in statements) == 1
+    test_db.expire_all()
+    first, second = test_db.query(School).order_by(School.rcdts).all()
+    assert (first.enrollment_trend_1yr, first.mena_trend_10yr, first.act_trend_3yr) == (12.5, 0.25, 1.0)
+    assert (second.white_trend_15yr, second.enrollment_trend_1yr) == (-2.0, None)
+
+
+def test_update_school_trends_writes_batch_results(test_db, monkeypatch):
+    test_db.add(School(rcdts="05-016-2140-17-0002", school_name="A", city="X", level="high", act_ela_avg=20.0))
+    test_db.commit()
+    seen = {}
+
+    def fake_batch(self, rcdts_codes, current_rows):
+        seen["rows"] = list(zip(rcdts_codes, current_rows))
+        return [{"act_trend_1yr": 1.5}]
+
+    monkeypatch.setattr(HistoricalDataExtractor, "preload", lambda *args, **kwargs: None)
+    monkeypatch.setattr(TrendCalculator, "calculate_trends_batch", fake_batch)
+    monkeypatch.setattr(
+        TrendCalculator,
+        "extract_historical_yearly_data_batch",
+        lambda self, rcdts_codes, current_rows: [{"act_ela_hist_2025": 20.0, "enrollment_hist_2026": 1200}],
+    )
+
+    assert import_historical_trends.update_school_trends(test_db, "unused.xlsx") == 1
+
+    [(rcdts, row)] = seen["rows"]
+    assert rcdts == "05-016-2140-17-0002"
+    assert row["act_ela_avg"] == 20.0 and row["pct_mena"] is None
+    school = test_db.query(School).one()
+    assert school.act_trend_1yr == 1.5
+    assert load_metric_history(test_db) == {school.id: {"act_ela": {2025: 20.0}, "enrollment": {2026: 1200.0}}}
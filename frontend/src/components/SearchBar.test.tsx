@@ -1,5 +1,5 @@
 // ABOUTME: Tests for SearchBar component
-// ABOUTME: Verifies search input, autocomplete, and keyboard navigation
+// ABOUTME: Verifies search input and suggestions from the /api/autocomplete endpoint
 
 import { render, screen, waitFor } from '@testing-library/react';
 import { userEvent } from '@testing-library/user-event';
@@ -11,9 +11,12 @@ import { setupServer } from 'msw/node';
 import { act } from 'react';
 import SearchBar from './SearchBar';
 
+const requests: URL[] = [];
+
 const server = setupServer(
-  http.get('http://localhost:8000/api/search', ({ request }) => {
+  http.get('http://localhost:8000/api/autocomplete', ({ request }) => {
     const url = new URL(request.url);
+    requests.push(url);
     const query = url.searchParams.get('q');
 
     if (query === 'elk') {
@@ -44,7 +47,10 @@ beforeAll(() => {
     disconnect() {}
   } as unknown as typeof ResizeObserver;
 });
-afterEach(() => server.resetHandlers());
+afterEach(() => {
+  server.resetHandlers();
+  requests.length = 0;
+});
 afterAll(() => server.close());
 
 const createWrapper = () => {
@@ -93,6 +99,7 @@ describe('SearchBar', () => {
     );
 
     expect(screen.getByText(/Elk Grove Village/i)).toBeInTheDocument();
+    expect(requests.map((url) => url.searchParams.get('limit'))).toContain('10');
   });
 
   it('does not search until 2 characters entered', async () => {
@@ -107,5 +114,6 @@ describe('SearchBar', () => {
     });
 
     expect(screen.queryByText('Elk Grove High School')).not.toBeInTheDocument();
+    expect(requests).toHaveLength(0);
   });
 });
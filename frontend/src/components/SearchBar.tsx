@@ -1,5 +1,5 @@
 // ABOUTME: SearchBar component with autocomplete functionality
-// ABOUTME: Uses Command component with debounced search API calls
+// ABOUTME: Uses Command component with debounced /api/autocomplete suggestions
 
 import { useState } from 'react';
 import { useQuery } from '@tanstack/react-query';
@@ -13,7 +13,7 @@ import {
   CommandList,
 } from '@/components/ui/command';
 import { useDebounce } from '@/hooks/useDebounce';
-import { searchSchools } from '@/lib/api/queries';
+import { autocompleteQueryKey, autocompleteSchools } from '@/lib/api/queries';
 
 export default function SearchBar() {
   const [searchQuery, setSearchQuery] = useState('');
@@ -22,8 +22,8 @@ export default function SearchBar() {
   const shouldSearch = debouncedQuery.length >= 2;
 
   const { data, isLoading } = useQuery({
-    queryKey: ['search', debouncedQuery],
-    queryFn: () => searchSchools(debouncedQuery, 10),
+    queryKey: autocompleteQueryKey(debouncedQuery, 10),
+    queryFn: () => autocompleteSchools(debouncedQuery, 10),
     enabled: shouldSearch,
   });
 
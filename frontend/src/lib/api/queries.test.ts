@@ -3,7 +3,14 @@
 
 import { describe, it, expect, vi, beforeEach } from 'vitest';
 import { apiClient } from './client';
-import { searchQueryKey, schoolDetailQueryKey, compareQueryKey, getTopScores } from './queries';
+import {
+  searchQueryKey,
+  autocompleteQueryKey,
+  schoolDetailQueryKey,
+  compareQueryKey,
+  getTopScores,
+  autocompleteSchools,
+} from './queries';
 
 vi.mock('./client', () => ({
   apiClient: {
@@ -23,6 +30,10 @@ describe('Query Keys', () => {
     expect(key).toEqual(['search', 'test query', 10]);
   });
 
+  it('generates correct autocomplete query key', () => {
+    expect(autocompleteQueryKey('elk', 10)).toEqual(['autocomplete', 'elk', 10]);
+  });
+
   it('generates correct school detail query key', () => {
     const key = schoolDetailQueryKey('05-016-2140-17-0002');
     expect(key).toEqual(['school', '05-016-2140-17-0002']);
@@ -34,6 +45,19 @@ describe('Query Keys', () => {
   });
 });
 
+describe('autocompleteSchools', () => {
+  it('requests suggestions from the autocomplete endpoint', async () => {
+    mockedGet.mockResolvedValue({ data: { results: [], total: 0 } });
+
+    const payload = await autocompleteSchools('elk');
+
+    expect(mockedGet).toHaveBeenCalledWith('/api/autocomplete', {
+      params: { q: 'elk', limit: 8 },
+    });
+    expect(payload.total).toBe(0);
+  });
+});
+
 describe('getTopScores', () => {
   it('requests leaderboard with params', async () => {
     mockedGet.mockResolvedValue({
@@ -1,5 +1,5 @@
 // ABOUTME: TanStack Query hooks for backend API
-// ABOUTME: Provides useSearch, useSchoolDetail, and useCompare hooks
+// ABOUTME: Provides useSearch, useSchoolDetail, and useCompare hooks plus autocomplete fetcher
 
 import { useQuery } from '@tanstack/react-query';
 import { apiClient } from './client';
@@ -19,6 +19,14 @@ export const searchSchools = async (query: string, limit: number = 10): Promise<
   return data;
 };
 
+// Prefix suggestions served from the backend's in-memory index (limit 1-20)
+export const autocompleteSchools = async (query: string, limit: number = 8): Promise<SearchResponse> => {
+  const { data } = await apiClient.get<SearchResponse>('/api/autocomplete', {
+    params: { q: query, limit },
+  });
+  return data;
+};
+
 export async function getSchoolDetail(rcdts: string): Promise<SchoolDetail> {
   const { data } = await apiClient.get<SchoolDetail>(`/api/schools/${rcdts}`);
   return data;
@@ -26,6 +34,7 @@ export async function getSchoolDetail(rcdts: string): Promise<SchoolDetail> {
 
 // Query key factories for consistent caching
 export const searchQueryKey = (query: string, limit: number) => ['search', query, limit];
+export const autocompleteQueryKey = (query: string, limit: number) => ['autocomplete', query, limit];
 export const schoolDetailQueryKey = (rcdts: string) => ['school', rcdts];
 export const compareQueryKey = (rcdtsList: string[]) => ['compare', rcdtsList.join(',')];
 export const topScoresQueryKey = (assessment: Assessment, level: SchoolLevel, limit: number) => [
@@ -118,6 +118,7 @@ export interface SchoolDetail extends School {
 
 export interface CompareResponse {
   schools: SchoolDetail[];
+  missing?: string[];
 }
 
 export type Assessment = 'act' | 'iar';